@@ -4,12 +4,30 @@ Transpilador DSL de Lua en español para Roblox - VERSIÓN SEMÁNTICA CORREGIDA
 Convierte código Lua con palabras clave en español a Lua estándar para Roblox Studio
 """
 
+import argparse
+import bisect
+import json
 import re
+import select
+import stat
+import struct
 import sys
 import os
-from typing import Dict, List, Tuple, Optional
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
 from enum import Enum
 
+try:
+    import fcntl
+except ImportError:  # Windows: la caché funciona sin bloqueo de estadísticas
+    fcntl = None
+
+
+# Versión del transpilador (se registra en los manifiestos de compilación)
+TRANSPILER_VERSION = "1.2.9"
+
 
 class DSLError(Exception):
     """Excepción personalizada para errores del transpilador DSL"""
@@ -27,1101 +45,6522 @@ class ErrorType(Enum):
     SYNTAX_ERROR = "ERROR_SINTAXIS"
     FILE_ERROR = "ERROR_ARCHIVO"
     STRING_ERROR = "ERROR_STRING"
+    ARITY_ERROR = "ERROR_ARIDAD"
 
 
-class LuaDSLTranspiler:
-    """Transpilador principal de DSL a Lua Roblox con análisis semántico"""
+# ============================================================================
+# TABLAS DE REGLAS
+# Fuente única de verdad: las pasadas toman sus traducciones de
+# TRANSLATION_DICT y solo declaran qué nombres les corresponden.
+# ============================================================================
+
+# Diccionario principal de traducción español -> inglés
+_TRANSLATION_ENTRIES: Dict[str, str] = {
+    # Estructuras de control
+    'funcion': 'function',
+    'fin': 'end',
+    'si': 'if',
+    'entonces': 'then',
+    'sino': 'else',
+    'sino_si': 'elseif',
+    'mientras': 'while',
+    'hacer': 'do',
+    'para': 'for',
+    'en': 'in',
+    'retornar': 'return',
+    'local': 'local',
+    'y': 'and',
+    'o': 'or',
+    'no': 'not',
+    'verdadero': 'true',
+    'falso': 'false',
+    'imprimir': 'print',
+    'advertar': 'warn',
+    'esperar': 'wait',
+    'tick': 'tick',
+    'time': 'time',
+    'tipo': 'type',
+    'pares': 'pairs',
+    'ipares': 'ipairs',
+    'nulo': 'nil',
+    'romper': 'break',
+    'continuar': 'continue',
+    'repetir': 'repeat',
+    'hasta': 'until',
+    
+    # Funciones seguras adicionales
+    'pcall': 'pcall',
+    'xpcall': 'xpcall',
+    'task_spawn': 'task.spawn',
+    'task_delay': 'task.delay',
+    'task_wait': 'task.wait',
+    'task_synchronize': 'task.synchronize',
+    'task_desynchronize': 'task.desynchronize',
+    'task_defer': 'task.defer',
+    'cargar_datos': 'function(store, key) return store:GetAsync(key) end',
+    'guardar_datos': 'function(store, key, value) return store:SetAsync(key, value) end',
+    'incrementar_datos': 'function(store, key, delta) return store:IncrementAsync(key, delta) end',
+    
+    # Funciones de tarea y tiempo
+    'tarea_espera': 'task.wait',
+    'tarea_spawn': 'task.spawn',
+    'tarea_delay': 'task.delay',
+    'tarea_defer': 'task.defer',
+    'tarea_synchronize': 'task.synchronize',
+    'tarea_desynchronize': 'task.desynchronize',
+    
+    # Funciones de Tween y animación
+    'servicio_tween': 'TweenService',
+    'info_tween': 'TweenInfo.new',
+    'estilo_suavizado': 'Enum.EasingStyle',
+    'direccion_suavizado': 'Enum.EasingDirection',
+    
+    # Funciones de espera y tiempo
+    'esperar_hijo': 'WaitForChild',
+    'encontrar_hijo': 'FindFirstChild',
+    
+    # Roblox Services (seguros)
+    'juego': 'game',
+    'espacio_trabajo': 'Workspace',
+    'jugadores': 'Players',
+    'luz': 'Lighting',
+    'sonido': 'SoundService',
+    'replicacion': 'ReplicatedStorage',
+    'servidor_script': 'ServerScriptService',
+    'servidor_almacen': 'ServerStorage',
+    'tienda_datos': 'DataStoreService',
+    'servicio_tween': 'TweenService',
+    'servicio_http': 'HttpService',
+    'servicio_mensajes': 'MessagingService',
+    'servicio_teletransporte': 'TeleportService',
+    'servicio_chat': 'Chat',
+    'servicio_gui': 'GuiService',
+    'servicio_entrada': 'UserInputService',
+    'servicio_context': 'ContextActionService',
+    'servicio_sonido': 'SoundService',
+    'servicio_fisica': 'PhysicsService',
+    'servicio_carga': 'ContentProvider',
+    'servicio_recursos': 'HttpService',
+    'servicio_almacen_inicio': 'StarterGui',
+    'servicio_datos': 'DataStoreService',
+    'servicio_ejecucion': 'RunService',
+    'servicio_localizacion': 'LocalizationService',
+    'servicio_prueba': 'TestService',
+    'servicio_terminales': 'Teams',
+    'servicio_basura': 'Debris',
+    'UserInputService': 'UserInputService',
+    'ContextActionService': 'ContextActionService',
+    
+    # Instancias comunes
+    'instancia_nueva': 'Instance.new',
+    'parte': 'Part',
+    'malla_parte': 'MeshPart',
+    'parte_cuña': 'WedgePart',
+    'parte_esquina': 'CornerWedgePart',
+    'modelo': 'Model',
+    'script': 'Script',
+    'script_local': 'LocalScript',
+    'script_modulo': 'ModuleScript',
+    'texto_cadena': 'StringValue',
+    'numero_valor': 'NumberValue',
+    'booleano_valor': 'BoolValue',
+    'objeto_valor': 'ObjectValue',
+    'marco_valor': 'CFrameValue',
+    'vector3_valor': 'Vector3Value',
+    'color3_valor': 'Color3Value',
+    'ladrillo_color_valor': 'BrickColorValue',
+    'entero_valor': 'IntValue',
+    'doble_valor': 'DoubleValue',
+    'angulo_valor': 'NumberSequenceValue',
+    'color_secuencia_valor': 'ColorSequenceValue',
+    
+    # UI Elements
+    'marco': 'Frame',
+    'etiqueta_texto': 'TextLabel',
+    'boton_texto': 'TextButton',
+    'boton_imagen': 'ImageButton',
+    'marco_desplazamiento': 'ScrollingFrame',
+    'caja_texto': 'TextBox',
+    'marco_video': 'VideoFrame',
+    'imagen': 'ImageLabel',
+    'lista_desplazamiento': 'ScrollingFrame',
+    'barra_desplazamiento': 'ScrollBar',
+    'gui_pantalla': 'ScreenGui',
+    'gui_billetera': 'BillboardGui',
+    'gui_superficie': 'SurfaceGui',
+    'gui_mapa': 'ViewportFrame',
+    'caja_seleccion': 'SelectionBox',
+    'caja_resalte': 'Highlight',
+    
+    # Propiedades básicas
+    'nombre': 'Name',
+    'padre': 'Parent',
+    'tamano': 'Size',
+    'posicion': 'Position',
+    'color_fondo': 'BackgroundColor3',
+    'texto': 'Text',
+    'color_texto': 'TextColor3',
+    'transparencia_fondo': 'BackgroundTransparency',
+    'escalado_texto': 'TextScaled',
+    'visible': 'Visible',
+    'anclado': 'Anchored',
+    'transparencia': 'Transparency',
+    'color': 'Color3',
+    'material': 'Material',
+    'reflejo': 'Reflectance',
+    'forma': 'Shape',
+    'superficie': 'TopSurface',
+    'superficie_inferior': 'BottomSurface',
+    'frente': 'FrontSurface',
+    'atras': 'BackSurface',
+    'izquierda': 'LeftSurface',
+    'derecha': 'RightSurface',
+    'puede_colisionar': 'CanCollide',
+    'masa': 'Mass',
+    'densidad': 'Density',
+    'friccion': 'Friction',
+    'elasticidad': 'Elasticity',
+    'resistencia_friction': 'FrictionWeight',
+    'resistencia_elasticidad': 'ElasticityWeight',
+    
+    # Propiedades de Humanoid
+    'humanoide': 'Humanoid',
+    'parte_primaria': 'PrimaryPart',
+    'salud': 'Health',
+    'salud_maxima': 'MaxHealth',
+    'velocidad_caminar': 'WalkSpeed',
+    'poder_salto': 'JumpPower',
+    'altura_salto': 'JumpHeight',
+    'estado_movimiento': 'MoveState',
+    'estado_sitio': 'Sit',
+    'estado_saltando': 'Jump',
+    'estado_cayendo': 'Freefall',
+    'estado_aterrizando': 'Landed',
+    'tipo_cuerpo': 'BodyType',
+    'tipo_estado': 'BodyPartType',
+    'escalado_altura': 'HipHeight',
+    'ancho_hombros': 'ShoulderWidth',
+    'profundidad_cabeza': 'HeadScale',
+    'escalado_cuerpo': 'BodyDepthScale',
+    'escalado_ancho': 'BodyWidthScale',
+    'escalado_altura_cuerpo': 'BodyHeightScale',
+    
+    # Propiedades de UI
+    'posicion_udim2': 'UDim2',
+    'tamano_udim2': 'UDim2',
+    'borde_pixel': 'BorderSizePixel',
+    'radio_esquina': 'CornerRadius',
+    'recorte': 'ClipsDescendants',
+    'seleccionable': 'Selectable',
+    'modo_seleccion': 'SelectionMode',
+    'orden_z': 'ZIndex',
+    'layout': 'LayoutOrder',
+    'alineamiento': 'Alignment',
+    'alineamiento_vertical': 'VerticalAlignment',
+    'alineamiento_horizontal': 'HorizontalAlignment',
+    'relleno': 'Padding',
+    'espaciado': 'Spacing',
+    'relleno_superior': 'PaddingTop',
+    'relleno_inferior': 'PaddingBottom',
+    'relleno_izquierdo': 'PaddingLeft',
+    'relleno_derecho': 'PaddingRight',
+    'fuente': 'Font',
+    'tamano_fuente': 'FontSize',
+    'peso_fuente': 'FontWeight',
+    'estilo_fuente': 'FontStyle',
+    'linea_texto': 'TextWrap',
+    'ajuste_texto': 'TextWrapped',
+    'texto_truncado': 'TextTruncate',
+    'alineacion_texto': 'TextXAlignment',
+    'alineacion_texto_vertical': 'TextYAlignment',
+    'color_borde': 'BorderColor3',
+    'transparencia_borde': 'BorderTransparency',
+    
+    # Tipos y constructores
+    'UDim2_nuevo': 'UDim2.new',
+    'Vector3_nuevo': 'Vector3.new',
+    'Vector2_nuevo': 'Vector2.new',
+    'Color3_nuevo': 'Color3.new',
+    'CFrame_nuevo': 'CFrame.new',
+    'CFrame_angulos': 'CFrame.Angles',
+    'secuencia_color': 'ColorSequence.new',
+    'secuencia_numero': 'NumberSequence.new',
+    'punto_secuencia_numero': 'NumberSequenceKeypoint.new',
+    'punto_secuencia_color': 'ColorSequenceKeypoint.new',
+    'rango_numero': 'NumberRange.new',
+    'rango_color': 'ColorRange.new',
+    'ladrillo_color': 'BrickColor.new',
+    'ladrillo_color_random': 'BrickColor.random',
+    'ruido_perlin': 'math.noise',
+    'aleatorio': 'math.random',
+    'semilla_aleatoria': 'math.randomseed',
+    'absoluto': 'math.abs',
+    'techo': 'math.ceil',
+    'piso': 'math.floor',
+    'maximo': 'math.max',
+    'minimo': 'math.min',
+    'redondear': 'math.round',
+    'potencia': 'math.pow',
+    'raiz': 'math.sqrt',
+    'grados_a_radianes': 'math.deg',
+    'radianes_a_grados': 'math.rad',
+    'pi': 'math.pi',
+    'infinito': 'math.huge',
+    'exp': 'math.exp',
+    'log': 'math.log',
+    'log10': 'math.log10',
+    'sin': 'math.sin',
+    'cos': 'math.cos',
+    'tan': 'math.tan',
+    'asin': 'math.asin',
+    'acos': 'math.acos',
+    'atan': 'math.atan',
+    'atan2': 'math.atan2',
+    'sinh': 'math.sinh',
+    'cosh': 'math.cosh',
+    'tanh': 'math.tanh',
+    
+    # Enums principales
+    'direccion_suavizado': 'Enum.EasingDirection',
+    'estilo_suavizado': 'Enum.EasingStyle',
+    'eje': 'Enum.Axis',
+    'tipo_normal': 'Enum.NormalId',
+    'forma_material': 'Enum.FormFactor',
+    'tipo_parte': 'Enum.PartType',
+    'material': 'Enum.Material',
+    'forma': 'Enum.Shape',
+    'superficie_tipo': 'Enum.SurfaceType',
+    'fuente': 'Enum.Font',
+    'tamano_fuente': 'Enum.FontSize',
+    'tipo_cuerpo': 'Enum.BodyPartType',
+    'tipo_estado_humanoide': 'Enum.HumanoidStateType',
+    'tipo_animacion': 'Enum.AnimationPriority',
+    'tipo_interpolacion': 'Enum.InterpolationStyle',
+    'direccion_interpolacion': 'Enum.InterpolationDirection',
+    'tipo_mensaje': 'Enum.MessageType',
+    'tipo_entrada': 'Enum.UserInputType',
+    'estado_entrada': 'Enum.UserInputState',
+    'tipo_gesto': 'Enum.PlayerGestureType',
+    'tipo_animacion_r': 'Enum.AnimationStatus',
+    'tipo_camara': 'Enum.CameraType',
+    'modo_camara': 'Enum.CameraMode',
+    'tipo_foco': 'Enum.FocusType',
+    
+    # Métodos comunes de objetos
+    'obtener_servicio': 'GetService',
+    'encontrar_hijo': 'FindFirstChild',
+    'esperar_hijo': 'WaitForChild',
+    'obtener_hijos': 'GetChildren',
+    'obtener_descendientes': 'GetDescendants',
+    'es_ancestro': 'IsAncestorOf',
+    'es_descendiente': 'IsDescendantOf',
+    'clonar': 'Clone',
+    'destruir': 'Destroy',
+    'conectar': 'Connect',
+    'desconectar': 'Disconnect',
+    'desconectar_todo': 'DisconnectAll',
+    'esperar': 'Wait',
+    'emitir': 'Emit',
+    'jugar': 'Play',
+    'pausar': 'Pause',
+    'detener': 'Stop',
+    'reanudar': 'Resume',
+    'volumen': 'Volume',
+    'tiempo_posicion': 'TimePosition',
+    'duracion': 'TimeLength',
+    'id_sonido': 'SoundId',
+    'id_imagen': 'Image',
+    'id_malla': 'MeshId',
+    'id_textura': 'TextureID',
+    'aplicar_impulso': 'ApplyImpulse',
+    'aplicar_fuerza': 'ApplyForce',
+    'aplicar_torque': 'ApplyTorque',
+    'aplicar_velocidad_angular': 'ApplyAngularImpulse',
+    'velocidad': 'Velocity',
+    'velocidad_angular': 'AngularVelocity',
+    'velocidad_maxima': 'MaxVelocity',
+    'velocidad_rotacion': 'RotVelocity',
+    'fuerza': 'Force',
+    'torque': 'Torque',
+    'densidad': 'Density',
+    'masa': 'Mass',
+    'centro_masas': 'CenterOfMass',
+    
+    # Métodos de Tween
+    'crear_tween': 'Create',
+    'info_tween': 'TweenInfo.new',
+    'completado': 'Completed',
+    'estado_tween': 'PlaybackState',
+    'tiempo_reproduccion': 'TweenTime',
+    'tiempo_actual': 'CurrentTime',
+    
+    # Métodos de Players
+    'obtener_jugadores': 'GetPlayers',
+    'jugador_local': 'LocalPlayer',
+    'personaje': 'Character',
+    'cargar_personaje': 'LoadCharacter',
+    'quitar_personaje': 'RemoveCharacter',
+    'distancia_de_camara': 'CameraMaxZoomDistance',
+    'distancia_minima_camara': 'CameraMinZoomDistance',
+    'modo_camara': 'CameraMode',
+    'tipo_camara': 'CameraType',
+    
+    # Métodos de Humanoid
+    'mover': 'Move',
+    'saltar': 'Jump',
+    'sentar': 'Sit',
+    'levantar': 'Stand',
+    'plataforma_elevada': 'PlatformStand',
+    'requiere_plataforma_elevada': 'RequiresNeck',
+    'salto_automatico': 'AutoJump',
+    'tipo_movimiento': 'MoveDirection',
+    'velocidad_movimiento': 'WalkSpeed',
+    'poder_salto': 'JumpPower',
+    'altura_salto': 'JumpHeight',
+    'estado_actual': 'GetState',
+    'cambiar_estado': 'ChangeState',
+    
+    # Métodos de UI
+    'capturar_foco': 'CaptureFocus',
+    'liberar_foco': 'ReleaseFocus',
+    'perder_foco': 'FocusLost',
+    'ganar_foco': 'Focused',
+    'texto_cambiado': 'TextChanged',
+    'texto_focalizado': 'Focused',
+    'texto_perdido_foco': 'FocusLost',
+    
+    # Eventos comunes
+    'conectado': 'Connected',
+    'desconectado': 'Disconnected',
+    'agregado': 'Added',
+    'eliminado': 'Removed',
+    'cambiado': 'Changed',
+    'tocado': 'Touched',
+    'tocar_terminado': 'TouchEnded',
+    'presionado': 'Pressed',
+    'liberado': 'Released',
+    'movido': 'Moved',
+    'clic_izquierdo': 'MouseButton1Down',
+    'clic_izquierdo_soltado': 'MouseButton1Up',
+    'clic_derecho': 'MouseButton2Down',
+    'clic_derecho_soltado': 'MouseButton2Up',
+    'clic_medio': 'MouseButton3Down',
+    'clic_medio_soltado': 'MouseButton3Up',
+    'rueda_mouse': 'MouseWheel',
+    'mouse_movido': 'MouseMoved',
+    'mouse_entro': 'MouseEnter',
+    'mouse_salio': 'MouseLeave',
+    'tecla_presionada': 'KeyDown',
+    'tecla_liberada': 'KeyUp',
+    'entrada_comenzo': 'InputBegan',
+    'input_termino': 'InputEnded',
+    'input_cambiado': 'InputChanged',
+    
+    # Propiedades de Part
+    'posicion': 'Position',
+    'tamano': 'Size',
+    'color': 'Color3',
+    'material': 'Material',
+    'reflejo': 'Reflectance',
+    'transparencia': 'Transparency',
+    'anclado': 'Anchored',
+    'puede_colisionar': 'CanCollide',
+    'masa': 'Mass',
+    'densidad': 'Density',
+    'friccion': 'Friction',
+    'elasticidad': 'Elasticity',
+    'forma': 'Shape',
+    'superficie': 'TopSurface',
+    'superficie_inferior': 'BottomSurface',
+    'frente': 'FrontSurface',
+    'atras': 'BackSurface',
+    'izquierda': 'LeftSurface',
+    'derecha': 'RightSurface',
+    
+    # Propiedades de Light
+    'tipo_luz': 'LightType',
+    'brillo': 'Brightness',
+    'color_luz': 'Color',
+    'sombra': 'Shadows',
+    'rango': 'Range',
+    'angulo': 'Angle',
+    'atenuacion': 'Falloff',
+    'habilitado': 'Enabled',
+    
+    # Propiedades de Sound
+    'id_sonido': 'SoundId',
+    'volumen': 'Volume',
+    'tiempo_posicion': 'TimePosition',
+    'duracion': 'TimeLength',
+    'pitch': 'Pitch',
+    'loop': 'Looped',
+    'jugando': 'Playing',
+    'distancia_maxima': 'MaxDistance',
+    'distancia_minima': 'MinDistance',
+    'atenuacion_rolloff': 'RollOffMode',
+    'efecto_sonido': 'SoundEffect',
+    'reverb': 'ReverbSoundEffect',
+    'eco': 'EchoSoundEffect',
+    'distorsion': 'DistortionSoundEffect',
+    'compresor': 'CompressorSoundEffect',
+    
+    # Propiedades de Mesh
+    'id_malla': 'MeshId',
+    'id_textura': 'TextureID',
+    'escala_textura': 'TextureSize',
+    'desplazamiento_vertice': 'VertexColor',
+    'offset_malla': 'Offset',
+    'escala_malla': 'Scale',
+    
+    # Funciones de tabla
+    'insertar': 'table.insert',
+    'remover': 'table.remove',
+    'ordenar': 'table.sort',
+    'concatenar': 'table.concat',
+    'longitud': '#',
+    'vaciar': 'table.clear',
+    'encontrar': 'table.find',
+    'copiar': 'table.copy',
+    'fusionar': 'table.merge',
+    'congelar': 'table.freeze',
+    'esta_congelado': 'table.isfrozen',
+    'empaquetar': 'table.pack',
+    'desempaquetar': 'table.unpack',
+    
+    # Funciones de math (CORREGIDAS)
+    'piso': 'math.floor',
+    'techo': 'math.ceil',
+    'absoluto': 'math.abs',
+    'maximo': 'math.max',
+    'minimo': 'math.min',
+    'redondear': 'math.round',
+    'potencia': 'math.pow',
+    'raiz': 'math.sqrt',
+    'grados_a_radianes': 'math.deg',
+    'radianes_a_grados': 'math.rad',
+    'aleatorio': 'math.random',
+    'semilla_aleatoria': 'math.randomseed',
+    'ruido_perlin': 'math.noise',
+    'pi': 'math.pi',
+    'infinito': 'math.huge',
+    'exp': 'math.exp',
+    'log': 'math.log',
+    'log10': 'math.log10',
+    'sin': 'math.sin',
+    'cos': 'math.cos',
+    'tan': 'math.tan',
+    'asin': 'math.asin',
+    'acos': 'math.acos',
+    'atan': 'math.atan',
+    'atan2': 'math.atan2',
+    'sinh': 'math.sinh',
+    'cosh': 'math.cosh',
+    'tanh': 'math.tanh',
+}
+
+# Palabras clave que necesitan coincidencia exacta
+KEYWORDS: Tuple[str, ...] = (
+    'funcion', 'fin', 'si', 'entonces', 'sino', 'mientras', 'hacer',
+    'para', 'en', 'retornar', 'local', 'y', 'o', 'no', 'verdadero',
+    'falso', 'imprimir', 'esperar', 'tick', 'time', 'tipo', 'pares',
+    'ipares', 'nulo', 'romper', 'continuar', 'repetir', 'hasta'
+)
+
+# 🔥 Funciones globales: solo se traducen seguidas de paréntesis (tarea_espera( → task.wait()
+GLOBAL_FUNCTION_NAMES: Tuple[str, ...] = (
+    'tarea_espera', 'tarea_spawn', 'tarea_delay', 'tarea_defer',
+    'tarea_synchronize', 'tarea_desynchronize',
+    'cargar_datos', 'guardar_datos', 'incrementar_datos', 'info_tween',
+    'esperar_hijo', 'encontrar_hijo', 'obtener_hijos', 'obtener_descendientes',
+    'es_ancestro', 'es_descendiente', 'clonar', 'destruir', 'conectar',
+    'desconectar', 'desconectar_todo', 'jugar', 'pausar', 'detener',
+    'reanudar', 'emitir'
+)
+
+# 🔥 Métodos con dos puntos (objeto:clonar() → objeto:Clone())
+METHOD_NAMES: Tuple[str, ...] = (
+    'clonar', 'destruir', 'conectar', 'desconectar', 'desconectar_todo',
+    'esperar', 'jugar', 'pausar', 'detener', 'reanudar', 'emitir',
+    'encontrar_hijo', 'esperar_hijo', 'obtener_hijos', 'obtener_descendientes',
+    'es_ancestro', 'es_descendiente'
+)
+
+# Servicios aceptados en obtener_servicio("servicio")
+SERVICE_NAMES: Tuple[str, ...] = (
+    'jugadores', 'espacio_trabajo', 'luz', 'sonido', 'replicacion',
+    'servidor_script', 'servidor_almacen', 'servicio_almacen_inicio',
+    'servicio_sonido', 'servicio_chat', 'servicio_datos', 'servicio_ejecucion',
+    'servicio_http', 'servicio_localizacion', 'servicio_prueba',
+    'servicio_terminales', 'servicio_basura', 'tienda_datos', 'servicio_tween',
+    'UserInputService', 'ContextActionService'
+)
+
+# Propiedades traducidas tras un punto (.texto → .Text)
+PROPERTY_NAMES: Tuple[str, ...] = (
+    'nombre', 'padre', 'tamano', 'posicion', 'color_fondo',
+    'texto', 'color_texto', 'transparencia_fondo', 'escalado_texto',
+    'visible', 'anclado', 'transparencia', 'color', 'material',
+    'reflejo', 'humanoide', 'parte_primaria', 'salud', 'salud_maxima',
+    'velocidad_caminar', 'poder_salto', 'forma', 'superficie',
+    'superficie_inferior', 'frente', 'atras', 'izquierda', 'derecha',
+    'puede_colisionar', 'masa', 'densidad', 'friccion', 'elasticidad',
+    'borde_pixel', 'radio_esquina', 'recorte', 'seleccionable',
+    'orden_z', 'layout', 'alineamiento', 'alineamiento_vertical',
+    'alineamiento_horizontal', 'relleno', 'espaciado', 'fuente',
+    'tamano_fuente', 'linea_texto', 'ajuste_texto', 'texto_truncado',
+    'alineacion_texto', 'alineacion_texto_vertical', 'color_borde',
+    'transparencia_borde', 'fondo_transparente', 'rango', 'brillo',
+    'angulo', 'atenuacion', 'habilitado', 'volumen', 'tiempo_posicion',
+    'duracion', 'pitch', 'loop', 'jugando', 'distancia_maxima',
+    'distancia_minima', 'id_sonido', 'id_imagen', 'id_malla', 'id_textura',
+    'velocidad', 'velocidad_angular', 'velocidad_maxima', 'velocidad_rotacion',
+    'fuerza', 'torque', 'centro_masas', 'tipo_luz', 'sombra',
+    'atenuacion_rolloff', 'escala_textura', 'desplazamiento_vertice',
+    'offset_malla', 'escala_malla'
+)
+
+# 🔥 Enums con namespace completo (los enums simples de suavizado se derivan de aquí)
+ENUM_MAPPINGS: Dict[str, str] = {
+    # Material enums
+    'material_plastico': 'Enum.Material.Plastic',
+    'metal': 'Enum.Material.Metal',
+    'madera': 'Enum.Material.Wood',
+    'cristal': 'Enum.Material.Glass',
+    'neon': 'Enum.Material.Neon',
+    
+    # EasingStyle enums
+    'estilo_suavizado.Linear': 'Enum.EasingStyle.Linear',
+    'estilo_suavizado.Sine': 'Enum.EasingStyle.Sine',
+    'estilo_suavizado.Back': 'Enum.EasingStyle.Back',
+    'estilo_suavizado.Quad': 'Enum.EasingStyle.Quad',
+    'estilo_suavizado.Quart': 'Enum.EasingStyle.Quart',
+    'estilo_suavizado.Quint': 'Enum.EasingStyle.Quint',
+    'estilo_suavizado.Expo': 'Enum.EasingStyle.Expo',
+    'estilo_suavizado.Circular': 'Enum.EasingStyle.Circular',
+    'estilo_suavizado.Elastic': 'Enum.EasingStyle.Elastic',
+    'estilo_suavizado.Bounce': 'Enum.EasingStyle.Bounce',
+    
+    # EasingDirection enums
+    'direccion_suavizado.In': 'Enum.EasingDirection.In',
+    'direccion_suavizado.Out': 'Enum.EasingDirection.Out',
+    'direccion_suavizado.InOut': 'Enum.EasingDirection.InOut',
+    
+    # PartType enums
+    'tipo_parte.Ball': 'Enum.PartType.Ball',
+    'tipo_parte.Block': 'Enum.PartType.Block',
+    'tipo_parte.Cylinder': 'Enum.PartType.Cylinder',
+    
+    # SurfaceType enums
+    'superficie_tipo.Smooth': 'Enum.SurfaceType.Smooth',
+    'superficie_tipo.Glue': 'Enum.SurfaceType.Glue',
+    
+    # Font enums
+    'fuente.Legacy': 'Enum.Font.Legacy',
+    'fuente.SourceSans': 'Enum.Font.SourceSans',
+    'fuente.SourceSansBold': 'Enum.Font.SourceSansBold',
+    'fuente.SourceSansLight': 'Enum.Font.SourceSansLight',
+    'fuente.SourceSansItalic': 'Enum.Font.SourceSansItalic',
+    'fuente.SourceSansBoldItalic': 'Enum.Font.SourceSansBoldItalic',
+    'fuente.Roboto': 'Enum.Font.Roboto',
+    'fuente.RobotoMono': 'Enum.Font.RobotoMono',
+    
+    # HumanoidStateType enums
+    'tipo_estado_humanoide.Running': 'Enum.HumanoidStateType.Running',
+    'tipo_estado_humanoide.Jumping': 'Enum.HumanoidStateType.Jumping',
+    'tipo_estado_humanoide.Freefall': 'Enum.HumanoidStateType.Freefall',
+    'tipo_estado_humanoide.Landed': 'Enum.HumanoidStateType.Landed',
+    'tipo_estado_humanoide.Swimming': 'Enum.HumanoidStateType.Swimming',
+    'tipo_estado_humanoide.Sitting': 'Enum.HumanoidStateType.Sitting',
+    'tipo_estado_humanoide.PlatformStanding': 'Enum.HumanoidStateType.PlatformStanding',
+    'tipo_estado_humanoide.Dead': 'Enum.HumanoidStateType.Dead',
+    
+    # UserInputType enums
+    'tipo_entrada.MouseButton1': 'Enum.UserInputType.MouseButton1',
+    'tipo_entrada.MouseButton2': 'Enum.UserInputType.MouseButton2',
+    'tipo_entrada.MouseButton3': 'Enum.UserInputType.MouseButton3',
+    'tipo_entrada.Keyboard': 'Enum.UserInputType.Keyboard',
+    'tipo_entrada.Touch': 'Enum.UserInputType.Touch',
+    
+    # UserInputState enums
+    'estado_entrada.Begin': 'Enum.UserInputState.Begin',
+    'estado_entrada.Change': 'Enum.UserInputState.Change',
+    'estado_entrada.End': 'Enum.UserInputState.End',
+    'estado_entrada.Cancel': 'Enum.UserInputState.Cancel'
+}
+
+# Constructores con nombre Roblox distinto al prefijo Vox (Prefijo_nuevo → Nombre.new)
+CONSTRUCTOR_NAMES: Dict[str, str] = {
+    'secuencia_color': 'ColorSequence',
+    'secuencia_numero': 'NumberSequence'
+}
+
+# Firmas de los constructores de Roblox: números de argumentos admitidos y
+# descripción para los mensajes. Cada constructor también se valida con su
+# forma Tipo_nuevo y con los alias del diccionario (instancia_nueva, info_tween).
+CONSTRUCTOR_SIGNATURES: Dict[str, Tuple[Tuple[int, ...], str]] = {
+    'Color3.new': ((0, 1, 2, 3), "r, g, b"),
+    'Vector3.new': ((0, 1, 2, 3), "x, y, z"),
+    'Vector2.new': ((0, 1, 2), "x, y"),
+    'UDim2.new': ((0, 1, 2, 3, 4), "escalaX, desplazamientoX, escalaY, desplazamientoY"),
+    'CFrame.new': ((0, 1, 2, 3, 7, 12), "posición[, mirar_a] | x, y, z[, qx, qy, qz, qw] | x, y, z, R00..R22"),
+    'TweenInfo.new': ((0, 1, 2, 3, 4, 5, 6), "tiempo, estilo, dirección, repeticiones, invertir, retraso"),
+    'Instance.new': ((1, 2), "clase[, padre]"),
+}
+
+# Funciones cuyo último argumento puede expandirse en varios valores
+MULTIPLE_VALUE_FUNCTIONS: Tuple[str, ...] = ('unpack', 'desempaquetar')
+
+# Lista de palabras prohibidas (seguridad)
+FORBIDDEN_WORDS: Tuple[str, ...] = (
+    'loadstring', 'getfenv', 'setfenv', 'rawget', 'rawset',
+    'rawequal', 'newproxy', 'debug', 'collectgarbage',
+    'dofile', 'require', 'package', 'module', 'coroutine',
+    'PostAsync', 'RequestAsync'
+)
+
+# Funciones seguras permitidas (actualizado para 1.2.6)
+SAFE_FUNCTIONS: Tuple[str, ...] = (
+    'pcall', 'xpcall', 'task_spawn', 'task_delay', 'task_wait',
+    'task_synchronize', 'task_desynchronize', 'task_defer'
+)
+
+# Funciones adicionales para DataStore (wrapper seguro)
+DATASTORE_FUNCTION_NAMES: Tuple[str, ...] = ('cargar_datos', 'guardar_datos', 'incrementar_datos')
+
+# Prefijos de enum que aceptan valores simples (estilo_suavizado.Quad)
+EASING_PREFIXES: Tuple[str, ...] = ('estilo_suavizado', 'direccion_suavizado')
+
+
+# Identificadores de un fragmento (misma definición de palabra que \b)
+_WORD_REGEX = re.compile(r'\w+')
+
+
+class PassTrigger:
+    """
+    Vocabulario que dispara una pasada de traducción
+    
+    Una pasada solo puede cambiar un fragmento si este contiene alguna de
+    sus palabras como identificador completo o alguna de sus subcadenas
+    (para patrones sin límite de palabra). Si no, la pasada se omite.
+    """
+    
+    __slots__ = ('name', 'words', 'substrings')
+    
+    def __init__(self, name: str, words: Iterable[str] = (), substrings: Iterable[str] = ()):
+        self.name = name
+        self.words = frozenset(words)
+        self.substrings = tuple(substrings)
+    
+    def matches(self, code: str, tokens: set) -> bool:
+        """True si la pasada puede modificar `code` (tokens = identificadores de code)"""
+        if not self.words.isdisjoint(tokens):
+            return True
+        for substring in self.substrings:
+            if substring in code:
+                return True
+        return False
+
+
+class RuleRegistry:
+    """
+    Registro inmutable de reglas precompiladas.
+
+    Se construye una sola vez al importar el módulo (RULES) y lo comparten
+    todas las instancias de LuaDSLTranspiler. Cada pasada recibe sus
+    patrones ya compilados, sin depender de la caché interna de `re`
+    (que tiene menos entradas que patrones distintos usan las pasadas).
     
+    Lo que solo usan algunas invocaciones se compila bajo demanda: los
+    patrones de cada pasada de la cascada, la primera vez que se pide alguno
+    (ver _PASS_BUILDERS), keyword_regex y el motor de una sola pasada. Así los
+    diagnósticos, el servidor y los motores single_pass y ast no compilan
+    las tablas de la cascada.
+    """
+
+    __slots__ = (
+        'translation', 'keywords', 'global_functions', 'methods', 'services',
+        'properties', 'math', 'enums', 'simple_enums', 'constructors',
+        'forbidden_words', 'safe_functions', 'datastore_functions',
+        'forbidden_scanner', 'service_rules', 'service_call_regex', 'method_rules',
+        'arity_validator', 'constructor_regex',
+        'instance_regex', 'property_rules', 'math_rules', 'enum_rules',
+        'simple_enum_rules', 'brick_color_regex', 'elseif_then_regex',
+        'elseif_regex', 'global_function_rules', 'keyword_rules', 'pass_triggers',
+        '_keyword_regex', '_single_pass', '_fingerprint', '_frozen'
+    )
+
+    # Patrones de cada pasada de la cascada: atributo -> método que los construye
+    _PASS_BUILDERS = {
+        'service_rules': '_service_pass', 'service_call_regex': '_service_pass',
+        'method_rules': '_method_pass',
+        'constructor_regex': '_constructor_pass', 'instance_regex': '_constructor_pass',
+        'property_rules': '_property_pass', 'math_rules': '_property_pass',
+        'enum_rules': '_enum_pass', 'simple_enum_rules': '_enum_pass', 'brick_color_regex': '_enum_pass',
+        'elseif_then_regex': '_keyword_pass', 'elseif_regex': '_keyword_pass',
+        'global_function_rules': '_keyword_pass', 'keyword_rules': '_keyword_pass',
+    }
+
+    # Atributos calculados bajo demanda, asignables tras congelar el registro
+    _LAZY_SLOTS = frozenset(('_keyword_regex', '_single_pass', '_fingerprint', *_PASS_BUILDERS))
+
     def __init__(self):
-        """Inicializa el transpilador con diccionarios de traducción y palabras prohibidas"""
-        
-        # Diccionario principal de traducción español -> inglés
-        self.translation_dict: Dict[str, str] = {
-            # Estructuras de control
-            'funcion': 'function',
-            'fin': 'end',
-            'si': 'if',
-            'entonces': 'then',
-            'sino': 'else',
-            'sino_si': 'elseif',
-            'mientras': 'while',
-            'hacer': 'do',
-            'para': 'for',
-            'en': 'in',
-            'retornar': 'return',
-            'local': 'local',
-            'y': 'and',
-            'o': 'or',
-            'no': 'not',
-            'verdadero': 'true',
-            'falso': 'false',
-            'imprimir': 'print',
-            'advertar': 'warn',
-            'esperar': 'wait',
-            'tick': 'tick',
-            'time': 'time',
-            'tipo': 'type',
-            'pares': 'pairs',
-            'ipares': 'ipairs',
-            'nulo': 'nil',
-            'romper': 'break',
-            'continuar': 'continue',
-            'repetir': 'repeat',
-            'hasta': 'until',
-            
-            # Funciones seguras adicionales
-            'pcall': 'pcall',
-            'xpcall': 'xpcall',
-            'task_spawn': 'task.spawn',
-            'task_delay': 'task.delay',
-            'task_wait': 'task.wait',
-            'task_synchronize': 'task.synchronize',
-            'task_desynchronize': 'task.desynchronize',
-            'task_defer': 'task.defer',
-            'cargar_datos': 'function(store, key) return store:GetAsync(key) end',
-            'guardar_datos': 'function(store, key, value) return store:SetAsync(key, value) end',
-            'incrementar_datos': 'function(store, key, delta) return store:IncrementAsync(key, delta) end',
-            
-            # Funciones de tarea y tiempo
-            'tarea_espera': 'task.wait',
-            'tarea_spawn': 'task.spawn',
-            'tarea_delay': 'task.delay',
-            'tarea_defer': 'task.defer',
-            
-            # Funciones de Tween y animación
-            'servicio_tween': 'TweenService',
-            'info_tween': 'TweenInfo.new',
-            'estilo_suavizado': 'Enum.EasingStyle',
-            'direccion_suavizado': 'Enum.EasingDirection',
-            
-            # Funciones de espera y tiempo
-            'esperar_hijo': 'WaitForChild',
-            'encontrar_hijo': 'FindFirstChild',
-            
-            # Roblox Services (seguros)
-            'juego': 'game',
-            'espacio_trabajo': 'Workspace',
-            'jugadores': 'Players',
-            'luz': 'Lighting',
-            'sonido': 'SoundService',
-            'replicacion': 'ReplicatedStorage',
-            'servidor_script': 'ServerScriptService',
-            'servidor_almacen': 'ServerStorage',
-            'tienda_datos': 'DataStoreService',
-            'servicio_tween': 'TweenService',
-            'servicio_http': 'HttpService',
-            'servicio_mensajes': 'MessagingService',
-            'servicio_teletransporte': 'TeleportService',
-            'servicio_chat': 'Chat',
-            'servicio_gui': 'GuiService',
-            'servicio_entrada': 'UserInputService',
-            'servicio_context': 'ContextActionService',
-            'servicio_sonido': 'SoundService',
-            'servicio_fisica': 'PhysicsService',
-            'servicio_carga': 'ContentProvider',
-            'servicio_recursos': 'HttpService',
-            
-            # Instancias comunes
-            'instancia_nueva': 'Instance.new',
-            'parte': 'Part',
-            'malla_parte': 'MeshPart',
-            'parte_cuña': 'WedgePart',
-            'parte_esquina': 'CornerWedgePart',
-            'modelo': 'Model',
-            'script': 'Script',
-            'script_local': 'LocalScript',
-            'script_modulo': 'ModuleScript',
-            'texto_cadena': 'StringValue',
-            'numero_valor': 'NumberValue',
-            'booleano_valor': 'BoolValue',
-            'objeto_valor': 'ObjectValue',
-            'marco_valor': 'CFrameValue',
-            'vector3_valor': 'Vector3Value',
-            'color3_valor': 'Color3Value',
-            'ladrillo_color_valor': 'BrickColorValue',
-            'entero_valor': 'IntValue',
-            'doble_valor': 'DoubleValue',
-            'angulo_valor': 'NumberSequenceValue',
-            'color_secuencia_valor': 'ColorSequenceValue',
-            
-            # UI Elements
-            'marco': 'Frame',
-            'etiqueta_texto': 'TextLabel',
-            'boton_texto': 'TextButton',
-            'boton_imagen': 'ImageButton',
-            'marco_desplazamiento': 'ScrollingFrame',
-            'caja_texto': 'TextBox',
-            'marco_video': 'VideoFrame',
-            'imagen': 'ImageLabel',
-            'lista_desplazamiento': 'ScrollingFrame',
-            'barra_desplazamiento': 'ScrollBar',
-            'gui_pantalla': 'ScreenGui',
-            'gui_billetera': 'BillboardGui',
-            'gui_superficie': 'SurfaceGui',
-            'gui_mapa': 'ViewportFrame',
-            'caja_seleccion': 'SelectionBox',
-            'caja_resalte': 'Highlight',
-            
-            # Propiedades básicas
-            'nombre': 'Name',
-            'padre': 'Parent',
-            'tamano': 'Size',
-            'posicion': 'Position',
-            'color_fondo': 'BackgroundColor3',
-            'texto': 'Text',
-            'color_texto': 'TextColor3',
-            'transparencia_fondo': 'BackgroundTransparency',
-            'escalado_texto': 'TextScaled',
-            'visible': 'Visible',
-            'anclado': 'Anchored',
-            'transparencia': 'Transparency',
-            'color': 'Color3',
-            'material': 'Material',
-            'reflejo': 'Reflectance',
-            'forma': 'Shape',
-            'superficie': 'TopSurface',
-            'superficie_inferior': 'BottomSurface',
-            'frente': 'FrontSurface',
-            'atras': 'BackSurface',
-            'izquierda': 'LeftSurface',
-            'derecha': 'RightSurface',
-            'puede_colisionar': 'CanCollide',
-            'masa': 'Mass',
-            'densidad': 'Density',
-            'friccion': 'Friction',
-            'elasticidad': 'Elasticity',
-            'resistencia_friction': 'FrictionWeight',
-            'resistencia_elasticidad': 'ElasticityWeight',
-            
-            # Propiedades de Humanoid
-            'humanoide': 'Humanoid',
-            'parte_primaria': 'PrimaryPart',
-            'salud': 'Health',
-            'salud_maxima': 'MaxHealth',
-            'velocidad_caminar': 'WalkSpeed',
-            'poder_salto': 'JumpPower',
-            'altura_salto': 'JumpHeight',
-            'estado_movimiento': 'MoveState',
-            'estado_sitio': 'Sit',
-            'estado_saltando': 'Jump',
-            'estado_cayendo': 'Freefall',
-            'estado_aterrizando': 'Landed',
-            'tipo_cuerpo': 'BodyType',
-            'tipo_estado': 'BodyPartType',
-            'escalado_altura': 'HipHeight',
-            'ancho_hombros': 'ShoulderWidth',
-            'profundidad_cabeza': 'HeadScale',
-            'escalado_cuerpo': 'BodyDepthScale',
-            'escalado_ancho': 'BodyWidthScale',
-            'escalado_altura_cuerpo': 'BodyHeightScale',
-            
-            # Propiedades de UI
-            'posicion_udim2': 'UDim2',
-            'tamano_udim2': 'UDim2',
-            'borde_pixel': 'BorderSizePixel',
-            'radio_esquina': 'CornerRadius',
-            'recorte': 'ClipsDescendants',
-            'seleccionable': 'Selectable',
-            'modo_seleccion': 'SelectionMode',
-            'orden_z': 'ZIndex',
-            'layout': 'LayoutOrder',
-            'alineamiento': 'Alignment',
-            'alineamiento_vertical': 'VerticalAlignment',
-            'alineamiento_horizontal': 'HorizontalAlignment',
-            'relleno': 'Padding',
-            'espaciado': 'Spacing',
-            'relleno_superior': 'PaddingTop',
-            'relleno_inferior': 'PaddingBottom',
-            'relleno_izquierdo': 'PaddingLeft',
-            'relleno_derecho': 'PaddingRight',
-            'fuente': 'Font',
-            'tamano_fuente': 'FontSize',
-            'peso_fuente': 'FontWeight',
-            'estilo_fuente': 'FontStyle',
-            'linea_texto': 'TextWrap',
-            'ajuste_texto': 'TextWrapped',
-            'texto_truncado': 'TextTruncate',
-            'alineacion_texto': 'TextXAlignment',
-            'alineacion_texto_vertical': 'TextYAlignment',
-            'color_borde': 'BorderColor3',
-            'transparencia_borde': 'BorderTransparency',
-            
-            # Tipos y constructores
-            'UDim2_nuevo': 'UDim2.new',
-            'Vector3_nuevo': 'Vector3.new',
-            'Vector2_nuevo': 'Vector2.new',
-            'Color3_nuevo': 'Color3.new',
-            'CFrame_nuevo': 'CFrame.new',
-            'CFrame_angulos': 'CFrame.Angles',
-            'secuencia_color': 'ColorSequence.new',
-            'secuencia_numero': 'NumberSequence.new',
-            'punto_secuencia_numero': 'NumberSequenceKeypoint.new',
-            'punto_secuencia_color': 'ColorSequenceKeypoint.new',
-            'rango_numero': 'NumberRange.new',
-            'rango_color': 'ColorRange.new',
-            'ladrillo_color': 'BrickColor.new',
-            'ladrillo_color_random': 'BrickColor.random',
-            'ruido_perlin': 'math.noise',
-            'aleatorio': 'math.random',
-            'semilla_aleatoria': 'math.randomseed',
-            'absoluto': 'math.abs',
-            'techo': 'math.ceil',
-            'piso': 'math.floor',
-            'maximo': 'math.max',
-            'minimo': 'math.min',
-            'redondear': 'math.round',
-            'potencia': 'math.pow',
-            'raiz': 'math.sqrt',
-            'grados_a_radianes': 'math.deg',
-            'radianes_a_grados': 'math.rad',
-            'pi': 'math.pi',
-            'infinito': 'math.huge',
-            'exp': 'math.exp',
-            'log': 'math.log',
-            'log10': 'math.log10',
-            'sin': 'math.sin',
-            'cos': 'math.cos',
-            'tan': 'math.tan',
-            'asin': 'math.asin',
-            'acos': 'math.acos',
-            'atan': 'math.atan',
-            'atan2': 'math.atan2',
-            'sinh': 'math.sinh',
-            'cosh': 'math.cosh',
-            'tanh': 'math.tanh',
-            
-            # Enums principales
-            'direccion_suavizado': 'Enum.EasingDirection',
-            'estilo_suavizado': 'Enum.EasingStyle',
-            'eje': 'Enum.Axis',
-            'tipo_normal': 'Enum.NormalId',
-            'forma_material': 'Enum.FormFactor',
-            'tipo_parte': 'Enum.PartType',
-            'material': 'Enum.Material',
-            'forma': 'Enum.Shape',
-            'superficie_tipo': 'Enum.SurfaceType',
-            'fuente': 'Enum.Font',
-            'tamano_fuente': 'Enum.FontSize',
-            'tipo_cuerpo': 'Enum.BodyPartType',
-            'tipo_estado_humanoide': 'Enum.HumanoidStateType',
-            'tipo_animacion': 'Enum.AnimationPriority',
-            'tipo_interpolacion': 'Enum.InterpolationStyle',
-            'direccion_interpolacion': 'Enum.InterpolationDirection',
-            'tipo_mensaje': 'Enum.MessageType',
-            'tipo_entrada': 'Enum.UserInputType',
-            'estado_entrada': 'Enum.UserInputState',
-            'tipo_gesto': 'Enum.PlayerGestureType',
-            'tipo_animacion_r': 'Enum.AnimationStatus',
-            'tipo_camara': 'Enum.CameraType',
-            'modo_camara': 'Enum.CameraMode',
-            'tipo_foco': 'Enum.FocusType',
-            
-            # Métodos comunes de objetos
-            'obtener_servicio': 'GetService',
-            'encontrar_hijo': 'FindFirstChild',
-            'esperar_hijo': 'WaitForChild',
-            'obtener_hijos': 'GetChildren',
-            'obtener_descendientes': 'GetDescendants',
-            'es_ancestro': 'IsAncestorOf',
-            'es_descendiente': 'IsDescendantOf',
-            'clonar': 'Clone',
-            'destruir': 'Destroy',
-            'conectar': 'Connect',
-            'desconectar': 'Disconnect',
-            'desconectar_todo': 'DisconnectAll',
-            'esperar': 'Wait',
-            'emitir': 'Emit',
-            'jugar': 'Play',
-            'pausar': 'Pause',
-            'detener': 'Stop',
-            'reanudar': 'Resume',
-            'volumen': 'Volume',
-            'tiempo_posicion': 'TimePosition',
-            'duracion': 'TimeLength',
-            'id_sonido': 'SoundId',
-            'id_imagen': 'Image',
-            'id_malla': 'MeshId',
-            'id_textura': 'TextureID',
-            'aplicar_impulso': 'ApplyImpulse',
-            'aplicar_fuerza': 'ApplyForce',
-            'aplicar_torque': 'ApplyTorque',
-            'aplicar_velocidad_angular': 'ApplyAngularImpulse',
-            'velocidad': 'Velocity',
-            'velocidad_angular': 'AngularVelocity',
-            'velocidad_maxima': 'MaxVelocity',
-            'velocidad_rotacion': 'RotVelocity',
-            'fuerza': 'Force',
-            'torque': 'Torque',
-            'densidad': 'Density',
-            'masa': 'Mass',
-            'centro_masas': 'CenterOfMass',
-            
-            # Métodos de Tween
-            'crear_tween': 'Create',
-            'info_tween': 'TweenInfo.new',
-            'completado': 'Completed',
-            'estado_tween': 'PlaybackState',
-            'tiempo_reproduccion': 'TweenTime',
-            'tiempo_actual': 'CurrentTime',
-            
-            # Métodos de Players
-            'obtener_jugadores': 'GetPlayers',
-            'jugador_local': 'LocalPlayer',
-            'personaje': 'Character',
-            'cargar_personaje': 'LoadCharacter',
-            'quitar_personaje': 'RemoveCharacter',
-            'distancia_de_camara': 'CameraMaxZoomDistance',
-            'distancia_minima_camara': 'CameraMinZoomDistance',
-            'modo_camara': 'CameraMode',
-            'tipo_camara': 'CameraType',
-            
-            # Métodos de Humanoid
-            'mover': 'Move',
-            'saltar': 'Jump',
-            'sentar': 'Sit',
-            'levantar': 'Stand',
-            'plataforma_elevada': 'PlatformStand',
-            'requiere_plataforma_elevada': 'RequiresNeck',
-            'salto_automatico': 'AutoJump',
-            'tipo_movimiento': 'MoveDirection',
-            'velocidad_movimiento': 'WalkSpeed',
-            'poder_salto': 'JumpPower',
-            'altura_salto': 'JumpHeight',
-            'estado_actual': 'GetState',
-            'cambiar_estado': 'ChangeState',
-            
-            # Métodos de UI
-            'capturar_foco': 'CaptureFocus',
-            'liberar_foco': 'ReleaseFocus',
-            'perder_foco': 'FocusLost',
-            'ganar_foco': 'Focused',
-            'texto_cambiado': 'TextChanged',
-            'texto_focalizado': 'Focused',
-            'texto_perdido_foco': 'FocusLost',
-            
-            # Eventos comunes
-            'conectado': 'Connected',
-            'desconectado': 'Disconnected',
-            'agregado': 'Added',
-            'eliminado': 'Removed',
-            'cambiado': 'Changed',
-            'tocado': 'Touched',
-            'tocar_terminado': 'TouchEnded',
-            'presionado': 'Pressed',
-            'liberado': 'Released',
-            'movido': 'Moved',
-            'clic_izquierdo': 'MouseButton1Down',
-            'clic_izquierdo_soltado': 'MouseButton1Up',
-            'clic_derecho': 'MouseButton2Down',
-            'clic_derecho_soltado': 'MouseButton2Up',
-            'clic_medio': 'MouseButton3Down',
-            'clic_medio_soltado': 'MouseButton3Up',
-            'rueda_mouse': 'MouseWheel',
-            'mouse_movido': 'MouseMoved',
-            'mouse_entro': 'MouseEnter',
-            'mouse_salio': 'MouseLeave',
-            'tecla_presionada': 'KeyDown',
-            'tecla_liberada': 'KeyUp',
-            'entrada_comenzo': 'InputBegan',
-            'input_termino': 'InputEnded',
-            'input_cambiado': 'InputChanged',
-            
-            # Propiedades de Part
-            'posicion': 'Position',
-            'tamano': 'Size',
-            'color': 'Color3',
-            'material': 'Material',
-            'reflejo': 'Reflectance',
-            'transparencia': 'Transparency',
-            'anclado': 'Anchored',
-            'puede_colisionar': 'CanCollide',
-            'masa': 'Mass',
-            'densidad': 'Density',
-            'friccion': 'Friction',
-            'elasticidad': 'Elasticity',
-            'forma': 'Shape',
-            'superficie': 'TopSurface',
-            'superficie_inferior': 'BottomSurface',
-            'frente': 'FrontSurface',
-            'atras': 'BackSurface',
-            'izquierda': 'LeftSurface',
-            'derecha': 'RightSurface',
-            
-            # Propiedades de Light
-            'tipo_luz': 'LightType',
-            'brillo': 'Brightness',
-            'color_luz': 'Color',
-            'sombra': 'Shadows',
-            'rango': 'Range',
-            'angulo': 'Angle',
-            'atenuacion': 'Falloff',
-            'habilitado': 'Enabled',
-            
-            # Propiedades de Sound
-            'id_sonido': 'SoundId',
-            'volumen': 'Volume',
-            'tiempo_posicion': 'TimePosition',
-            'duracion': 'TimeLength',
-            'pitch': 'Pitch',
-            'loop': 'Looped',
-            'jugando': 'Playing',
-            'distancia_maxima': 'MaxDistance',
-            'distancia_minima': 'MinDistance',
-            'atenuacion_rolloff': 'RollOffMode',
-            'efecto_sonido': 'SoundEffect',
-            'reverb': 'ReverbSoundEffect',
-            'eco': 'EchoSoundEffect',
-            'distorsion': 'DistortionSoundEffect',
-            'compresor': 'CompressorSoundEffect',
-            
-            # Propiedades de Mesh
-            'id_malla': 'MeshId',
-            'id_textura': 'TextureID',
-            'escala_textura': 'TextureSize',
-            'desplazamiento_vertice': 'VertexColor',
-            'offset_malla': 'Offset',
-            'escala_malla': 'Scale',
-            
-            # Funciones de tabla
-            'insertar': 'table.insert',
-            'remover': 'table.remove',
-            'ordenar': 'table.sort',
-            'concatenar': 'table.concat',
-            'longitud': '#',
-            'vaciar': 'table.clear',
-            'encontrar': 'table.find',
-            'copiar': 'table.copy',
-            'fusionar': 'table.merge',
-            'congelar': 'table.freeze',
-            'esta_congelado': 'table.isfrozen',
-            'empaquetar': 'table.pack',
-            'desempaquetar': 'table.unpack',
-            
-            # Funciones de math (CORREGIDAS)
-            'piso': 'math.floor',
-            'techo': 'math.ceil',
-            'absoluto': 'math.abs',
-            'maximo': 'math.max',
-            'minimo': 'math.min',
-            'redondear': 'math.round',
-            'potencia': 'math.pow',
-            'raiz': 'math.sqrt',
-            'grados_a_radianes': 'math.deg',
-            'radianes_a_grados': 'math.rad',
-            'aleatorio': 'math.random',
-            'semilla_aleatoria': 'math.randomseed',
-            'ruido_perlin': 'math.noise',
-            'pi': 'math.pi',
-            'infinito': 'math.huge',
-            'exp': 'math.exp',
-            'log': 'math.log',
-            'log10': 'math.log10',
-            'sin': 'math.sin',
-            'cos': 'math.cos',
-            'tan': 'math.tan',
-            'asin': 'math.asin',
-            'acos': 'math.acos',
-            'atan': 'math.atan',
-            'atan2': 'math.atan2',
-            'sinh': 'math.sinh',
-            'cosh': 'math.cosh',
-            'tanh': 'math.tanh',
+        """Construye las tablas derivadas (los patrones de las pasadas se compilan al usarse)"""
+        translation = dict(_TRANSLATION_ENTRIES)
+
+        def frozen(mapping):
+            return MappingProxyType(dict(mapping))
+
+        # Tablas (vistas de solo lectura)
+        self.translation = frozen(translation)
+        self.keywords = frozen((kw, translation[kw]) for kw in KEYWORDS if kw in translation)
+        self.global_functions = frozen((name, translation[name]) for name in GLOBAL_FUNCTION_NAMES)
+        self.methods = frozen((name, translation[name]) for name in METHOD_NAMES)
+        self.services = frozen((name, translation[name]) for name in SERVICE_NAMES)
+        self.properties = frozen((prop, translation[prop]) for prop in PROPERTY_NAMES if prop in translation)
+        self.math = frozen((name, value[len('math.'):]) for name, value in translation.items()
+                           if value.startswith('math.'))
+        self.enums = frozen(ENUM_MAPPINGS)
+        self.simple_enums = frozen((key.split('.', 1)[1], value) for key, value in ENUM_MAPPINGS.items()
+                                   if key.split('.', 1)[0] in EASING_PREFIXES)
+        self.constructors = frozen(CONSTRUCTOR_NAMES)
+        self.forbidden_words = FORBIDDEN_WORDS
+        self.forbidden_scanner = ForbiddenWordScanner(FORBIDDEN_WORDS)
+        self.safe_functions = SAFE_FUNCTIONS
+        self.datastore_functions = frozen((name, translation[name]) for name in DATASTORE_FUNCTION_NAMES)
+
+        # Pasada 3: validación de aridad (también la usan los diagnósticos y
+        # los motores single_pass y ast)
+        aliases = {}
+        for constructor in CONSTRUCTOR_SIGNATURES:
+            aliases[constructor] = constructor
+            aliases[constructor.replace('.new', '_nuevo')] = constructor
+        for spanish, english in translation.items():
+            if english in CONSTRUCTOR_SIGNATURES:
+                aliases[spanish] = english
+        self.arity_validator = ArityValidator(CONSTRUCTOR_SIGNATURES, aliases)
+
+        # Vocabulario disparador de cada pasada (en orden de ejecución)
+        self.pass_triggers = MappingProxyType({
+            'servicios': PassTrigger('servicios', substrings=('obtener_servicio',)),
+            'metodos': PassTrigger('metodos', words=self.methods),
+            'constructores': PassTrigger('constructores', substrings=('instancia_nueva',) + self.arity_validator.triggers),
+            'propiedades': PassTrigger('propiedades', words=list(self.properties) + list(self.math)),
+            'enums': PassTrigger(
+                'enums',
+                # \bclave\b: el primer identificador de la clave aparece completo
+                words=(_WORD_REGEX.match(key).group() for key in self.enums),
+                # Los prefijos de suavizado y _brillante no llevan \b a la izquierda
+                substrings=EASING_PREFIXES + ('_brillante',),
+            ),
+            'palabras_clave': PassTrigger(
+                'palabras_clave', words=list(self.keywords) + list(self.global_functions) + ['sino']
+            ),
+        })
+
+        self._keyword_regex = None
+        self._single_pass = None
+        self._fingerprint = None
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False) and name not in self._LAZY_SLOTS:
+            raise AttributeError("RuleRegistry es inmutable")
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # Solo se llama si el atributo no existe: compila la pasada a la que pertenece
+        builder = self._PASS_BUILDERS.get(name)
+        if builder is None:
+            raise AttributeError(f"'RuleRegistry' no tiene el atributo '{name}'")
+        for attribute, value in getattr(self, builder)(re.compile).items():
+            setattr(self, attribute, value)
+        return object.__getattribute__(self, name)
+
+    def _compiled(self, name: str):
+        """Valor de un atributo perezoso sin compilarlo (None si aún no existe)"""
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return None
+
+    @property
+    def pattern_count(self) -> int:
+        """Número de expresiones regulares compiladas hasta ahora por el registro"""
+        count = 4  # Palabras prohibidas y las tres de la validación de aridad
+        for name in self._PASS_BUILDERS:
+            value = self._compiled(name)
+            if isinstance(value, re.Pattern):
+                count += 1
+            elif value is not None:
+                count += sum(isinstance(part, re.Pattern) for rule in value for part in rule)
+        return (
+            count
+            + (1 if self._keyword_regex is not None else 0)
+            + (1 if self._single_pass is not None else 0)
+        )
+
+    # Constructores de los patrones de cada pasada. `compile` es re.compile, o
+    # str para obtener el texto de los patrones sin compilarlos (fingerprint)
+
+    def _service_pass(self, compile) -> Dict[str, object]:
+        return {
+            'service_rules': tuple(
+                (compile(rf'obtener_servicio\(\s*"{spanish}"\s*\)'), f'game:GetService("{english}")')
+                for spanish, english in self.services.items()
+            ),
+            'service_call_regex': compile(r'\bobtener_servicio\b'),
         }
-        
-        # Lista de palabras prohibidas (seguridad)
-        self.forbidden_words: List[str] = [
-            'loadstring', 'getfenv', 'setfenv', 'rawget', 'rawset', 
-            'rawequal', 'newproxy', 'debug', 'collectgarbage',
-            'dofile', 'require', 'package', 'module', 'coroutine',
-            'PostAsync', 'RequestAsync'
-        ]
-        
-        # Funciones seguras permitidas (actualizado para 1.2.6)
-        self.safe_functions: List[str] = [
-            'pcall', 'xpcall', 'task_spawn', 'task_delay', 'task_wait', 
-            'task_synchronize', 'task_desynchronize', 'task_defer'
-        ]
-        
-        # Funciones adicionales para DataStore (wrapper seguro)
-        self.datastore_functions: Dict[str, str] = {
-            'cargar_datos': 'function(store, key) return store:GetAsync(key) end',
-            'guardar_datos': 'function(store, key, value) return store:SetAsync(key, value) end',
-            'incrementar_datos': 'function(store, key, delta) return store:IncrementAsync(key, delta) end'
+
+    def _method_pass(self, compile) -> Dict[str, object]:
+        # objeto:metodo( y evento .Evento:metodo(
+        return {
+            'method_rules': tuple(
+                (compile(r':\s*' + re.escape(spanish) + r'\s*\('),
+                 compile(r'\.\w+:\s*' + re.escape(spanish) + r'\s*\('),
+                 f':{english}(')
+                for spanish, english in self.methods.items()
+            ),
+        }
+
+    def _constructor_pass(self, compile) -> Dict[str, object]:
+        # Color3.new, Color3_nuevo, instancia_nueva...
+        return {
+            'constructor_regex': compile(r'(\w+)_nuevo\s*\('),
+            'instance_regex': compile(r'instancia_nueva\s*\('),
+        }
+
+    def _property_pass(self, compile) -> Dict[str, object]:
+        # Propiedades y miembros de math
+        return {
+            'property_rules': tuple(
+                (compile(r'\.' + re.escape(prop) + r'\b'), '.' + english)
+                for prop, english in self.properties.items()
+            ),
+            'math_rules': tuple(
+                (compile(r'math\.' + re.escape(spanish) + r'\b'), f'math.{english}')
+                for spanish, english in self.math.items()
+            ),
+        }
+
+    def _enum_pass(self, compile) -> Dict[str, object]:
+        prefixes = '|'.join(EASING_PREFIXES)
+        return {
+            'enum_rules': tuple(
+                (compile(r'\b' + re.escape(spanish) + r'\b'), english)
+                for spanish, english in self.enums.items()
+            ),
+            'simple_enum_rules': tuple(
+                (compile(r'(?:' + prefixes + r')\.(\b' + re.escape(simple) + r'\b)'), full)
+                for simple, full in self.simple_enums.items()
+            ),
+            'brick_color_regex': compile(r'(\w+)_brillante'),
+        }
+
+    def _keyword_pass(self, compile) -> Dict[str, object]:
+        return {
+            'elseif_then_regex': compile(r'\bsino\b\s+\bsi\b\s+\bentonces\b'),
+            'elseif_regex': compile(r'\bsino\b\s+\bsi\b'),
+            'global_function_rules': tuple(
+                (compile(r'\b' + re.escape(spanish) + r'\b(?=\s*\()'), english)
+                for spanish, english in self.global_functions.items()
+            ),
+            'keyword_rules': tuple(
+                (compile(r'\b' + re.escape(keyword) + r'\b'), english)
+                for keyword, english in self.keywords.items()
+            ),
         }
+
+    def _keyword_pattern(self) -> str:
+        return r'\b(' + '|'.join(map(re.escape, self.translation)) + r')\b'
+
+    @property
+    def keyword_regex(self) -> re.Pattern:
+        """Patrón que detecta cualquier palabra clave completa (perezoso)"""
+        if self._keyword_regex is None:
+            self._keyword_regex = re.compile(self._keyword_pattern(), re.IGNORECASE)
+        return self._keyword_regex
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash SHA-256 de las tablas y patrones activos
         
-        # Pre-compilar expresiones regulares
-        self._compile_patterns()
+        Cambia con cualquier modificación de las reglas, por lo que sirve para
+        invalidar resultados guardados por compilaciones incrementales.
+        """
+        if self._fingerprint is None:
+            # Texto de los patrones de las pasadas, sin compilarlas
+            sources = {}
+            for builder in dict.fromkeys(self._PASS_BUILDERS.values()):
+                sources.update(getattr(self, builder)(str))
+            patterns = [self._keyword_pattern()]
+            for name in self.__slots__:
+                value = sources.get(name)
+                if isinstance(value, str):
+                    patterns.append(value)
+                elif value:
+                    for rule in value:
+                        patterns.extend(rule)
+            tables = {
+                'translation': sorted(self.translation.items()),
+                'keywords': sorted(self.keywords.items()),
+                'enums': sorted(self.enums.items()),
+                'constructors': sorted(self.constructors.items()),
+                'constructor_signatures': sorted(self.arity_validator.signatures.items()),
+                'constructor_aliases': sorted(self.arity_validator.aliases.items()),
+                'forbidden_words': list(self.forbidden_words),
+                'patterns': patterns,
+            }
+            encoded = json.dumps(tables, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            self._fingerprint = _sha256(encoded)
+        return self._fingerprint
+
+    @property
+    def single_pass(self) -> 'SinglePassRewriter':
+        """Motor de una sola pasada compilado a partir de este registro (perezoso)"""
+        if self._single_pass is None:
+            self._single_pass = SinglePassRewriter(self)
+        return self._single_pass
+
+
+# ============================================================================
+# ANALIZADOR LÉXICO
+# ============================================================================
+
+class TokenKind(Enum):
+    """Tipos de token del analizador léxico"""
+    CODE = "CODIGO"
+    STRING = "STRING"
+    LONG_STRING = "STRING_LARGO"
+    COMMENT = "COMENTARIO"
+    LONG_COMMENT = "COMENTARIO_LARGO"
+    NEWLINE = "SALTO_LINEA"
+
+
+class Token:
+    """Token compacto: tipo y desplazamientos dentro del código fuente"""
+    
+    __slots__ = ('kind', 'start', 'end', 'line', 'closed')
+    
+    def __init__(self, kind: TokenKind, start: int, end: int, line: int, closed: bool = True):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.line = line      # Línea (base 1) donde empieza el token
+        self.closed = closed  # False para strings/comentarios largos sin cerrar
+    
+    def text(self, source: str) -> str:
+        """Devuelve el texto del token dentro de `source`"""
+        return source[self.start:self.end]
+    
+    def __repr__(self) -> str:
+        return f"Token({self.kind.name}, {self.start}, {self.end}, línea={self.line})"
+
+
+_NEWLINE_REGEX = re.compile(r'\n')
+
+# Próximo punto donde el código deja de ser código: string, comentario, string largo o salto
+_CODE_STOP_REGEX = re.compile(r'["\'\n]|--|\[=*\[')
+_LONG_BRACKET_REGEX = re.compile(r'\[(=*)\[')
+_SHORT_STRING_REGEX = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\[\s\S])*(")?'),
+    "'": re.compile(r"'(?:[^'\\\n]|\\[\s\S])*(')?"),
+}
+
+
+def tokenize(source: str, line: int = 1) -> Iterator[Token]:
+    """
+    Divide el código fuente en tokens sin copiar texto
     
-    def _compile_patterns(self):
-        """Pre-compila las expresiones regulares usadas en el transpilador"""
+    Mantiene el estado léxico entre líneas: los strings y comentarios largos
+    ([[ ]], [==[ ]==], --[[ ]]) pueden abarcar varias líneas. Los tokens CODE
+    nunca contienen saltos de línea; cada salto fuera de un string o
+    comentario largo es un token NEWLINE propio.
+    
+    Args:
+        source: Código fuente completo
+        line: Número de la primera línea
         
-        # Patrón para detectar palabras clave completas (con límites de palabra)
-        keyword_pattern = r'\b(' + '|'.join(map(re.escape, self.translation_dict.keys())) + r')\b'
-        self.keyword_regex = re.compile(keyword_pattern, re.IGNORECASE)
+    Yields:
+        Tokens en orden; concatenar sus textos reproduce `source`
+    """
+    pos = 0
+    length = len(source)
+    search = _CODE_STOP_REGEX.search
     
-    def translate_keyword(self, match: re.Match) -> str:
-        """
-        Traduce una palabra clave encontrada
+    while pos < length:
+        match = search(source, pos)
+        if match is None:
+            yield Token(TokenKind.CODE, pos, length, line)
+            return
         
-        Args:
-            match: Match de la expresión regular
-            
-        Returns:
-            Palabra traducida
-        """
-        keyword = match.group(0)
-        translated = self.translation_dict.get(keyword.lower(), keyword)
+        start = match.start()
+        if start > pos:
+            yield Token(TokenKind.CODE, pos, start, line)
         
-        # Si la traducción empieza con . o :, mantener el contexto
-        if translated.startswith(('.', ':')):
-            return translated
+        lexeme = match.group()
+        if lexeme == '\n':
+            yield Token(TokenKind.NEWLINE, start, start + 1, line)
+            line += 1
+            pos = start + 1
+            continue
+        
+        if lexeme == '"' or lexeme == "'":
+            # String corto con escapes (\" y \ + salto de línea incluidos)
+            string_match = _SHORT_STRING_REGEX[lexeme].match(source, start)
+            end = string_match.end()
+            yield Token(TokenKind.STRING, start, end, line, string_match.group(1) is not None)
+        elif lexeme == '--':
+            bracket = _LONG_BRACKET_REGEX.match(source, start + 2)
+            if bracket is None:
+                # Comentario de línea: termina antes del salto
+                end = source.find('\n', start)
+                if end < 0:
+                    end = length
+                yield Token(TokenKind.COMMENT, start, end, line)
+            else:
+                end, closed = _long_bracket_end(source, bracket.end(), bracket.group(1))
+                yield Token(TokenKind.LONG_COMMENT, start, end, line, closed)
         else:
-            return translated
+            end, closed = _long_bracket_end(source, match.end(), lexeme[1:-1])
+            yield Token(TokenKind.LONG_STRING, start, end, line, closed)
+        
+        line += source.count('\n', start, end)
+        pos = end
+
+
+def _long_bracket_end(source: str, pos: int, level: str) -> Tuple[int, bool]:
+    """Busca el cierre ]==] de un corchete largo; si no existe, llega al final"""
+    closing = ']' + level + ']'
+    index = source.find(closing, pos)
+    if index < 0:
+        return len(source), False
+    return index + len(closing), True
+
+
+# ============================================================================
+# ESCÁNER DE PALABRAS PROHIBIDAS
+# ============================================================================
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Construye una expresión regular con forma de trie para una lista de palabras
     
-    def transpile_content(self, content: str, filename: str = "") -> str:
+    Cada posición se decide por el carácter siguiente en lugar de probar las
+    palabras una a una, así que el coste por posición no crece con la lista.
+    Entre prefijos comunes se prefiere la palabra más larga.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+
+class ForbiddenWordScanner:
+    """
+    Busca todas las palabras prohibidas en una sola pasada
+    
+    Las palabras se compilan en una única expresión sobre el texto en
+    minúsculas. Tras cada coincidencia la búsqueda continúa en el carácter
+    siguiente, de modo que también se detectan coincidencias solapadas.
+    """
+    
+    __slots__ = ('words', '_regex', '_regex_ignorecase', '_canonical')
+    
+    def __init__(self, words: Iterable[str]):
+        self.words: Tuple[str, ...] = tuple(words)
+        # Forma en minúsculas -> palabra tal como aparece en la lista (la primera gana)
+        self._canonical: Dict[str, str] = {}
+        for word in self.words:
+            if word:
+                self._canonical.setdefault(word.lower(), word)
+        pattern = _trie_pattern(self._canonical)
+        self._regex = re.compile(pattern) if pattern else None
+        # Solo para textos cuya longitud cambia al pasar a minúsculas
+        self._regex_ignorecase = re.compile(pattern, re.IGNORECASE) if pattern else None
+    
+    def scan(self, content: str, first_line: int = 1, skip_strings: bool = False,
+             first_only: bool = False) -> List[Tuple[int, int, str]]:
         """
-        Transpila el contenido de DSL a Lua estándar con análisis semántico real
+        Recorre el contenido una vez y devuelve todas las infracciones
         
         Args:
-            content: Contenido DSL a transpilar
-            filename: Nombre del archivo para mensajes de error
+            content: Contenido a verificar
+            first_line: Número de la primera línea
+            skip_strings: Ignorar strings y comentarios (según tokenize)
+            first_only: Detenerse en la primera coincidencia
             
         Returns:
-            Contenido transpilado a Lua
-            
-        Raises:
-            DSLError: Si hay errores en el transpilado
+            Lista de (línea, columna, palabra) en orden de aparición, con
+            columnas en base 1
         """
-        # Verificar palabras prohibidas primero
-        self.check_forbidden_words(content, filename)
+        if self._regex is None:
+            return []
         
-        # Análisis semántico con múltiples pasadas
-        result = self._semantic_transpile(content)
+        text = content.lower()
+        regex = self._regex
+        if len(text) != len(content):
+            # Algún carácter cambia de longitud en minúsculas (p. ej. 'İ'):
+            # buscar en el original para conservar los desplazamientos
+            text = content
+            regex = self._regex_ignorecase
         
-        return result
-    
-    def _semantic_transpile(self, content: str) -> str:
+        if skip_strings:
+            spans = ((token.start, token.end) for token in tokenize(content)
+                     if token.kind is TokenKind.CODE)
+        else:
+            spans = ((0, len(text)),)
+        
+        violations = []
+        line_starts = None
+        search = regex.search
+        for start, end in spans:
+            match = search(text, start, end)
+            while match is not None:
+                if line_starts is None:
+                    line_starts = [0]
+                    line_starts.extend(m.end() for m in _NEWLINE_REGEX.finditer(text))
+                pos = match.start()
+                index = bisect.bisect_right(line_starts, pos) - 1
+                word = self._canonical[match.group().lower()]
+                violations.append((index + first_line, pos - line_starts[index] + 1, word))
+                if first_only:
+                    return violations
+                match = search(text, pos + 1, end)
+        return violations
+
+
+# ============================================================================
+# VALIDACIÓN DE ARIDAD
+# ============================================================================
+
+def _arity_text(counts: Tuple[int, ...]) -> str:
+    """Describe los números de argumentos admitidos ('máximo 3', 'entre 1 y 2', ...)"""
+    if counts == tuple(range(counts[0], counts[-1] + 1)):
+        if counts[0] == 0:
+            return f"máximo {counts[-1]}"
+        return f"entre {counts[0]} y {counts[-1]}"
+    return ', '.join(map(str, counts[:-1])) + f" o {counts[-1]}"
+
+
+class ArityValidator:
+    """
+    Valida el número de argumentos de los constructores de Roblox en tiempo lineal
+
+    Una única expresión reconoce las llamadas a constructores, los signos de
+    agrupación, las comas y el resto de tokens; una pila de llamadas abiertas
+    cuenta los argumentos de primer nivel. Cada carácter se examina un número
+    acotado de veces, sin retroceso, por larga o anidada que sea la línea.
+    Strings y comentarios cuentan como valores opacos, así que las llamadas
+    pueden abarcar varias líneas y contener strings con comas.
+
+    Si el último argumento es `...` o una llamada a unpack/desempaquetar, el
+    número real de argumentos se desconoce y solo se comprueba el máximo.
+    """
+
+    __slots__ = ('signatures', 'aliases', 'triggers', 'trigger_regex', 'call_regex', 'token_regex',
+                 'valid_fragments')
+
+    # Fragmentos ya comprobados que se validan por sí solos (sin llamadas abiertas)
+    MAX_VALID_FRAGMENTS = 4096
+
+    def __init__(self, signatures: Dict[str, Tuple[Tuple[int, ...], str]], aliases: Dict[str, str]):
         """
-        Realiza transpilación con análisis semántico en múltiples pasadas
+        Args:
+            signatures: Constructor ('Color3.new') -> (argumentos admitidos, descripción)
+            aliases: Nombre escrito ('Color3_nuevo', 'instancia_nueva') -> constructor
         """
-        lines = content.split('\n')
-        transpiled_lines = []
-        
-        for line_num, line in enumerate(lines, 1):
-            try:
-                transpiled_line = self._transpile_line_semantic(line)
-                transpiled_lines.append(transpiled_line)
-            except Exception as e:
-                raise DSLError(f"Error procesando línea {line_num}: {str(e)}")
-        
-        return '\n'.join(transpiled_lines)
-    
-    def _transpile_line_semantic(self, line: str) -> str:
+        self.signatures = signatures
+        self.aliases = aliases
+        # Subcadenas sin las que un fragmento no puede contener un constructor
+        self.triggers = tuple(sorted({'.new', '_nuevo'} | {
+            alias for alias in aliases if '.new' not in alias and '_nuevo' not in alias
+        }))
+        self.trigger_regex = re.compile('|'.join(map(re.escape, self.triggers)))
+        names = '|'.join(map(re.escape, sorted(aliases, key=len, reverse=True)))
+        call = r'\b(?P<name>' + names + r')\s*\('
+        self.call_regex = re.compile(call)
+        self.token_regex = re.compile(
+            r'(?P<call>' + call + r')'
+            r'|(?P<open>[(\[{])'
+            r'|(?P<close>[)\]}])'
+            r'|(?P<comma>,)'
+            r'|(?P<varargs>\.\.\.)'
+            r'|(?P<word>\w+)'
+            r'|(?P<other>[^\s\w()\[\]{},])'
+        )
+        self.valid_fragments = set()
+
+    def session(self) -> 'AritySession':
+        """Estado de validación para recorrer un flujo de tokens"""
+        return AritySession(self)
+
+    def scan(self, source: str, first_line: int = 1, first_only: bool = False) -> List[Tuple[int, int, str]]:
         """
-        Transpila línea con análisis semántico completo
+        Recorre el código fuente completo y devuelve todos los errores de aridad
+
+        Returns:
+            Lista de (línea, columna, mensaje) en orden de cierre de la
+            llamada, con columnas en base 1
         """
-        if not line.strip():
-            return line
-        
-        # Extraer strings para no procesar su contenido
-        parts = self._extract_strings(line)
-        result_parts = []
-        
-        for part in parts:
-            if part['type'] == 'string':
-                result_parts.append(part['content'])
-            else:
-                # Procesar código no-string con análisis semántico
-                processed = self._process_code_semantic(part['content'])
-                result_parts.append(processed)
-        
-        return ''.join(result_parts)
-    
-    def _extract_strings(self, line: str) -> List[Dict]:
+        session = AritySession(self)
+        session.begin(source)
+        for token in tokenize(source, first_line):
+            session.feed(source, token)
+            if first_only and session.errors:
+                break
+        return session.errors[:1] if first_only else session.errors
+
+    def first_error(self, code: str) -> Optional[str]:
+        """Mensaje del primer error de aridad de un fragmento de código, o None"""
+        if self.trigger_regex.search(code) is None:
+            return None
+        session = AritySession(self)
+        session.begin(code)
+        session.feed_code(code, 0, len(code), 1)
+        return session.errors[0][2] if session.errors else None
+
+    def check(self, code: str) -> None:
         """
-        Extrae strings y devuelve lista de partes con tipos
+        Raises:
+            SemanticError: Si el fragmento contiene un constructor con aridad inválida
         """
-        parts = []
-        current_pos = 0
-        in_string = False
-        string_char = None
-        string_start = 0
-        
-        i = 0
-        while i < len(line):
-            char = line[i]
-            
-            if not in_string and char in ['"', "'"]:
-                in_string = True
-                string_char = char
-                string_start = i
-                i += 1
-            elif in_string and char == string_char:
-                # Verificar que no esté escapado
-                if i == 0 or line[i-1] != '\\':
-                    # Agregar parte antes del string
-                    if current_pos < string_start:
-                        parts.append({
-                            'type': 'code',
-                            'content': line[current_pos:string_start]
-                        })
-                    
-                    # Agregar el string
-                    parts.append({
-                        'type': 'string',
-                        'content': line[string_start:i+1]
-                    })
-                    
-                    in_string = False
-                    string_char = None
-                    current_pos = i + 1
-                    i += 1
-                else:
-                    i += 1
-            elif in_string:
-                i += 1
-            else:
-                i += 1
-        
-        # Agregar parte final
-        if current_pos < len(line):
-            parts.append({
-                'type': 'code',
-                'content': line[current_pos:]
-            })
-        
-        return parts
-    
-    def _process_code_semantic(self, code: str) -> str:
+        message = self.first_error(code)
+        if message is not None:
+            raise SemanticError(message)
+
+    def accepts(self, constructor: str, count: int, multiple: bool = False) -> bool:
         """
-        Procesa código con análisis semántico completo
+        True si `count` argumentos cumplen la firma del constructor
+
+        Con `multiple`, el último argumento aporta un número desconocido de
+        valores (0 o más) y solo se comprueba el máximo.
         """
-        if not code.strip():
-            return code
-        
-        # 1. PRIMERO: Traducciones de servicios y funciones (más específicas)
-        result = self._translate_services(code)
-        
-        # 2. Traducciones de métodos con : (dos puntos) - MÁS TEMPRANO
-        result = self._translate_methods(result)
-        
-        # 3. Traducciones de constructores (.new)
-        result = self._translate_constructors(result)
-        
-        # 4. Traducciones de propiedades
-        result = self._translate_properties(result)
-        
-        # 5. Traducciones de enums
-        result = self._translate_enums(result)
-        
-        # 6. ÚLTIMO: Traducciones básicas de palabras clave (menos específicas)
-        result = self._translate_keywords(result)
-        
-        return result
+        counts = self.signatures[constructor][0]
+        if multiple:
+            return count - 1 <= counts[-1]
+        return count in counts
+
+    def message(self, written: str, constructor: str, count: int, arguments: str) -> str:
+        """Mensaje de error de aridad con un extracto de los argumentos escritos"""
+        counts, description = self.signatures[constructor]
+        arguments = ' '.join(arguments.split())
+        if len(arguments) > 60:
+            arguments = arguments[:57] + "..."
+        message = f"{written} acepta {_arity_text(counts)} parámetros ({description}), se encontraron {count} parámetros"
+        return f"{message}: {arguments}" if arguments else message
+
+
+class AritySession:
+    """
+    Validación de aridad incremental sobre un flujo de tokens
+
+    Se alimenta token a token (feed) mientras se traduce, sin volver a
+    analizar el archivo. Fuera de toda llamada a constructor solo se examinan
+    los tokens de código que contienen alguna subcadena disparadora: begin()
+    localiza todas con una sola búsqueda sobre el texto y `next_trigger` es
+    la siguiente posición pendiente. Los fragmentos que ya resultaron válidos
+    por sí solos no se vuelven a recorrer.
+    """
+
+    __slots__ = ('validator', 'errors', 'calls', 'next_trigger', '_triggers', '_stack', '_last_word')
+
+    def __init__(self, validator: ArityValidator):
+        self.validator = validator
+        self.errors: List[Tuple[int, int, str]] = []
+        self.calls = 0  # Llamadas a constructor abiertas
+        # Marco: [constructor o None, comas, argumento actual con contenido,
+        #         último argumento multivalor, (línea, columna), (texto, fin de '('),
+        #         nombre escrito, llamada multivalor]
+        self._stack: List[list] = []
+        self._last_word: Optional[str] = None
+        self.next_trigger = -1
+        self._triggers: Iterator[int] = iter(())
+
+    def begin(self, source: str) -> None:
+        """Prepara un nuevo texto (el archivo completo o un bloque del flujo)"""
+        self._triggers = map(re.Match.start, self.validator.trigger_regex.finditer(source))
+        self.next_trigger = next(self._triggers, len(source))
+
+    def rebase(self, source: str, end: int) -> None:
+        """
+        El siguiente texto empezará por source[end:] (modo flujo)
+
+        Las llamadas aún abiertas guardan lo que ya llevan de argumentos,
+        resumido al tamaño que puede necesitar el mensaje de error.
+        """
+        for frame in self._stack:
+            if frame[5] is None:
+                continue
+            opened_in, open_end = frame[5]
+            text = source[open_end:end] if open_end is not None else opened_in + source[:end]
+            summary = ' '.join(text.split())
+            if text[-1:].isspace() and summary:
+                summary += ' '
+            frame[5] = (summary[:64], None)
+
+    def feed(self, source: str, token: 'Token') -> None:
+        """Procesa un token de `source` (tras begin(source))"""
+        kind = token.kind
+        if kind is TokenKind.CODE:
+            if self.calls or self.next_trigger < token.end:
+                self.feed_code(source, token.start, token.end, token.line)
+        elif kind is TokenKind.STRING or kind is TokenKind.LONG_STRING:
+            self.feed_value()
+
+    def feed_value(self) -> None:
+        """Un string: valor opaco dentro de la llamada abierta"""
+        if self._stack:
+            top = self._stack[-1]
+            top[2] = True
+            top[3] = False
+        self._last_word = None
+
+    def feed_code(self, source: str, start: int, end: int, line: int) -> None:
+        """Procesa el código de source[start:end] (sin saltos de línea)"""
+        while self.next_trigger < end:
+            self.next_trigger = next(self._triggers, len(source))
+        if not self.calls:
+            valid_fragments = self.validator.valid_fragments
+            text = source[start:end]
+            if text in valid_fragments:
+                return
+            errors = len(self.errors)
+            self._feed_code(source, start, end, line)
+            if not self.calls and len(self.errors) == errors:
+                if len(valid_fragments) >= ArityValidator.MAX_VALID_FRAGMENTS:
+                    valid_fragments.clear()
+                valid_fragments.add(text)
+            return
+        self._feed_code(source, start, end, line)
+
+    def _feed_code(self, source: str, start: int, end: int, line: int) -> None:
+        if not self.calls:
+            match = self.validator.call_regex.search(source, start, end)
+            if match is None:
+                self._last_word = None
+                return
+            start = match.start()
+
+        stack = self._stack
+        aliases = self.validator.aliases
+        last_word = self._last_word
+        for match in self.validator.token_regex.finditer(source, start, end):
+            kind = match.lastgroup
+            if kind == 'word':
+                if stack:
+                    stack[-1][2] = True
+                    stack[-1][3] = False
+                last_word = match.group()
+                continue
+            if kind == 'call':
+                if stack:
+                    stack[-1][2] = True
+                    stack[-1][3] = False
+                name = match.group('name')
+                pos = match.start()
+                column = pos - source.rfind('\n', 0, pos)
+                stack.append([aliases[name], 0, False, False, (line, column), (source, match.end()), name, False])
+                self.calls += 1
+            elif not self.calls:
+                # Fuera de los constructores solo interesan nuevas llamadas
+                pass
+            elif kind == 'open':
+                top = stack[-1]
+                top[2] = True
+                top[3] = False
+                multiple = match.group() == '(' and last_word in MULTIPLE_VALUE_FUNCTIONS
+                stack.append([None, 0, False, False, None, None, None, multiple])
+            elif kind == 'close':
+                frame = stack.pop()
+                if frame[0] is not None:
+                    self.calls -= 1
+                    message = self._check_frame(source, frame, match.start())
+                    if message is not None:
+                        self.errors.append(frame[4] + (message,))
+                if stack:
+                    stack[-1][2] = True
+                    stack[-1][3] = frame[7]
+            elif kind == 'comma':
+                top = stack[-1]
+                top[1] += 1
+                top[2] = False
+                top[3] = False
+            elif kind == 'varargs':
+                top = stack[-1]
+                top[2] = True
+                top[3] = True
+            else:
+                top = stack[-1]
+                top[2] = True
+                top[3] = False
+            last_word = None
+        self._last_word = last_word
+
+    def _check_frame(self, source: str, frame: list, close: int) -> Optional[str]:
+        """Mensaje de error si la llamada cerrada en `close` no cumple su firma"""
+        constructor, commas, content, multiple, _, (opened_in, open_end), written, _ = frame
+        count = commas + 1 if commas or content else 0
+        if self.validator.accepts(constructor, count, multiple):
+            return None
+        if open_end is not None:
+            arguments = source[open_end:close]
+        else:
+            # La llamada empezó en un bloque anterior (modo flujo, ver rebase)
+            arguments = opened_in + source[:close]
+        return self.validator.message(written, constructor, count, arguments)
+
+
+def _arity_error(errors: List[Tuple[int, int, str]], filename: str = "") -> 'DSLError':
+    """DSLError con todos los errores de aridad de un archivo"""
+    details = '\n'.join(f"  línea {line}, columna {column}: {message}" for line, column, message in errors)
+    location = f" en {filename}" if filename else ""
+    return DSLError(f"{len(errors)} error(es) de aridad{location}:\n{details}", ErrorType.ARITY_ERROR)
+
+
+# ============================================================================
+# DIAGNÓSTICOS
+# ============================================================================
+
+class Diagnostic:
+    """Un problema del código fuente, con posición en base 1"""
+
+    __slots__ = ('line', 'column', 'error_type', 'message', 'length')
+
+    def __init__(self, line: int, column: int, error_type: ErrorType, message: str, length: int = 1):
+        self.line = line
+        self.column = column
+        self.error_type = error_type
+        self.message = message
+        self.length = length  # Caracteres señalados a partir de la columna
+
+    def to_dict(self) -> Dict:
+        return {'linea': self.line, 'columna': self.column, 'tipo': self.error_type.value, 'mensaje': self.message}
+
+    def format(self, filename: str = "") -> str:
+        """Forma 'archivo:línea:columna: TIPO mensaje' de los compiladores"""
+        location = f"{filename}:" if filename else ""
+        return f"{location}{self.line}:{self.column}: {self.error_type.value} {self.message}"
+
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.line}, {self.column}, {self.error_type.name}, {self.message!r})"
+
+
+_BRACKET_REGEX = re.compile(r'[()\[\]{}]')
+_OPENING_BRACKETS = {')': '(', ']': '[', '}': '{'}
+_CLOSING_BRACKETS = {'(': ')', '[': ']', '{': '}'}
+
+# Mensaje de cada token sin cerrar
+_UNCLOSED_MESSAGES = {
+    TokenKind.STRING: (ErrorType.STRING_ERROR, "String sin cerrar"),
+    TokenKind.LONG_STRING: (ErrorType.STRING_ERROR, "String largo sin cerrar"),
+    TokenKind.LONG_COMMENT: (ErrorType.SYNTAX_ERROR, "Comentario largo sin cerrar"),
+}
+
+
+class SyntaxSession:
+    """
+    Comprobaciones sintácticas locales sobre los tokens de un texto
+
+    Detecta strings y comentarios largos sin cerrar y signos de agrupación
+    desequilibrados. Tras un cierre que no corresponde se recupera: si cierra
+    una apertura anterior, las intermedias quedan sin cerrar; si no, se ignora.
+
+    Como AritySession, localiza todos los signos de agrupación con una sola
+    búsqueda y `next_bracket` es la siguiente posición pendiente: los tokens
+    de código sin ninguno no se examinan. Las columnas solo se calculan para
+    los diagnósticos.
+
+    Con `partial`, el texto es un tramo de un documento (ver
+    IncrementalDocument): los cierres que no corresponden a la última
+    apertura del tramo no se diagnostican, sino que pasan con las aperturas
+    pendientes a `residual` como (signo, línea, columna), para resolverlos
+    al combinar los tramos en orden.
+    """
+
+    __slots__ = ('source', 'diagnostics', 'next_bracket', 'residual', '_brackets', '_stack')
+
+    def __init__(self, source: str, partial: bool = False):
+        self.source = source
+        self.diagnostics: List[Diagnostic] = []
+        self.residual: Optional[List[Tuple[str, int, int]]] = [] if partial else None
+        self._stack: List[Tuple[str, int, int]] = []  # (apertura, línea, posición)
+        self._brackets = map(re.Match.start, _BRACKET_REGEX.finditer(source))
+        self.next_bracket = next(self._brackets, len(source))
+
+    def _column(self, pos: int) -> int:
+        return pos - self.source.rfind('\n', 0, pos)
+
+    def feed_code(self, token: 'Token') -> None:
+        """Procesa un token de código (los signos anteriores estaban en strings o comentarios)"""
+        source = self.source
+        brackets = self._brackets
+        length = len(source)
+        pos = self.next_bracket
+        while pos < token.start:
+            pos = next(brackets, length)
+        while pos < token.end:
+            self._bracket(source[pos], token.line, pos)
+            pos = next(brackets, length)
+        self.next_bracket = pos
+
+    def feed_unclosed(self, token: 'Token') -> None:
+        """Un string o comentario largo sin cerrar (token.closed es False)"""
+        error_type, message = _UNCLOSED_MESSAGES[token.kind]
+        self.diagnostics.append(Diagnostic(token.line, self._column(token.start), error_type,
+                                           message, token.end - token.start))
+
+    def _bracket(self, char: str, line: int, pos: int) -> None:
+        stack = self._stack
+        opening = _OPENING_BRACKETS.get(char)
+        if opening is None:
+            stack.append((char, line, pos))
+            return
+        if stack and stack[-1][0] == opening:
+            stack.pop()
+            return
+        if self.residual is not None:
+            self._flush()
+            self.residual.append((char, line, self._column(pos)))
+            return
+        column = self._column(pos)
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index][0] == opening:
+                for unclosed in stack[index + 1:]:
+                    self._unclosed(unclosed, f"'{char}' en la línea {line}, columna {column} cierra una apertura anterior")
+                del stack[index:]
+                return
+        self.diagnostics.append(Diagnostic(line, column, ErrorType.SYNTAX_ERROR, f"'{char}' sin apertura"))
+
+    def _unclosed(self, entry: Tuple[str, int, int], detail: str) -> None:
+        char, line, pos = entry
+        self.diagnostics.append(Diagnostic(
+            line, self._column(pos), ErrorType.SYNTAX_ERROR,
+            f"'{char}' sin cerrar (se esperaba '{_CLOSING_BRACKETS[char]}'; {detail})"
+        ))
+
+    def _flush(self) -> None:
+        column = self._column
+        self.residual.extend((char, line, column(pos)) for char, line, pos in self._stack)
+        self._stack = []
+
+    def finish(self) -> List[Diagnostic]:
+        """Termina el texto: las aperturas pendientes quedan sin cerrar (o en `residual`)"""
+        if self.residual is not None:
+            self._flush()
+            return self.diagnostics
+        for entry in self._stack:
+            self._unclosed(entry, "fin del archivo")
+        self._stack = []
+        return self.diagnostics
+
+
+class _BracketReplay(SyntaxSession):
+    """Resuelve en orden los signos de `residual` de varios tramos (ya con columnas)"""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("")
+
+    def _column(self, pos: int) -> int:
+        return pos
+
+    def feed(self, char: str, line: int, column: int) -> None:
+        self._bracket(char, line, column)
+
+
+# Motores de traducción disponibles
+ENGINE_CASCADE = "cascade"          # Pasadas re.sub encadenadas (comportamiento original)
+ENGINE_SINGLE_PASS = "single_pass"  # Un solo escaneo con despacho por diccionario
+ENGINE_AST = "ast"                  # Árbol sintáctico y generación en un recorrido
+ENGINES = (ENGINE_CASCADE, ENGINE_SINGLE_PASS, ENGINE_AST)
+
+# Tamaño de bloque (caracteres) para la transpilación en flujo
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Transpilación en paralelo de un solo archivo: por debajo de este tamaño
+# (caracteres) el arranque del pool no compensa y se transpila en serie
+PARALLEL_MIN_SIZE = 512 * 1024
+# Trozos por proceso de trabajo (reparten mejor los trozos más costosos)
+PARALLEL_PARTS_PER_JOB = 2
+
+
+class SinglePassRewriter:
+    """
+    Motor de reescritura en una sola pasada.
+
+    Combina todas las tablas de reglas en un único patrón maestro que tokeniza
+    el fragmento una sola vez, y luego resuelve cada identificador con una
+    búsqueda en diccionario respetando el orden de prioridad de las pasadas
+    originales (servicios → métodos → constructores → propiedades → enums →
+    palabras clave). La salida es idéntica byte a byte a la de la cascada.
+
+    Los pocos casos patológicos cuyo resultado depende de que una pasada
+    reescriba el texto que ve la siguiente (por ejemplo un sufijo _brillante
+    en medio de un identificador) se detectan y se delegan a la cascada.
+    """
+
+    # Tipos de token del flujo virtual
+    WORD, SPACE, PUNCT, OPAQUE = range(4)
+
+    SERVICE_CALL = 'obtener_servicio'
+    INSTANCE_CALL = 'instancia_nueva'
+    BRIGHT_SUFFIX = '_brillante'
+    EASING_PREFIXES = EASING_PREFIXES
+
+    __slots__ = (
+        'master_regex', 'services', 'methods', 'constructors', 'properties',
+        'math', 'enums', 'enum_heads', 'simple_enums', 'global_functions',
+        'keywords', 'arity_validator'
+    )
+
+    def __init__(self, rules: RuleRegistry):
+        """
+        Compila las tablas del registro de reglas en el patrón maestro
+
+        Args:
+            rules: Registro cuyas tablas se combinan
+        """
+        self.services = rules.services
+        self.methods = rules.methods
+        self.constructors = rules.constructors
+        self.properties = rules.properties
+        self.math = rules.math
+        self.enums = rules.enums
+        self.enum_heads = frozenset(key.split('.')[0] for key in rules.enums if '.' in key)
+        self.simple_enums = rules.simple_enums
+        self.global_functions = rules.global_functions
+        self.keywords = rules.keywords
+
+        def alternation(names):
+            # Más largos primero para que ninguna alternativa oculte a otra
+            return '|'.join(map(re.escape, sorted(names, key=len, reverse=True)))
+
+        # Patrón maestro: las alternativas estructurales van antes que el token genérico
+        self.master_regex = re.compile(
+            r'(?P<svc>' + self.SERVICE_CALL + r'\(\s*"(?P<svc_name>' + alternation(self.services) + r')"\s*\))'
+            r'|(?P<meth>:\s*(?P<meth_name>' + alternation(self.methods) + r')\s*\()'
+            r'|(?P<ctor>(?P<ctor_name>\w+)_nuevo\s*\()'
+            r'|(?P<inst>' + self.INSTANCE_CALL + r'\s*\()'
+            r'|(?P<word>\w+)'
+            r'|(?P<space>\s+)'
+            r'|(?P<punct>[^\w\s])'
+        )
+
+        # Errores de aridad: se delegan a la cascada, que lanza el SemanticError
+        self.arity_validator = rules.arity_validator
+
+    def rewrite(self, code: str) -> Optional[str]:
+        """
+        Reescribe un fragmento de código en una sola pasada
+
+        Args:
+            code: Fragmento de código (sin strings extraídos)
+
+        Returns:
+            Código traducido, o None si el fragmento requiere la cascada
+        """
+        if self.arity_validator.first_error(code) is not None:
+            return None
+
+        tokens = self._tokenize(code)
+        if tokens is None:
+            return None
+        return self._resolve(tokens)
+
+    def _tokenize(self, code: str) -> Optional[List[Tuple[int, str]]]:
+        """
+        Construye el flujo virtual aplicando las reglas estructurales
+        (servicios, métodos y constructores) durante el único escaneo
+        """
+        WORD, SPACE, PUNCT, OPAQUE = self.WORD, self.SPACE, self.PUNCT, self.OPAQUE
+        tokens = []
+        append = tokens.append
+
+        for match in self.master_regex.finditer(code):
+            kind = match.lastgroup
+            if kind == 'word':
+                word = match.group()
+                if word == self.SERVICE_CALL:
+                    append((OPAQUE, 'game:GetService'))
+                    continue
+                if (word.endswith(self.SERVICE_CALL)
+                        or (word.endswith(self.INSTANCE_CALL) and word != self.INSTANCE_CALL)
+                        or (self.BRIGHT_SUFFIX in word and not word.endswith(self.BRIGHT_SUFFIX))):
+                    return None
+                append((WORD, word))
+            elif kind == 'space':
+                append((SPACE, match.group()))
+            elif kind == 'punct':
+                append((PUNCT, match.group()))
+            elif kind == 'svc':
+                append((OPAQUE, f'game:GetService("{self.services[match.group("svc_name")]}")'))
+            elif kind == 'meth':
+                append((OPAQUE, f':{self.methods[match.group("meth_name")]}('))
+            elif kind == 'ctor':
+                name = match.group('ctor_name')
+                if self.BRIGHT_SUFFIX in name:
+                    return None
+                if name in self.constructors:
+                    append((OPAQUE, f'{self.constructors[name]}.new('))
+                else:
+                    append((WORD, name))
+                    append((OPAQUE, '.new('))
+            else:
+                append((OPAQUE, 'Instance.new('))
+
+        return tokens
+
+    def _resolve(self, tokens: List[Tuple[int, str]]) -> str:
+        """
+        Resuelve cada identificador del flujo virtual con búsquedas en
+        diccionario, en el orden de prioridad de las pasadas originales
+        """
+        WORD, SPACE, PUNCT = self.WORD, self.SPACE, self.PUNCT
+        properties, math, enums = self.properties, self.math, self.enums
+        keywords, global_functions = self.keywords, self.global_functions
+
+        out = []
+        append = out.append
+        count = len(tokens)
+        i = 0
+
+        while i < count:
+            kind, text = tokens[i]
+            if kind != WORD:
+                append(text)
+                i += 1
+                continue
+
+            after_dot = i > 0 and tokens[i - 1] == (PUNCT, '.')
+
+            # Propiedades: .texto → .Text
+            if after_dot and text in properties:
+                append(properties[text])
+                i += 1
+                continue
+
+            # Miembros de math: math.piso → math.floor
+            if (after_dot and text in math and i > 1
+                    and tokens[i - 2][0] == WORD and tokens[i - 2][1].endswith('math')):
+                append(math[text])
+                i += 1
+                continue
+
+            # Enums con namespace: metal, estilo_suavizado.Quad
+            if text in enums:
+                append(enums[text])
+                i += 1
+                continue
+
+            dotted = (i + 2 < count and tokens[i + 1] == (PUNCT, '.')
+                      and tokens[i + 2][0] == WORD)
+            if dotted and text in self.enum_heads:
+                key = f'{text}.{tokens[i + 2][1]}'
+                if key in enums:
+                    append(enums[key])
+                    i += 3
+                    continue
+
+            # Enums simples tras el prefijo de suavizado (sin límite izquierdo)
+            if dotted and tokens[i + 2][1] in self.simple_enums:
+                prefix = next((p for p in self.EASING_PREFIXES if text.endswith(p)), None)
+                if prefix is not None:
+                    append(text[:-len(prefix)] + self.simple_enums[tokens[i + 2][1]])
+                    i += 3
+                    continue
+
+            # Colores BrickColor: rojo_brillante → BrickColor.new("Bright rojo")
+            if text.endswith(self.BRIGHT_SUFFIX) and len(text) > len(self.BRIGHT_SUFFIX):
+                color = text[:-len(self.BRIGHT_SUFFIX)]
+                append(f'BrickColor.new("Bright {keywords.get(color, color)}")')
+                i += 1
+                continue
+
+            # sino si [entonces] → elseif [then]
+            if (text == 'sino' and i + 2 < count and tokens[i + 1][0] == SPACE
+                    and tokens[i + 2] == (WORD, 'si')):
+                if (i + 4 < count and tokens[i + 3][0] == SPACE
+                        and tokens[i + 4] == (WORD, 'entonces')):
+                    append('elseif then')
+                    i += 5
+                else:
+                    append('elseif')
+                    i += 3
+                continue
+
+            # Funciones globales seguidas de paréntesis
+            if text in global_functions:
+                j = i + 1
+                if j < count and tokens[j][0] == SPACE:
+                    j += 1
+                if j < count and tokens[j] == (PUNCT, '('):
+                    append(global_functions[text])
+                    i += 1
+                    continue
+
+            append(keywords.get(text, text))
+            i += 1
+
+        return ''.join(out)
+
+
+# Entradas por defecto de la caché de líneas (0 la desactiva)
+DEFAULT_LINE_CACHE_SIZE = 4096
+
+
+class LineCache:
+    """
+    Caché LRU acotada de fragmentos de código ya traducidos
+    
+    La clave es el texto crudo de cada fragmento de código de una línea (la
+    línea completa si no tiene strings ni comentarios). Queda ligada al
+    registro de reglas con el que se llenó y se vacía si este cambia.
+    """
+    
+    __slots__ = ('maxsize', 'hits', 'misses', 'evictions', 'rules', '_entries')
+    
+    def __init__(self, maxsize: int = DEFAULT_LINE_CACHE_SIZE, rules: Optional['RuleRegistry'] = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rules = rules
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Devuelve la traducción guardada (y la marca como reciente) o None"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: str, value: str) -> None:
+        """Guarda una traducción, desalojando la menos reciente si está llena"""
+        entries = self._entries
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self, rules: Optional['RuleRegistry'] = None) -> None:
+        """Vacía la caché (los contadores se conservan)"""
+        self._entries.clear()
+        if rules is not None:
+            self.rules = rules
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores de aciertos, fallos y desalojos"""
+        return {
+            'aciertos': self.hits,
+            'fallos': self.misses,
+            'desalojos': self.evictions,
+            'entradas': len(self._entries),
+            'capacidad': self.maxsize,
+        }
+
+
+# ============================================================================
+# ANALIZADOR SINTÁCTICO Y GENERADOR DE LUA
+# El motor 'ast' construye el árbol sintáctico del archivo completo y genera
+# el Lua en un único recorrido, con las reglas de traducción de las pasadas.
+# ============================================================================
+
+# Palabras reservadas de Lua/Luau; sus equivalentes en español se toman de
+# la tabla de palabras clave del registro de reglas
+LUA_KEYWORDS = frozenset((
+    'and', 'break', 'continue', 'do', 'else', 'elseif', 'end', 'false', 'for', 'function',
+    'if', 'in', 'local', 'nil', 'not', 'or', 'repeat', 'return', 'then', 'true', 'until', 'while',
+))
+
+# Tokens del código: espacios iniciales, luego un nombre, número, operador u
+# otro carácter (findall devuelve una tupla con los cinco grupos)
+_SYNTAX_TOKEN_REGEX = re.compile(
+    r'(\s*)(?:([^\W\d]\w*)'
+    r'|((?:\d\w*(?:\.\d\w*)?|\.\d\w*)(?:(?<=[eE])[+-]\d\w*)?)'
+    r'|(\.\.\.|\.\.=?|//=?|::|->|[=~<>]=|[-+*/%^]=|[-+*/%^#&~|<>=(){}\[\];:,.])'
+    r'|(\S)|\Z)'
+)
+
+# Números de Lua/Luau; el resto de lo que reconoce el grupo `number` (como
+# 2.75x_brillante) no es un número y las pasadas lo traducen por palabras
+_NUMBER_REGEX = re.compile(
+    r'0[xX][\da-fA-F_]*|0[bB][01_]+'
+    r'|(?:\d[\d_]*(?:\.\d[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?'
+)
+
+_BINARY_PRIORITY: Dict[str, Tuple[int, int]] = {
+    'or': (1, 1), 'and': (2, 2),
+    '<': (3, 3), '>': (3, 3), '<=': (3, 3), '>=': (3, 3), '~=': (3, 3), '==': (3, 3),
+    '..': (9, 8),   # asociativo por la derecha
+    '+': (10, 10), '-': (10, 10),
+    '*': (11, 11), '/': (11, 11), '//': (11, 11), '%': (11, 11),
+    '^': (14, 13),  # asociativo por la derecha
+}
+_UNARY_PRIORITY = 12
+_UNARY_OPERATORS = frozenset(('not', '-', '#'))
+_LITERAL_KINDS = frozenset(('nil', 'true', 'false', 'number', 'string', '...'))
+_COMPOUND_ASSIGNMENTS = frozenset(('+=', '-=', '*=', '/=', '//=', '%=', '^=', '..='))
+_BLOCK_END = frozenset(('end', 'else', 'elseif', 'until', 'eof'))
+
+
+class SyntaxNode:
+    """
+    Nodo del árbol sintáctico
+
+    Los campos son índices en el flujo de tokens del analizador (-1 si el
+    token no existe), listas o nodos hijos, en __slots__ para que el árbol
+    de un archivo grande ocupe poco.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class NameExpr(SyntaxNode):
+    """Nombre de variable"""
+    __slots__ = ('token',)
+
+    def __init__(self, token: int):
+        self.token = token
+
+
+class LiteralExpr(SyntaxNode):
+    """nulo, verdadero, falso, número, string o `...`"""
+    __slots__ = ('token',)
+
+    def __init__(self, token: int):
+        self.token = token
+
+
+class IndexExpr(SyntaxNode):
+    """obj.nombre"""
+    __slots__ = ('obj', 'dot', 'name')
+
+    def __init__(self, obj: SyntaxNode, dot: int, name: int):
+        self.obj = obj
+        self.dot = dot
+        self.name = name
+
+
+class SubscriptExpr(SyntaxNode):
+    """obj[clave]"""
+    __slots__ = ('obj', 'key')
+
+    def __init__(self, obj: SyntaxNode, key: SyntaxNode):
+        self.obj = obj
+        self.key = key
+
+
+class CallExpr(SyntaxNode):
+    """func(args), func "string" o func {tabla}; open y close son -1 sin paréntesis"""
+    __slots__ = ('func', 'args', 'open', 'close')
+
+    def __init__(self, func: SyntaxNode, args: List[SyntaxNode], open: int, close: int):
+        self.func = func
+        self.args = args
+        self.open = open
+        self.close = close
+
+
+class MethodCallExpr(SyntaxNode):
+    """obj:nombre(args)"""
+    __slots__ = ('obj', 'colon', 'name', 'args', 'open', 'close')
+
+    def __init__(self, obj: SyntaxNode, colon: int, name: int, args: List[SyntaxNode], open: int, close: int):
+        self.obj = obj
+        self.colon = colon
+        self.name = name
+        self.args = args
+        self.open = open
+        self.close = close
+
+
+class FunctionExpr(SyntaxNode):
+    """funcion(parámetros) ... fin; `params` son índices de nombres o de `...`"""
+    __slots__ = ('keyword', 'params', 'open', 'close', 'body', 'end')
+
+    def __init__(self, keyword: int, params: List[int], open: int, close: int,
+                 body: List['Statement'], end: int):
+        self.keyword = keyword
+        self.params = params
+        self.open = open
+        self.close = close
+        self.body = body
+        self.end = end
+
+
+class TableField(SyntaxNode):
+    """Campo de tabla: `nombre = valor` (name), `[clave] = valor` (key) o posicional"""
+    __slots__ = ('name', 'key', 'value')
+
+    def __init__(self, name: int, key: Optional[SyntaxNode], value: SyntaxNode):
+        self.name = name
+        self.key = key
+        self.value = value
+
+
+class TableExpr(SyntaxNode):
+    """{campos}"""
+    __slots__ = ('fields',)
+
+    def __init__(self, fields: List[TableField]):
+        self.fields = fields
+
+
+class BinaryExpr(SyntaxNode):
+    """izquierda op derecha"""
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op: int, left: SyntaxNode, right: SyntaxNode):
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class UnaryExpr(SyntaxNode):
+    """op operando (no, -, #)"""
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op: int, operand: SyntaxNode):
+        self.op = op
+        self.operand = operand
+
+
+class ParenExpr(SyntaxNode):
+    """(expresión)"""
+    __slots__ = ('expr',)
+
+    def __init__(self, expr: SyntaxNode):
+        self.expr = expr
+
+
+class IfClause(SyntaxNode):
+    """
+    si/sino si condición entonces cuerpo
+
+    `keyword2` es el `si` de un `sino si` en la misma línea (que se traduce
+    como elseif), o -1. En las expresiones si (Luau) el cuerpo es una expresión.
+    """
+    __slots__ = ('keyword', 'keyword2', 'condition', 'then', 'body')
+
+    def __init__(self, keyword: int, keyword2: int, condition: SyntaxNode, then: int, body):
+        self.keyword = keyword
+        self.keyword2 = keyword2
+        self.condition = condition
+        self.then = then
+        self.body = body
+
+
+class IfExpr(SyntaxNode):
+    """Expresión si de Luau: si c entonces a sino b"""
+    __slots__ = ('clauses', 'else_keyword', 'orelse')
+
+    def __init__(self, clauses: List[IfClause], else_keyword: int, orelse: SyntaxNode):
+        self.clauses = clauses
+        self.else_keyword = else_keyword
+        self.orelse = orelse
+
+
+class Statement(SyntaxNode):
+    """Sentencia; `first` y `last` delimitan sus tokens (ambos incluidos)"""
+    __slots__ = ('first', 'last')
+
+
+class LocalStatement(Statement):
+    """local nombres [= valores]"""
+    __slots__ = ('keyword', 'names', 'values')
+
+    def __init__(self, keyword: int, names: List[int], values: List[SyntaxNode]):
+        self.keyword = keyword
+        self.names = names
+        self.values = values
+
+
+class LocalFunction(Statement):
+    """local funcion nombre(...) ... fin"""
+    __slots__ = ('keyword', 'name', 'func')
+
+    def __init__(self, keyword: int, name: int, func: FunctionExpr):
+        self.keyword = keyword
+        self.name = name
+        self.func = func
+
+
+class FunctionStatement(Statement):
+    """funcion a.b[:c](...) ... fin; `colon` y `method` son -1 sin método"""
+    __slots__ = ('target', 'colon', 'method', 'func')
+
+    def __init__(self, target: SyntaxNode, colon: int, method: int, func: FunctionExpr):
+        self.target = target
+        self.colon = colon
+        self.method = method
+        self.func = func
+
+
+class AssignStatement(Statement):
+    """destinos = valores, o destino op= valor (Luau)"""
+    __slots__ = ('targets', 'op', 'values')
+
+    def __init__(self, targets: List[SyntaxNode], op: int, values: List[SyntaxNode]):
+        self.targets = targets
+        self.op = op
+        self.values = values
+
+
+class CallStatement(Statement):
+    """Llamada usada como sentencia"""
+    __slots__ = ('call',)
+
+    def __init__(self, call: SyntaxNode):
+        self.call = call
+
+
+class DoStatement(Statement):
+    """hacer ... fin"""
+    __slots__ = ('keyword', 'body', 'end')
+
+    def __init__(self, keyword: int, body: List[Statement], end: int):
+        self.keyword = keyword
+        self.body = body
+        self.end = end
+
+
+class WhileStatement(Statement):
+    """mientras condición hacer ... fin"""
+    __slots__ = ('keyword', 'condition', 'do', 'body', 'end')
+
+    def __init__(self, keyword: int, condition: SyntaxNode, do: int, body: List[Statement], end: int):
+        self.keyword = keyword
+        self.condition = condition
+        self.do = do
+        self.body = body
+        self.end = end
+
+
+class RepeatStatement(Statement):
+    """repetir ... hasta condición"""
+    __slots__ = ('keyword', 'body', 'until', 'condition')
+
+    def __init__(self, keyword: int, body: List[Statement], until: int, condition: SyntaxNode):
+        self.keyword = keyword
+        self.body = body
+        self.until = until
+        self.condition = condition
+
+
+class IfStatement(Statement):
+    """si ... [sino si ...] [sino ...] fin"""
+    __slots__ = ('clauses', 'else_keyword', 'orelse', 'end')
+
+    def __init__(self, clauses: List[IfClause], else_keyword: int, orelse: List[Statement], end: int):
+        self.clauses = clauses
+        self.else_keyword = else_keyword
+        self.orelse = orelse
+        self.end = end
+
+
+class NumericFor(Statement):
+    """para i = inicio, fin[, paso] hacer ... fin"""
+    __slots__ = ('keyword', 'var', 'start', 'stop', 'step', 'do', 'body', 'end')
+
+    def __init__(self, keyword: int, var: int, start: SyntaxNode, stop: SyntaxNode,
+                 step: Optional[SyntaxNode], do: int, body: List[Statement], end: int):
+        self.keyword = keyword
+        self.var = var
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.do = do
+        self.body = body
+        self.end = end
+
+
+class GenericFor(Statement):
+    """para nombres en expresiones hacer ... fin"""
+    __slots__ = ('keyword', 'names', 'in_keyword', 'values', 'do', 'body', 'end')
+
+    def __init__(self, keyword: int, names: List[int], in_keyword: int, values: List[SyntaxNode],
+                 do: int, body: List[Statement], end: int):
+        self.keyword = keyword
+        self.names = names
+        self.in_keyword = in_keyword
+        self.values = values
+        self.do = do
+        self.body = body
+        self.end = end
+
+
+class ReturnStatement(Statement):
+    """retornar [valores]"""
+    __slots__ = ('keyword', 'values')
+
+    def __init__(self, keyword: int, values: List[SyntaxNode]):
+        self.keyword = keyword
+        self.values = values
+
+
+class JumpStatement(Statement):
+    """romper o continuar"""
+    __slots__ = ('keyword',)
+
+    def __init__(self, keyword: int):
+        self.keyword = keyword
+
+
+class InvalidStatement(Statement):
+    """Tokens que no forman una sentencia válida (recuperación de errores)"""
+    __slots__ = ('message',)
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+class Chunk(SyntaxNode):
+    """Archivo completo"""
+    __slots__ = ('body',)
+
+    def __init__(self, body: List[Statement]):
+        self.body = body
+
+
+class _ParseError(Exception):
+    """Error de sintaxis en el token `index`; se recupera en la sentencia que lo contiene"""
+
+    def __init__(self, message: str, index: int):
+        super().__init__(message)
+        self.index = index
+
+
+class VoxParser:
+    """
+    Analizador sintáctico descendente recursivo de Vox
+
+    Reconoce la gramática de Lua 5.1 con las extensiones de Luau más
+    habituales (asignaciones compuestas, `continuar`, expresiones si), con
+    las palabras reservadas en español o en inglés. El flujo de tokens se
+    guarda en listas paralelas (tipo, texto, inicio, fin, fragmento, línea);
+    los strings y comentarios vienen del analizador léxico, así que el árbol
+    es fiel al texto original y se puede regenerar sin perder nada.
+
+    Recuperación de errores: si una sentencia no se puede analizar, se anota
+    el error, se descartan sus tokens hasta el final de la línea del error y
+    se representa con un InvalidStatement; el análisis sigue en la siguiente
+    sentencia. Un archivo con errores siempre produce un árbol completo.
+    """
+
+    __slots__ = ('source', 'kinds', 'texts', 'starts', 'ends', 'frags', 'lines', 'pos', 'errors',
+                 '_spanish')
+
+    # Palabras que, en `sino si` dentro del mismo fragmento, forman un elseif
+    ELSE_IF = ('sino', 'si')
+
+    def __init__(self, source: str, rules: Optional[RuleRegistry] = None, lua: bool = False):
+        """
+        Args:
+            source: Código Vox completo
+            rules: Registro de reglas (sus palabras clave definen las
+                palabras reservadas en español)
+            lua: Analizar Lua ya generado: solo las palabras reservadas en
+                inglés, y ningún nombre se marca para la cascada
+        """
+        rules = RULES if rules is None else rules
+        self.source = source
+        self.kinds: List[str] = []     # 'name', 'number', 'string', palabra reservada, operador, 'error', 'eof'
+        self.texts: List[str] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.frags: List[int] = []     # Token de código del analizador léxico (-1 en strings)
+        self.lines: List[int] = []
+        self.pos = 0
+        self.errors: List[Tuple[int, int, str]] = []
+        keywords = {word: word for word in LUA_KEYWORDS}
+        self._spanish = {}
+        if lua:
+            self._lex(keywords, None)
+            return
+        for spanish, english in rules.keywords.items():
+            if english in LUA_KEYWORDS:
+                keywords[spanish] = english
+                self._spanish.setdefault(english, spanish)
+        self._lex(keywords, frozenset(rules.constructors))
+
+    def _lex(self, keywords: Dict[str, str], constructors: Optional[frozenset]) -> None:
+        source = self.source
+        kinds, texts, starts, ends = self.kinds, self.texts, self.starts, self.ends
+        frags, lines = self.frags, self.lines
+        CODE, STRING, LONG_STRING = TokenKind.CODE, TokenKind.STRING, TokenKind.LONG_STRING
+        # Las líneas se repiten mucho: cada fragmento distinto se divide una vez
+        fragments: Dict[str, Tuple[List[str], List[str], List[int], List[int]]] = {}
+        line = 1
+        for fragment, token in enumerate(tokenize(source)):
+            kind = token.kind
+            line = token.line
+            start = token.start
+            if kind is CODE:
+                code = source[start:token.end]
+                lexed = fragments.get(code)
+                if lexed is None:
+                    lexed = fragments[code] = _lex_code(code, keywords, constructors)
+                code_kinds, code_texts, code_starts, code_ends = lexed
+                count = len(code_kinds)
+                if not count:
+                    continue
+                kinds += code_kinds
+                texts += code_texts
+                starts += [start + offset for offset in code_starts]
+                ends += [start + offset for offset in code_ends]
+                frags += [fragment] * count
+                lines += [line] * count
+            elif kind is STRING or kind is LONG_STRING:
+                kinds.append('string')
+                texts.append(source[start:token.end])
+                starts.append(start)
+                ends.append(token.end)
+                frags.append(-1)
+                lines.append(line)
+        kinds.append('eof')
+        texts.append('')
+        starts.append(len(source))
+        ends.append(len(source))
+        frags.append(-2)
+        lines.append(line)
+
+    # ------------------------------------------------------------------
+    # Errores
+    # ------------------------------------------------------------------
+
+    def _describe(self, kind: str) -> str:
+        if kind == 'name':
+            return "un nombre"
+        return f"'{self._spanish.get(kind, kind)}'"
+
+    def _error(self, expected: str) -> _ParseError:
+        pos = self.pos
+        if self.kinds[pos] == 'eof':
+            return _ParseError(f"se esperaba {expected} al final del archivo", pos)
+        return _ParseError(f"se esperaba {expected} cerca de '{self.texts[pos][:20]}'", pos)
+
+    def _expect(self, kind: str) -> int:
+        pos = self.pos
+        if self.kinds[pos] != kind:
+            raise self._error(self._describe(kind))
+        self.pos = pos + 1
+        return pos
+
+    def _recover(self, first: int, error: _ParseError) -> InvalidStatement:
+        """Anota el error y descarta hasta el final de la línea donde se produjo"""
+        lines = self.lines
+        eof = len(self.kinds) - 1
+        index = min(error.index, eof)
+        start = self.starts[index]
+        self.errors.append((lines[index], start - self.source.rfind('\n', 0, start), str(error)))
+        last = index
+        if last == eof:
+            last -= 1
+        while last + 1 < eof and lines[last + 1] == lines[index]:
+            last += 1
+        self.pos = max(last, first) + 1
+        return InvalidStatement(str(error))
+
+    # ------------------------------------------------------------------
+    # Bloques y sentencias
+    # ------------------------------------------------------------------
+
+    def parse(self) -> Chunk:
+        """Analiza el archivo completo; los errores quedan en self.errors"""
+        body = self._block()
+        while self.kinds[self.pos] != 'eof':
+            # fin, sino o hasta sin bloque que cerrar
+            first = self.pos
+            statement = self._recover(first, _ParseError(f"'{self.texts[first]}' inesperado", first))
+            statement.first = first
+            statement.last = self.pos - 1
+            body.append(statement)
+            body.extend(self._block())
+        return Chunk(body)
+
+    def _block(self) -> List[Statement]:
+        body = []
+        kinds = self.kinds
+        while kinds[self.pos] not in _BLOCK_END:
+            first = self.pos
+            try:
+                statement = self._statement()
+            except _ParseError as error:
+                statement = self._recover(first, error)
+            except RecursionError:
+                statement = self._recover(first, _ParseError("anidamiento demasiado profundo", self.pos))
+            if statement is not None:
+                statement.first = first
+                statement.last = self.pos - 1
+                body.append(statement)
+        return body
+
+    def _statement(self) -> Optional[Statement]:
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind == 'local':
+            return self._local()
+        if kind == 'if':
+            return self._if_statement()
+        if kind == 'function':
+            return self._function_statement()
+        if kind == 'for':
+            return self._for()
+        if kind == 'while':
+            self.pos = pos + 1
+            condition = self._expression()
+            do = self._expect('do')
+            body = self._block()
+            return WhileStatement(pos, condition, do, body, self._expect('end'))
+        if kind == 'return':
+            self.pos = pos + 1
+            kind = self.kinds[pos + 1]
+            values = [] if kind in _BLOCK_END or kind == ';' else self._expressions()
+            return ReturnStatement(pos, values)
+        if kind == 'do':
+            self.pos = pos + 1
+            body = self._block()
+            return DoStatement(pos, body, self._expect('end'))
+        if kind == 'repeat':
+            self.pos = pos + 1
+            body = self._block()
+            until = self._expect('until')
+            return RepeatStatement(pos, body, until, self._expression())
+        if kind == 'break' or kind == 'continue':
+            self.pos = pos + 1
+            return JumpStatement(pos)
+        if kind == ';':
+            self.pos = pos + 1
+            return None
+        return self._expression_statement()
+
+    def _local(self) -> Statement:
+        keyword = self.pos
+        kinds = self.kinds
+        if kinds[keyword + 1] == 'function':
+            self.pos = keyword + 2
+            name = self._expect('name')
+            return LocalFunction(keyword, name, self._function_body(keyword + 1))
+        self.pos = keyword + 1
+        names = [self._expect('name')]
+        while kinds[self.pos] == ',':
+            self.pos += 1
+            names.append(self._expect('name'))
+        values = []
+        if kinds[self.pos] == '=':
+            self.pos += 1
+            values = self._expressions()
+        return LocalStatement(keyword, names, values)
+
+    def _function_statement(self) -> Statement:
+        keyword = self.pos
+        kinds = self.kinds
+        self.pos = keyword + 1
+        target = NameExpr(self._expect('name'))
+        while kinds[self.pos] == '.':
+            dot = self.pos
+            self.pos = dot + 1
+            target = IndexExpr(target, dot, self._expect('name'))
+        colon = method = -1
+        if kinds[self.pos] == ':':
+            colon = self.pos
+            self.pos = colon + 1
+            method = self._expect('name')
+        return FunctionStatement(target, colon, method, self._function_body(keyword))
+
+    def _if_statement(self) -> Statement:
+        kinds = self.kinds
+        clauses = [self._if_clause(self.pos, -1, self._block)]
+        else_keyword = -1
+        orelse = []
+        while True:
+            pos = self.pos
+            kind = kinds[pos]
+            if kind == 'elseif':
+                clauses.append(self._if_clause(pos, -1, self._block))
+            elif kind == 'else' and self._else_if(pos):
+                clauses.append(self._if_clause(pos, pos + 1, self._block))
+            elif kind == 'else':
+                else_keyword = pos
+                self.pos = pos + 1
+                orelse = self._block()
+                break
+            else:
+                break
+        return IfStatement(clauses, else_keyword, orelse, self._expect('end'))
+
+    def _if_clause(self, keyword: int, keyword2: int, body) -> IfClause:
+        self.pos = (keyword2 if keyword2 >= 0 else keyword) + 1
+        condition = self._expression()
+        then = self._expect('then')
+        return IfClause(keyword, keyword2, condition, then, body())
+
+    def _else_if(self, pos: int) -> bool:
+        """`sino si` separados solo por espacios: un elseif (como en las pasadas)"""
+        return ((self.texts[pos], self.texts[pos + 1]) == self.ELSE_IF
+                and self.frags[pos] == self.frags[pos + 1] and self.starts[pos + 1] > self.ends[pos])
+
+    def _for(self) -> Statement:
+        keyword = self.pos
+        kinds = self.kinds
+        self.pos = keyword + 1
+        var = self._expect('name')
+        if kinds[self.pos] == '=':
+            self.pos += 1
+            start = self._expression()
+            self._expect(',')
+            stop = self._expression()
+            step = None
+            if kinds[self.pos] == ',':
+                self.pos += 1
+                step = self._expression()
+            do = self._expect('do')
+            body = self._block()
+            return NumericFor(keyword, var, start, stop, step, do, body, self._expect('end'))
+        names = [var]
+        while kinds[self.pos] == ',':
+            self.pos += 1
+            names.append(self._expect('name'))
+        in_keyword = self._expect('in')
+        values = self._expressions()
+        do = self._expect('do')
+        body = self._block()
+        return GenericFor(keyword, names, in_keyword, values, do, body, self._expect('end'))
+
+    def _expression_statement(self) -> Statement:
+        kinds = self.kinds
+        target = self._suffixed()
+        kind = kinds[self.pos]
+        if kind == '=' or kind == ',':
+            targets = [target]
+            while kinds[self.pos] == ',':
+                self.pos += 1
+                targets.append(self._suffixed())
+            for target in targets:
+                if type(target) not in (NameExpr, IndexExpr, SubscriptExpr):
+                    raise self._error("una variable antes de '='")
+            op = self._expect('=')
+            return AssignStatement(targets, op, self._expressions())
+        if kind in _COMPOUND_ASSIGNMENTS:
+            op = self.pos
+            self.pos = op + 1
+            return AssignStatement([target], op, [self._expression()])
+        if type(target) is CallExpr or type(target) is MethodCallExpr:
+            return CallStatement(target)
+        raise self._error("'=' o una llamada")
+
+    # ------------------------------------------------------------------
+    # Expresiones
+    # ------------------------------------------------------------------
+
+    def _expressions(self) -> List[SyntaxNode]:
+        values = [self._expression()]
+        kinds = self.kinds
+        while kinds[self.pos] == ',':
+            self.pos += 1
+            values.append(self._expression())
+        return values
+
+    def _expression(self, limit: int = 0) -> SyntaxNode:
+        kinds = self.kinds
+        pos = self.pos
+        if kinds[pos] in _UNARY_OPERATORS:
+            self.pos = pos + 1
+            left = UnaryExpr(pos, self._expression(_UNARY_PRIORITY))
+        else:
+            left = self._simple()
+        while True:
+            op = self.pos
+            priority = _BINARY_PRIORITY.get(kinds[op])
+            if priority is None or priority[0] <= limit:
+                return left
+            self.pos = op + 1
+            left = BinaryExpr(op, left, self._expression(priority[1]))
+
+    def _simple(self) -> SyntaxNode:
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind in _LITERAL_KINDS:
+            self.pos = pos + 1
+            return LiteralExpr(pos)
+        if kind == '{':
+            return self._table()
+        if kind == 'function':
+            self.pos = pos + 1
+            return self._function_body(pos)
+        if kind == 'if':
+            return self._if_expression()
+        return self._suffixed()
+
+    def _suffixed(self) -> SyntaxNode:
+        kinds = self.kinds
+        pos = self.pos
+        kind = kinds[pos]
+        if kind == 'name':
+            self.pos = pos + 1
+            expr = NameExpr(pos)
+        elif kind == '(':
+            self.pos = pos + 1
+            expr = ParenExpr(self._expression())
+            self._expect(')')
+        else:
+            raise self._error("una expresión")
+        while True:
+            pos = self.pos
+            kind = kinds[pos]
+            if kind == '.':
+                self.pos = pos + 1
+                expr = IndexExpr(expr, pos, self._expect('name'))
+            elif kind == '[':
+                self.pos = pos + 1
+                key = self._expression()
+                self._expect(']')
+                expr = SubscriptExpr(expr, key)
+            elif kind == ':':
+                self.pos = pos + 1
+                name = self._expect('name')
+                args, open, close = self._arguments()
+                expr = MethodCallExpr(expr, pos, name, args, open, close)
+            elif kind == '(' or kind == 'string' or kind == '{':
+                args, open, close = self._arguments()
+                expr = CallExpr(expr, args, open, close)
+            else:
+                return expr
+
+    def _arguments(self) -> Tuple[List[SyntaxNode], int, int]:
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind == '(':
+            self.pos = pos + 1
+            args = [] if self.kinds[pos + 1] == ')' else self._expressions()
+            return args, pos, self._expect(')')
+        if kind == 'string':
+            self.pos = pos + 1
+            return [LiteralExpr(pos)], -1, -1
+        if kind == '{':
+            return [self._table()], -1, -1
+        raise self._error("argumentos")
+
+    def _table(self) -> TableExpr:
+        kinds = self.kinds
+        self._expect('{')
+        fields = []
+        while kinds[self.pos] != '}':
+            pos = self.pos
+            if kinds[pos] == '[':
+                self.pos = pos + 1
+                key = self._expression()
+                self._expect(']')
+                self._expect('=')
+                fields.append(TableField(-1, key, self._expression()))
+            elif kinds[pos] == 'name' and kinds[pos + 1] == '=':
+                self.pos = pos + 2
+                fields.append(TableField(pos, None, self._expression()))
+            else:
+                fields.append(TableField(-1, None, self._expression()))
+            if kinds[self.pos] != ',' and kinds[self.pos] != ';':
+                break
+            self.pos += 1
+        self._expect('}')
+        return TableExpr(fields)
+
+    def _function_body(self, keyword: int) -> FunctionExpr:
+        kinds = self.kinds
+        open = self._expect('(')
+        params = []
+        if kinds[self.pos] != ')':
+            while True:
+                pos = self.pos
+                if kinds[pos] == '...':
+                    self.pos = pos + 1
+                    params.append(pos)
+                    break
+                params.append(self._expect('name'))
+                if kinds[self.pos] != ',':
+                    break
+                self.pos += 1
+        close = self._expect(')')
+        body = self._block()
+        return FunctionExpr(keyword, params, open, close, body, self._expect('end'))
+
+    def _if_expression(self) -> IfExpr:
+        kinds = self.kinds
+        clauses = [self._if_clause(self.pos, -1, self._expression)]
+        while True:
+            pos = self.pos
+            if kinds[pos] == 'elseif':
+                clauses.append(self._if_clause(pos, -1, self._expression))
+            elif kinds[pos] == 'else' and self._else_if(pos):
+                clauses.append(self._if_clause(pos, pos + 1, self._expression))
+            else:
+                break
+        else_keyword = self._expect('else')
+        return IfExpr(clauses, else_keyword, self._expression())
+
+
+def _lex_code(code: str, keywords: Dict[str, str],
+              constructors: Optional[frozenset]) -> Tuple[List[str], List[str], List[int], List[int]]:
+    """
+    Tipos, textos y posiciones (relativas) de los tokens de un fragmento de
+    código (sin `constructors`, ningún nombre se marca para la cascada)
+    """
+    kinds, texts, starts, ends = [], [], [], []
+    pos = 0
+    for space, name, number, op, other in _SYNTAX_TOKEN_REGEX.findall(code):
+        start = pos + len(space)
+        if name:
+            text = name
+            kind = keywords.get(name, 'name')
+            if '_' in name and constructors is not None and _needs_cascade(name, code, start, constructors):
+                kind = 'error'
+        elif op:
+            text = kind = op
+        elif number:
+            text = number
+            kind = 'number' if _NUMBER_REGEX.fullmatch(number) else 'error'
+        elif other:
+            text = other
+            kind = 'error'
+        else:
+            break  # Espacios finales
+        pos = start + len(text)
+        kinds.append(kind)
+        texts.append(text)
+        starts.append(start)
+        ends.append(pos)
+    return kinds, texts, starts, ends
+
+
+def _needs_cascade(word: str, source: str, start: int, constructors: frozenset) -> bool:
+    """
+    True si la traducción de `word` depende de que una pasada reescriba el
+    texto que ve la siguiente (los casos que SinglePassRewriter delega en la
+    cascada), o si es un constructor sin traducción propia tras un punto
+    (la cascada lo combinaría con el nombre anterior como enum)
+    """
+    rewriter = SinglePassRewriter
+    if word.endswith(rewriter.SERVICE_CALL) and word != rewriter.SERVICE_CALL:
+        return True
+    if word.endswith(rewriter.INSTANCE_CALL) and word != rewriter.INSTANCE_CALL:
+        return True
+    if rewriter.BRIGHT_SUFFIX in word and not word.endswith(rewriter.BRIGHT_SUFFIX):
+        return True
+    return (word.endswith('_nuevo') and word[:-len('_nuevo')] not in constructors
+            and start > 0 and source[start - 1] == '.')
+
+
+class LuaGenerator:
+    """
+    Genera Lua a partir del árbol sintáctico en un único recorrido
+
+    Los nodos guardan la posición de sus tokens, así que el texto entre
+    tokens (espacios, comentarios, strings) se copia tal cual y solo se
+    escriben los tokens que cambian. Cada nombre se resuelve con las mismas
+    reglas y prioridades que las pasadas (ver SinglePassRewriter), y el árbol
+    aporta lo que las pasadas deducen con expresiones regulares: las
+    llamadas a métodos, los constructores y sus argumentos. La aridad se
+    valida en el mismo recorrido al cerrar cada llamada.
+
+    Las sentencias inválidas (y las que exceden la profundidad de recursión)
+    se traducen fragmento a fragmento con el motor de la cascada, de modo que
+    la salida coincide con la de los demás motores también en ese caso.
+    """
+
+    __slots__ = ('transpiler', 'source', 'kinds', 'texts', 'starts', 'ends', 'frags', 'lines',
+                 'out', 'pos', 'arity', 'errors', 'properties', 'math', 'enums', 'enum_heads',
+                 'simple_enums', 'global_functions', 'keywords', 'methods', 'constructors',
+                 'validator', 'aliases', '_candidates', '_wordlike', '_statements', '_expressions')
+
+    def __init__(self, transpiler: 'LuaDSLTranspiler', parser: VoxParser):
+        """
+        Args:
+            transpiler: Transpilador cuyas reglas (y caché de líneas) se usan
+            parser: Analizador con el flujo de tokens del árbol a generar
+        """
+        self.transpiler = transpiler
+        self.source = parser.source
+        self.kinds, self.texts = parser.kinds, parser.texts
+        self.starts, self.ends = parser.starts, parser.ends
+        self.frags, self.lines = parser.frags, parser.lines
+        self.out: List[str] = []
+        self.pos = 0
+
+        rules = transpiler.rules
+        self.validator = rules.arity_validator
+        self.aliases = self.validator.aliases
+        self.arity = self.validator.session()
+        self.errors = self.arity.errors  # Errores de aridad del árbol y de la cascada, en orden de cierre
+        self.properties = rules.properties
+        self.math = rules.math
+        self.enums = rules.enums
+        self.enum_heads = frozenset(key.split('.')[0] for key in rules.enums if '.' in key)
+        self.simple_enums = rules.simple_enums
+        self.global_functions = rules.global_functions
+        self.keywords = rules.keywords
+        self.methods = rules.methods
+        self.constructors = rules.constructors
+        # Nombres sin '_' que alguna regla puede traducir (los demás se copian)
+        self._candidates = frozenset().union(
+            self.properties, self.math, self.enums, self.enum_heads, self.global_functions,
+            self.keywords, ('sino',))
+        self._wordlike = frozenset(LUA_KEYWORDS | {'name', 'number'})
+
+        self._statements = {
+            LocalStatement: self._local, LocalFunction: self._local_function,
+            FunctionStatement: self._function_statement, AssignStatement: self._assign,
+            CallStatement: self._call_statement, DoStatement: self._do, WhileStatement: self._while,
+            RepeatStatement: self._repeat, IfStatement: self._if, NumericFor: self._numeric_for,
+            GenericFor: self._generic_for, ReturnStatement: self._return, JumpStatement: self._jump,
+            InvalidStatement: self._invalid,
+        }
+        self._expressions = {
+            NameExpr: self._name, LiteralExpr: self._literal, IndexExpr: self._index,
+            SubscriptExpr: self._subscript, CallExpr: self._call, MethodCallExpr: self._method_call,
+            FunctionExpr: self._function, TableExpr: self._table, BinaryExpr: self._binary,
+            UnaryExpr: self._unary, ParenExpr: self._paren, IfExpr: self._if_expression,
+        }
+
+    def generate(self, chunk: Chunk) -> str:
+        """Lua del archivo completo (los errores de aridad quedan en self.errors)"""
+        cache = self.transpiler.line_cache
+        if cache is not None and cache.rules is not self.transpiler.rules:
+            cache.clear(self.transpiler.rules)
+        self.arity.begin(self.source)
+        self._block(chunk.body)
+        self.out.append(self.source[self.pos:])
+        return ''.join(self.out)
+
+    # ------------------------------------------------------------------
+    # Escritura y resolución de nombres
+    # ------------------------------------------------------------------
+
+    def _write(self, start: int, end: int, text: str) -> None:
+        """Sustituye source[start:end] por `text` (copiando lo anterior)"""
+        self.out.append(self.source[self.pos:start])
+        self.out.append(text)
+        self.pos = end
+
+    def _word(self, i: int) -> None:
+        """Escribe la traducción del nombre o palabra reservada del token i"""
+        text = self.texts[i]
+        if text not in self._candidates and '_' not in text:
+            return
+        start = self.starts[i]
+        if start < self.pos:
+            return  # Ya escrito por una regla que abarca varios tokens
+        following = i + 1
+        if self.kinds[following] == '(' and self.frags[following] == self.frags[i]:
+            # Constructores: Color3_nuevo( → Color3.new(, instancia_nueva( → Instance.new(
+            if text.endswith('_nuevo') and len(text) > len('_nuevo'):
+                name = text[:-len('_nuevo')]
+                constructor = self.constructors.get(name)
+                if constructor is None:
+                    constructor = self._resolve(i, name, start, False)[0]
+                self._write(start, self.ends[following], constructor + '.new(')
+                return
+            if text == SinglePassRewriter.INSTANCE_CALL:
+                self._write(start, self.ends[following], 'Instance.new(')
+                return
+        if text == SinglePassRewriter.SERVICE_CALL:
+            self._write(start, self.ends[i], 'game:GetService')
+            return
+        translated, last = self._resolve(i, text, start, True)
+        if last != i or translated != text:
+            self._write(start, self.ends[last], translated)
+
+    def _resolve(self, i: int, text: str, start: int, lookahead: bool) -> Tuple[str, int]:
+        """
+        Traducción de un nombre y último token que abarca, en el orden de
+        prioridad de SinglePassRewriter._resolve
+        """
+        kinds, texts = self.kinds, self.texts
+        if start and self.source[start - 1] == '.':
+            # Propiedades: .texto → .Text
+            if text in self.properties:
+                return self.properties[text], i
+            # Miembros de math: math.piso → math.floor
+            if (text in self.math and i > 1 and kinds[i - 1] == '.'
+                    and self.ends[i - 2] == start - 1 and texts[i - 2].endswith('math')):
+                return self.math[text], i
+        if text in self.enums:
+            return self.enums[text], i
+        if not lookahead:
+            return self.keywords.get(text, text), i
+
+        field = i + 2
+        if (kinds[i + 1] == '.' and self.starts[i + 1] == self.ends[i]
+                and kinds[field] in self._wordlike and self.starts[field] == self.ends[i + 1]):
+            # Enums con namespace: estilo_suavizado.Quad
+            if text in self.enum_heads:
+                key = f'{text}.{texts[field]}'
+                if key in self.enums:
+                    return self.enums[key], field
+            # Enums simples tras el prefijo de suavizado
+            if texts[field] in self.simple_enums:
+                for prefix in EASING_PREFIXES:
+                    if text.endswith(prefix):
+                        return text[:-len(prefix)] + self.simple_enums[texts[field]], field
+
+        suffix = SinglePassRewriter.BRIGHT_SUFFIX
+        if text.endswith(suffix) and len(text) > len(suffix):
+            color = text[:-len(suffix)]
+            return f'BrickColor.new("Bright {self.keywords.get(color, color)}")', i
+
+        if text == 'sino' and kinds[i + 1] == 'if' and texts[i + 1] == 'si' and self._spaced(i, i + 1):
+            if texts[i + 2] == 'entonces' and self._spaced(i + 1, i + 2):
+                return 'elseif then', i + 2
+            return 'elseif', i + 1
+
+        if text in self.global_functions and kinds[i + 1] == '(' and self.frags[i + 1] == self.frags[i]:
+            return self.global_functions[text], i
+        return self.keywords.get(text, text), i
+
+    def _spaced(self, a: int, b: int) -> bool:
+        """Tokens consecutivos del mismo fragmento separados por espacios"""
+        return self.frags[a] == self.frags[b] and self.starts[b] > self.ends[a]
+
+    def _method(self, colon: int, name: int, open: int) -> None:
+        """:conectar( → :Connect( si los tres tokens están en el mismo fragmento"""
+        text = self.texts[name]
+        frags = self.frags
+        if text in self.methods and open >= 0 and frags[colon] == frags[name] == frags[open]:
+            if self.starts[colon] >= self.pos:
+                self._write(self.starts[colon], self.ends[open], f':{self.methods[text]}(')
+        else:
+            self._word(name)
+
+    # ------------------------------------------------------------------
+    # Aridad
+    # ------------------------------------------------------------------
+
+    def _constructor_site(self, name: int, head: int, open: int) -> Optional[Tuple[int, str]]:
+        """
+        (token inicial, nombre escrito) si el nombre del token `name` (o
+        `cabeza.name`, p. ej. Color3.new) es un constructor seguido de '('
+        en el mismo fragmento; `head` es -1 si no hay cabeza
+        """
+        if open < 0 or self.frags[open] != self.frags[name]:
+            return None
+        texts, aliases = self.texts, self.aliases
+        if head >= 0 and self.kinds[head] == 'name':
+            written = f'{texts[head]}.{texts[name]}'
+            if (written in aliases and self.ends[head] == self.starts[name - 1]
+                    and self.ends[name - 1] == self.starts[name]):
+                return head, written
+        written = texts[name]
+        return (name, written) if written in aliases else None
+
+    def _check_arity(self, site: Tuple[int, str], count: int, multiple: bool, open: int, close: int) -> None:
+        first, written = site
+        constructor = self.aliases[written]
+        if self.validator.accepts(constructor, count, multiple):
+            return
+        start = self.starts[first]
+        column = start - self.source.rfind('\n', 0, start)
+        message = self.validator.message(written, constructor, count, self.source[self.ends[open]:self.starts[close]])
+        self.errors.append((self.lines[first], column, message))
+
+    def _multiple(self, expr: SyntaxNode) -> bool:
+        """True si el argumento termina en `...` o en una llamada a unpack/desempaquetar"""
+        while True:
+            node_type = type(expr)
+            if node_type is BinaryExpr:
+                expr = expr.right
+            elif node_type is UnaryExpr:
+                expr = expr.operand
+            elif node_type is IfExpr:
+                expr = expr.orelse
+            else:
+                break
+        if node_type is LiteralExpr:
+            return self.kinds[expr.token] == '...'
+        if node_type is CallExpr and expr.open >= 0:
+            func = expr.func
+            if type(func) is NameExpr:
+                return self.texts[func.token] in MULTIPLE_VALUE_FUNCTIONS
+            if type(func) is IndexExpr:
+                return self.texts[func.name] in MULTIPLE_VALUE_FUNCTIONS
+            return False
+        if node_type is MethodCallExpr and expr.open >= 0:
+            return self.texts[expr.name] in MULTIPLE_VALUE_FUNCTIONS
+        return False
+
+    def _target_site(self, target: SyntaxNode, open: int) -> Optional[Tuple[int, str]]:
+        """Constructor escrito en un nombre llamado (NameExpr o IndexExpr)"""
+        if type(target) is NameExpr:
+            return self._constructor_site(target.token, -1, open)
+        if type(target) is IndexExpr:
+            return self._constructor_site(target.name, target.dot - 1, open)
+        return None
+
+    # ------------------------------------------------------------------
+    # Sentencias
+    # ------------------------------------------------------------------
+
+    def _block(self, body: List[Statement]) -> None:
+        statements = self._statements
+        out = self.out
+        for statement in body:
+            mark = (len(out), self.pos, len(self.errors))
+            try:
+                statements[type(statement)](statement)
+            except RecursionError:
+                # Anidamiento demasiado profundo: se rehace con la cascada
+                length, self.pos, errors = mark
+                del out[length:]
+                del self.errors[errors:]
+                self._invalid(statement)
+
+    def _invalid(self, statement: Statement) -> None:
+        """Traduce los tokens de la sentencia fragmento a fragmento con la cascada"""
+        transpiler = self.transpiler
+        cache = transpiler.line_cache
+        arity = self.arity
+        kinds, frags, starts, ends = self.kinds, self.frags, self.starts, self.ends
+        source = self.source
+        i = statement.first
+        last = statement.last
+        while i <= last:
+            if starts[i] < self.pos:
+                i += 1  # Ya escrito por una regla que abarca varios tokens
+                continue
+            if kinds[i] == 'string':
+                if arity.calls:
+                    arity.feed_value()
+                i += 1
+                continue
+            fragment = frags[i]
+            j = i
+            while j < last and frags[j + 1] == fragment:
+                j += 1
+            start, end = starts[i], ends[j]
+            line = self.lines[i]
+            i = j + 1
+            if arity.calls or arity.next_trigger < end:
+                arity.feed_code(source, start, end, line)
+            if self.errors:
+                continue
+            text = source[start:end]
+            translated = cache.get(text) if cache is not None else None
+            if translated is None:
+                try:
+                    translated = transpiler._process_code_semantic(text)
+                except Exception as e:
+                    raise DSLError(f"Error procesando línea {line}: {str(e)}")
+                if cache is not None:
+                    cache.put(text, translated)
+            if translated != text:
+                self._write(start, end, translated)
+
+    def _local(self, node: LocalStatement) -> None:
+        self._word(node.keyword)
+        for name in node.names:
+            self._word(name)
+        for value in node.values:
+            self._expressions[type(value)](value)
+
+    def _local_function(self, node: LocalFunction) -> None:
+        self._word(node.keyword)
+        func = node.func
+        self._word(func.keyword)
+        self._word(node.name)
+        self._function_rest(func, self._constructor_site(node.name, -1, func.open))
+
+    def _function_statement(self, node: FunctionStatement) -> None:
+        func = node.func
+        self._word(func.keyword)
+        self._expressions[type(node.target)](node.target)
+        if node.method >= 0:
+            self._method(node.colon, node.method, func.open)
+            site = self._constructor_site(node.method, -1, func.open)
+        else:
+            site = self._target_site(node.target, func.open)
+        self._function_rest(func, site)
+
+    def _assign(self, node: AssignStatement) -> None:
+        expressions = self._expressions
+        for target in node.targets:
+            expressions[type(target)](target)
+        for value in node.values:
+            expressions[type(value)](value)
+
+    def _call_statement(self, node: CallStatement) -> None:
+        self._expressions[type(node.call)](node.call)
+
+    def _do(self, node: DoStatement) -> None:
+        self._word(node.keyword)
+        self._block(node.body)
+        self._word(node.end)
+
+    def _while(self, node: WhileStatement) -> None:
+        self._word(node.keyword)
+        self._expressions[type(node.condition)](node.condition)
+        self._word(node.do)
+        self._block(node.body)
+        self._word(node.end)
+
+    def _repeat(self, node: RepeatStatement) -> None:
+        self._word(node.keyword)
+        self._block(node.body)
+        self._word(node.until)
+        self._expressions[type(node.condition)](node.condition)
+
+    def _if(self, node: IfStatement) -> None:
+        for clause in node.clauses:
+            self._if_clause(clause)
+            self._block(clause.body)
+        if node.else_keyword >= 0:
+            self._word(node.else_keyword)
+            self._block(node.orelse)
+        self._word(node.end)
+
+    def _if_clause(self, clause: IfClause) -> None:
+        self._word(clause.keyword)
+        if clause.keyword2 >= 0:
+            self._word(clause.keyword2)
+        self._expressions[type(clause.condition)](clause.condition)
+        self._word(clause.then)
+
+    def _numeric_for(self, node: NumericFor) -> None:
+        expressions = self._expressions
+        self._word(node.keyword)
+        self._word(node.var)
+        expressions[type(node.start)](node.start)
+        expressions[type(node.stop)](node.stop)
+        if node.step is not None:
+            expressions[type(node.step)](node.step)
+        self._word(node.do)
+        self._block(node.body)
+        self._word(node.end)
+
+    def _generic_for(self, node: GenericFor) -> None:
+        self._word(node.keyword)
+        for name in node.names:
+            self._word(name)
+        self._word(node.in_keyword)
+        for value in node.values:
+            self._expressions[type(value)](value)
+        self._word(node.do)
+        self._block(node.body)
+        self._word(node.end)
+
+    def _return(self, node: ReturnStatement) -> None:
+        self._word(node.keyword)
+        for value in node.values:
+            self._expressions[type(value)](value)
+
+    def _jump(self, node: JumpStatement) -> None:
+        self._word(node.keyword)
+
+    # ------------------------------------------------------------------
+    # Expresiones
+    # ------------------------------------------------------------------
+
+    def _name(self, node: NameExpr) -> None:
+        self._word(node.token)
+
+    def _literal(self, node: LiteralExpr) -> None:
+        kind = self.kinds[node.token]
+        if kind == 'nil' or kind == 'true' or kind == 'false':
+            self._word(node.token)
+
+    def _index(self, node: IndexExpr) -> None:
+        self._expressions[type(node.obj)](node.obj)
+        self._word(node.name)
+
+    def _subscript(self, node: SubscriptExpr) -> None:
+        self._expressions[type(node.obj)](node.obj)
+        self._expressions[type(node.key)](node.key)
+
+    def _call(self, node: CallExpr) -> None:
+        expressions = self._expressions
+        expressions[type(node.func)](node.func)
+        for arg in node.args:
+            expressions[type(arg)](arg)
+        site = self._target_site(node.func, node.open)
+        if site is not None:
+            args = node.args
+            self._check_arity(site, len(args), bool(args) and self._multiple(args[-1]), node.open, node.close)
+
+    def _method_call(self, node: MethodCallExpr) -> None:
+        expressions = self._expressions
+        expressions[type(node.obj)](node.obj)
+        self._method(node.colon, node.name, node.open)
+        for arg in node.args:
+            expressions[type(arg)](arg)
+        site = self._constructor_site(node.name, -1, node.open)
+        if site is not None:
+            args = node.args
+            self._check_arity(site, len(args), bool(args) and self._multiple(args[-1]), node.open, node.close)
+
+    def _function(self, node: FunctionExpr) -> None:
+        self._word(node.keyword)
+        self._function_rest(node, None)
+
+    def _function_rest(self, node: FunctionExpr, site: Optional[Tuple[int, str]]) -> None:
+        """Parámetros, cuerpo y fin; `site` si el nombre declarado es un constructor"""
+        kinds = self.kinds
+        for param in node.params:
+            if kinds[param] == 'name':
+                self._word(param)
+        if site is not None:
+            # Las pasadas validan `funcion Color3_nuevo(a, b)` como una llamada
+            params = node.params
+            multiple = bool(params) and kinds[params[-1]] == '...'
+            self._check_arity(site, len(params), multiple, node.open, node.close)
+        self._block(node.body)
+        self._word(node.end)
+
+    def _table(self, node: TableExpr) -> None:
+        expressions = self._expressions
+        for field in node.fields:
+            if field.name >= 0:
+                self._word(field.name)
+            elif field.key is not None:
+                expressions[type(field.key)](field.key)
+            expressions[type(field.value)](field.value)
+
+    def _binary(self, node: BinaryExpr) -> None:
+        # La columna izquierda se recorre sin recursión (a + b + c + ...)
+        expressions = self._expressions
+        spine = []
+        while type(node) is BinaryExpr:
+            spine.append(node)
+            node = node.left
+        expressions[type(node)](node)
+        kinds = self.kinds
+        for node in reversed(spine):
+            kind = kinds[node.op]
+            if kind == 'and' or kind == 'or':
+                self._word(node.op)
+            expressions[type(node.right)](node.right)
+
+    def _unary(self, node: UnaryExpr) -> None:
+        if self.kinds[node.op] == 'not':
+            self._word(node.op)
+        self._expressions[type(node.operand)](node.operand)
+
+    def _paren(self, node: ParenExpr) -> None:
+        self._expressions[type(node.expr)](node.expr)
+
+    def _if_expression(self, node: IfExpr) -> None:
+        expressions = self._expressions
+        for clause in node.clauses:
+            self._if_clause(clause)
+            expressions[type(clause.body)](clause.body)
+        self._word(node.else_keyword)
+        expressions[type(node.orelse)](node.orelse)
+
+
+# ============================================================================
+# OPTIMIZACIÓN Y MINIFICACIÓN DEL LUA GENERADO
+# ============================================================================
+
+class _LuaBinding:
+    """Variable local: token de su declaración (-1 si es implícita) y de sus usos"""
+
+    __slots__ = ('token', 'slot', 'references', 'assigned')
+
+    def __init__(self, token: int, slot: int):
+        self.token = token
+        self.slot = slot              # Locales visibles al declararla (-1 si es implícita)
+        self.references: List[int] = []
+        self.assigned = False         # Se le asigna después de declararla
+
+
+class _LuaScopes:
+    """
+    Recorrido del árbol de un archivo Lua que resuelve cada nombre
+
+    Cada uso de un nombre queda en la variable local que lo declara
+    (`bindings`) o, si no hay ninguna visible, en `globals`. Las subclases
+    redefinen los métodos de los nodos que les interesan; `depth` cuenta las
+    funciones y bucles que rodean al nodo actual y `statement` es el índice de
+    la sentencia de nivel superior que lo contiene.
+    """
+
+    __slots__ = ('texts', 'kinds', 'bindings', 'globals', 'assigned_globals', 'depth', 'statement',
+                 '_scopes', '_visible', '_statements', '_expressions')
+
+    def __init__(self, parser: VoxParser):
+        self.texts = parser.texts
+        self.kinds = parser.kinds
+        self.bindings: List[_LuaBinding] = []
+        self.globals = set()
+        self.assigned_globals = set()
+        self.depth = 0
+        self.statement = 0
+        self._scopes: List[Dict[str, _LuaBinding]] = [{}]
+        self._visible = 0
+        self._statements = {
+            LocalStatement: self._local, LocalFunction: self._local_function,
+            FunctionStatement: self._function_statement, AssignStatement: self._assign,
+            CallStatement: self._call_statement, DoStatement: self._do, WhileStatement: self._while,
+            RepeatStatement: self._repeat, IfStatement: self._if, NumericFor: self._numeric_for,
+            GenericFor: self._generic_for, ReturnStatement: self._return, JumpStatement: self._jump,
+        }
+        self._expressions = {
+            NameExpr: self._name, LiteralExpr: self._literal, IndexExpr: self._index,
+            SubscriptExpr: self._subscript, CallExpr: self._call, MethodCallExpr: self._method_call,
+            FunctionExpr: self._function, TableExpr: self._table, BinaryExpr: self._binary,
+            UnaryExpr: self._unary, ParenExpr: self._paren, IfExpr: self._if_expression,
+        }
+
+    def walk(self, chunk: Chunk) -> None:
+        """
+        Raises:
+            RecursionError: Si el anidamiento excede la profundidad de recursión
+        """
+        statements = self._statements
+        for index, statement in enumerate(chunk.body):
+            self.statement = index
+            statements[type(statement)](statement)
+
+    @property
+    def top_level(self) -> Dict[str, _LuaBinding]:
+        """Locales declaradas al nivel superior del archivo, por nombre"""
+        return self._scopes[0]
+
+    def resolve(self, name: str) -> Optional[_LuaBinding]:
+        """Local visible con ese nombre en el punto actual (None si es global)"""
+        for scope in reversed(self._scopes):
+            binding = scope.get(name)
+            if binding is not None:
+                return binding
+        return None
+
+    def _open(self) -> int:
+        self._scopes.append({})
+        return self._visible
+
+    def _close(self, visible: int) -> None:
+        self._scopes.pop()
+        self._visible = visible
+
+    def _declare(self, token: int) -> None:
+        binding = _LuaBinding(token, self._visible)
+        self._visible += 1
+        self.bindings.append(binding)
+        self._scopes[-1][self.texts[token]] = binding
+
+    def _block(self, body: List[Statement]) -> None:
+        visible = self._open()
+        self._statements_of(body)
+        self._close(visible)
+
+    def _repeated(self, body: List[Statement]) -> None:
+        """Cuerpo de un bucle o de una función: puede ejecutarse muchas veces"""
+        self.depth += 1
+        self._statements_of(body)
+        self.depth -= 1
+
+    def _statements_of(self, body: List[Statement]) -> None:
+        statements = self._statements
+        for statement in body:
+            statements[type(statement)](statement)
+
+    def _expression(self, node: SyntaxNode) -> None:
+        self._expressions[type(node)](node)
+
+    def _expression_list(self, nodes: List[SyntaxNode]) -> None:
+        expressions = self._expressions
+        for node in nodes:
+            expressions[type(node)](node)
+
+    def _assigned(self, target: SyntaxNode) -> None:
+        if type(target) is NameExpr:
+            name = self.texts[target.token]
+            binding = self.resolve(name)
+            if binding is not None:
+                binding.assigned = True
+            else:
+                self.assigned_globals.add(name)
+        self._expression(target)
+
+    # ------------------------------------------------------------------
+    # Sentencias
+    # ------------------------------------------------------------------
+
+    def _local(self, node: LocalStatement) -> None:
+        # Los valores se evalúan antes de que existan las nuevas locales
+        self._expression_list(node.values)
+        for name in node.names:
+            self._declare(name)
+
+    def _local_function(self, node: LocalFunction) -> None:
+        self._declare(node.name)  # Visible dentro de su propio cuerpo
+        self._function(node.func)
+
+    def _function_statement(self, node: FunctionStatement) -> None:
+        self._assigned(node.target)
+        self._function(node.func, node.colon >= 0)
+
+    def _assign(self, node: AssignStatement) -> None:
+        for target in node.targets:
+            self._assigned(target)
+        self._expression_list(node.values)
+
+    def _call_statement(self, node: CallStatement) -> None:
+        self._expression(node.call)
+
+    def _do(self, node: DoStatement) -> None:
+        self._block(node.body)
+
+    def _while(self, node: WhileStatement) -> None:
+        self.depth += 1
+        self._expression(node.condition)
+        self.depth -= 1
+        visible = self._open()
+        self._repeated(node.body)
+        self._close(visible)
+
+    def _repeat(self, node: RepeatStatement) -> None:
+        # La condición de `hasta` ve las locales del cuerpo
+        visible = self._open()
+        self.depth += 1
+        self._statements_of(node.body)
+        self._expression(node.condition)
+        self.depth -= 1
+        self._close(visible)
+
+    def _if(self, node: IfStatement) -> None:
+        for clause in node.clauses:
+            self._expression(clause.condition)
+            self._block(clause.body)
+        self._block(node.orelse)
+
+    def _numeric_for(self, node: NumericFor) -> None:
+        self._expression(node.start)
+        self._expression(node.stop)
+        if node.step is not None:
+            self._expression(node.step)
+        visible = self._open()
+        self._declare(node.var)
+        self._repeated(node.body)
+        self._close(visible)
+
+    def _generic_for(self, node: GenericFor) -> None:
+        self._expression_list(node.values)
+        visible = self._open()
+        for name in node.names:
+            self._declare(name)
+        self._repeated(node.body)
+        self._close(visible)
+
+    def _return(self, node: ReturnStatement) -> None:
+        self._expression_list(node.values)
+
+    def _jump(self, node: JumpStatement) -> None:
+        pass
+
+    # ------------------------------------------------------------------
+    # Expresiones
+    # ------------------------------------------------------------------
+
+    def _name(self, node: NameExpr) -> None:
+        name = self.texts[node.token]
+        binding = self.resolve(name)
+        if binding is not None:
+            binding.references.append(node.token)
+        else:
+            self.globals.add(name)
+
+    def _literal(self, node: LiteralExpr) -> None:
+        pass
+
+    def _index(self, node: IndexExpr) -> None:
+        self._expression(node.obj)
+
+    def _subscript(self, node: SubscriptExpr) -> None:
+        self._expression(node.obj)
+        self._expression(node.key)
+
+    def _call(self, node: CallExpr) -> None:
+        self._expression(node.func)
+        self._expression_list(node.args)
+
+    def _method_call(self, node: MethodCallExpr) -> None:
+        self._expression(node.obj)
+        self._expression_list(node.args)
+
+    def _function(self, node: FunctionExpr, method: bool = False) -> None:
+        visible = self._open()
+        if method:
+            # `self` implícito: visible en el cuerpo, sin token propio
+            self._scopes[-1]['self'] = _LuaBinding(-1, -1)
+        for param in node.params:
+            if self.texts[param] != '...':
+                self._declare(param)
+        self._repeated(node.body)
+        self._close(visible)
+
+    def _table(self, node: TableExpr) -> None:
+        for field in node.fields:
+            if field.key is not None:
+                self._expression(field.key)
+            self._expression(field.value)
+
+    def _binary(self, node: BinaryExpr) -> None:
+        self._expression(node.left)
+        self._expression(node.right)
+
+    def _unary(self, node: UnaryExpr) -> None:
+        self._expression(node.operand)
+
+    def _paren(self, node: ParenExpr) -> None:
+        self._expression(node.expr)
+
+    def _if_expression(self, node: IfExpr) -> None:
+        for clause in node.clauses:
+            self._expression(clause.condition)
+            self._expression(clause.body)
+        self._expression(node.orelse)
+
+
+# Pares de caracteres que, sin espacio entre dos tokens, formarían otro token
+_JOINING_PAIRS = frozenset(('--', '[[', '[=', '..', '==', '<=', '>=', '~=', '+=', '-=', '*=', '/=',
+                            '%=', '^=', '.=', '//', '::', '->'))
+
+# Nombres cortos: el primer carácter no puede ser un dígito
+_NAME_START = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+_NAME_CHARS = _NAME_START + '0123456789'
+
+
+def _short_name(index: int) -> str:
+    """Nombre válido número `index` (a, b, ..., _, aa, ba, ...)"""
+    name = _NAME_START[index % len(_NAME_START)]
+    index //= len(_NAME_START)
+    while index:
+        index -= 1
+        name += _NAME_CHARS[index % len(_NAME_CHARS)]
+        index //= len(_NAME_CHARS)
+    return name
+
+
+class LuaMinifier:
+    """
+    Minificador del Lua generado
+
+    Analiza la salida con VoxParser (en modo Lua) y la vuelve a escribir
+    token a token: sin comentarios y con un espacio solo donde dos tokens
+    juntos formarían otro. Con `rename`, las variables locales y los
+    parámetros reciben nombres cortos según su ámbito: cada declaración toma
+    el primer nombre que no usa ninguna local visible en ese punto, así que
+    nunca oculta una variable que se sigue usando dentro. Los nombres
+    globales (game, workspace, Instance, math...) y los campos y métodos tras
+    '.' o ':' no se tocan, y ningún nombre corto coincide con un global del
+    archivo ni con `self`.
+
+    Los comentarios de directiva del principio (`--!strict`, `--!native`) se
+    conservan. Si el Lua no se puede analizar, se devuelve sin cambios y los
+    errores quedan en `errors`.
+    """
+
+    __slots__ = ('rename', 'errors', 'renamed', 'size_before', 'size_after')
+
+    def __init__(self, rename: bool = True):
+        """
+        Args:
+            rename: Acortar los nombres de locales y parámetros
+        """
+        self.rename = rename
+        self.errors: List[Tuple[int, int, str]] = []
+        self.renamed = 0       # Locales y parámetros renombrados en la última llamada
+        self.size_before = 0   # Bytes (UTF-8) antes y después de la última llamada
+        self.size_after = 0
+
+    def minify(self, lua: str) -> str:
+        """
+        Lua minificado de `lua`
+
+        Returns:
+            El código minificado, o `lua` sin cambios si tiene errores de sintaxis
+        """
+        self.renamed = 0
+        self.size_before = self.size_after = len(lua.encode('utf-8'))
+        parser = VoxParser(lua, lua=True)
+        chunk = parser.parse()
+        self.errors = parser.errors
+        if parser.errors:
+            return lua
+        names = self._rename(parser, chunk) if self.rename else {}
+
+        kinds, texts = parser.kinds, parser.texts
+        out = self._directives(lua)
+        previous = ''
+        previous_kind = ''
+        for i in range(len(kinds) - 1):  # Sin el token 'eof'
+            text = names.get(i) or texts[i]
+            if previous and self._needs_space(previous, previous_kind, text, kinds[i]):
+                out.append(' ')
+            out.append(text)
+            previous = text
+            previous_kind = kinds[i]
+        if lua.endswith('\n'):
+            out.append('\n')
+        result = ''.join(out)
+        self.size_after = len(result.encode('utf-8'))
+        return result
+
+    @staticmethod
+    def _directives(lua: str) -> List[str]:
+        """Comentarios `--!` anteriores al primer token de código (cada uno en su línea)"""
+        directives = []
+        for token in tokenize(lua):
+            kind = token.kind
+            text = lua[token.start:token.end]
+            if kind is TokenKind.COMMENT and text.startswith('--!'):
+                directives.append(text.rstrip() + '\n')
+            elif kind is TokenKind.STRING or kind is TokenKind.LONG_STRING or (kind is TokenKind.CODE and text.strip()):
+                break
+        return directives
+
+    @staticmethod
+    def _needs_space(left: str, left_kind: str, right: str, right_kind: str) -> bool:
+        """True si `left` y `right` escritos juntos no se leerían como los mismos dos tokens"""
+        a, b = left[-1], right[0]
+        if (a.isalnum() or a == '_') and (b.isalnum() or b == '_'):
+            return True
+        if a + b in _JOINING_PAIRS:
+            return True
+        if left_kind == 'number':
+            # 1 .. x, 0x1E - 1
+            return b == '.' or (a in 'eE' and b in '+-')
+        return right_kind == 'number' and a == '.'
+
+    def _rename(self, parser: VoxParser, chunk: Chunk) -> Dict[int, str]:
+        """Nuevo nombre de cada token de una local o parámetro"""
+        scopes = _LuaScopes(parser)
+        try:
+            scopes.walk(chunk)
+        except RecursionError:
+            return {}
+
+        excluded = LUA_KEYWORDS | scopes.globals | {'self'}
+        slots: List[str] = []
+        index = 0
+        names = {}
+        for binding in scopes.bindings:
+            while len(slots) <= binding.slot:
+                name = _short_name(index)
+                index += 1
+                if name not in excluded:
+                    slots.append(name)
+            name = slots[binding.slot]
+            names[binding.token] = name
+            for token in binding.references:
+                names[token] = name
+        self.renamed = len(scopes.bindings)
+        return names
+
+
+# Niveles de optimización (--optimizar)
+OPTIMIZE_NONE = 0
+OPTIMIZE_LOOKUPS = 1   # GetService y WaitForChild repetidos en locales
+OPTIMIZE_GLOBALS = 2   # Además, funciones de math y task y constructores en locales
+OPTIMIZATION_LEVELS = (OPTIMIZE_NONE, OPTIMIZE_LOOKUPS, OPTIMIZE_GLOBALS)
+
+# Globales raíz de las rutas de instancias que se pueden elevar
+_INSTANCE_ROOTS = frozenset(('game', 'workspace', 'script'))
+_LOOKUP_METHODS = {'game': 'GetService'}  # Método de búsqueda propio de cada raíz
+_CHILD_LOOKUP = 'WaitForChild'
+
+# Locales que el optimizador deja como máximo en cada función, contando las
+# que ya tiene: Luau admite 200 locales y 200 upvalues por función
+_MAX_FUNCTION_LOCALS = 180
+
+# Campos de globales que el nivel 2 guarda en locales: todos los de las
+# librerías (None) y el constructor de los tipos de Roblox
+_LOCALIZED_LIBRARIES = ('math', 'task')
+_LOCALIZED_GLOBALS: Dict[str, Optional[frozenset]] = {
+    **{library: None for library in _LOCALIZED_LIBRARIES},
+    **{constructor.split('.')[0]: frozenset(('new',)) for constructor in CONSTRUCTOR_SIGNATURES},
+    **{name: frozenset(('new',)) for name in CONSTRUCTOR_NAMES.values()},
+}
+
+
+def _string_value(text: str) -> Optional[str]:
+    """Valor de un string corto sin escapes ("Players"), o None"""
+    if len(text) >= 2 and text[0] in '"\'' and text[-1] == text[0] and '\\' not in text:
+        return text[1:-1]
+    return None
+
+
+class _LookupCollector(_LuaScopes):
+    """
+    Recoge las búsquedas de servicios e hijos (`game:GetService("S")`,
+    `workspace:WaitForChild("A"):WaitForChild("B")`) cuya raíz es el global
+
+    `sites` asocia cada ruta (tupla raíz, método, nombre, método, nombre...)
+    a sus apariciones: [primer token, último token, si se repite (dentro de
+    un bucle o función), sentencia de nivel superior, local existente visible,
+    bucle, función, sentencia]. El bucle es el más externo de la función que
+    contiene la aparición, o None si no hay ninguno o si la aparición no se
+    evalúa siempre que se ejecuta su sentencia (lado derecho de `and`/`or`,
+    ramas de un `if` en expresión, condiciones de `sino si` y de `hasta`); la
+    sentencia es la más interna que la contiene. La función es el índice en
+    `function_locals`, con el máximo de locales visibles en cada una (0: el
+    archivo).
+    `declared` guarda la primera local de nivel superior inicializada con
+    cada ruta (`local Players = game:GetService("Players")`).
+
+    `fields` recoge igual los accesos a campos de _LOCALIZED_GLOBALS
+    (`math.floor`, `Vector3.new`) como (global, campo), y `assigned_fields`
+    los que el script reasigna (`math.floor = ...`, `function task.wait()`).
+    """
+
+    __slots__ = ('sites', 'declared', 'fields', 'assigned_fields', 'function_locals',
+                 '_paths', '_anchor', '_loop', '_conditional', '_current', '_function_index')
+
+    def __init__(self, parser: VoxParser):
+        super().__init__(parser)
+        self.sites: Dict[tuple, List[list]] = {}
+        self.declared: Dict[tuple, Tuple[_LuaBinding, Tuple[int, int]]] = {}
+        self.fields: Dict[Tuple[str, str], List[list]] = {}
+        self.assigned_fields = set()
+        self.function_locals = [0]
+        self._paths: Dict[int, Tuple[tuple, int]] = {}  # id(nodo) -> (ruta, primer token)
+        self._anchor: Optional[Statement] = None   # Bucle más externo de la función actual
+        self._loop: Optional[Statement] = None     # Bucle cuyo cuerpo se va a recorrer
+        self._conditional = False                  # La expresión puede no evaluarse
+        self._current: Optional[Statement] = None  # Sentencia más interna
+        self._function_index = 0
+
+    def _declare(self, token: int) -> None:
+        super()._declare(token)
+        # Máximo de locales visibles a la vez, con las de las funciones que la
+        # rodean (las que puede capturar como upvalues)
+        index = self._function_index
+        self.function_locals[index] = max(self.function_locals[index], self._visible)
+
+    def _repeated(self, body: List[Statement]) -> None:
+        loop, self._loop = self._loop, None
+        anchor = self._anchor
+        if anchor is None:
+            self._anchor = loop
+        super()._repeated(body)
+        self._anchor = anchor
+
+    def _statements_of(self, body: List[Statement]) -> None:
+        current = self._current
+        statements = self._statements
+        for statement in body:
+            self._current = statement
+            statements[type(statement)](statement)
+        self._current = current
+
+    def _numeric_for(self, node: NumericFor) -> None:
+        self._loop = node
+        super()._numeric_for(node)
+
+    def _generic_for(self, node: GenericFor) -> None:
+        self._loop = node
+        super()._generic_for(node)
+
+    def _while(self, node: WhileStatement) -> None:
+        self._loop = node
+        super()._while(node)
+
+    def _repeat(self, node: RepeatStatement) -> None:
+        anchor = self._anchor
+        if anchor is None:
+            self._anchor = node
+        visible = self._open()
+        self.depth += 1
+        self._statements_of(node.body)
+        # `hasta` se evalúa después del cuerpo, no antes de la sentencia
+        conditional, self._conditional = self._conditional, True
+        self._expression(node.condition)
+        self._conditional = conditional
+        self.depth -= 1
+        self._close(visible)
+        self._anchor = anchor
+
+    # Lo que puede no evaluarse no se adelanta al principio de su sentencia
+
+    def _if(self, node: IfStatement) -> None:
+        conditional = self._conditional
+        for index, clause in enumerate(node.clauses):
+            self._conditional = conditional or index > 0
+            self._expression(clause.condition)
+            self._conditional = conditional
+            self._block(clause.body)
+        self._block(node.orelse)
+
+    def _if_expression(self, node: IfExpr) -> None:
+        conditional = self._conditional
+        for index, clause in enumerate(node.clauses):
+            self._conditional = conditional or index > 0
+            self._expression(clause.condition)
+            self._conditional = True
+            self._expression(clause.body)
+        self._expression(node.orelse)
+        self._conditional = conditional
+
+    def _binary(self, node: BinaryExpr) -> None:
+        if self.texts[node.op] not in ('and', 'or'):
+            super()._binary(node)
+            return
+        self._expression(node.left)
+        conditional, self._conditional = self._conditional, True
+        self._expression(node.right)
+        self._conditional = conditional
+
+    def _function(self, node: FunctionExpr, method: bool = False) -> None:
+        saved = self._anchor, self._loop, self._conditional, self._function_index
+        self._anchor = self._loop = None
+        self._conditional = False
+        self._function_index = len(self.function_locals)
+        self.function_locals.append(0)
+        super()._function(node, method)
+        self._anchor, self._loop, self._conditional, self._function_index = saved
+
+    def _assigned(self, target: SyntaxNode) -> None:
+        if type(target) is IndexExpr and type(target.obj) is NameExpr:
+            self.assigned_fields.add((self.texts[target.obj.token], self.texts[target.name]))
+        super()._assigned(target)
+
+    def _index(self, node: IndexExpr) -> None:
+        super()._index(node)
+        obj = node.obj
+        if type(obj) is not NameExpr:
+            return
+        table = self.texts[obj.token]
+        if table not in _LOCALIZED_GLOBALS or self.resolve(table) is not None:
+            return
+        allowed = _LOCALIZED_GLOBALS[table]
+        field = self.texts[node.name]
+        if allowed is None or field in allowed:
+            self.fields.setdefault((table, field), []).append([obj.token, node.name, self.depth > 0, self.statement])
+
+    def _local(self, node: LocalStatement) -> None:
+        super()._local(node)
+        if len(self._scopes) == 1 and len(node.names) == 1 and len(node.values) == 1:
+            path = self._paths.get(id(node.values[0]))
+            if path is not None and path[0] not in self.declared:
+                site = self.sites[path[0]][-1]
+                self.declared[path[0]] = (self.resolve(self.texts[node.names[0]]), (site[0], site[1]))
+
+    def _method_call(self, node: MethodCallExpr) -> None:
+        super()._method_call(node)
+        texts = self.texts
+        obj = node.obj
+        if type(obj) is NameExpr:
+            root = texts[obj.token]
+            if root not in _INSTANCE_ROOTS or self.resolve(root) is not None:
+                return
+            parent, first = (root,), obj.token
+        else:
+            found = self._paths.get(id(obj))
+            if found is None:
+                return
+            parent, first = found
+        method = texts[node.name]
+        if method != (_LOOKUP_METHODS.get(parent[0], _CHILD_LOOKUP) if len(parent) == 1 else _CHILD_LOOKUP):
+            return
+        if len(node.args) != 1 or type(node.args[0]) is not LiteralExpr or self.kinds[node.args[0].token] != 'string':
+            return
+        value = _string_value(texts[node.args[0].token])
+        if value is None:
+            return
+        path = parent + (method, value)
+        self._paths[id(node)] = (path, first)
+        last = node.close if node.close >= 0 else node.args[0].token
+        declared = self.declared.get(path)
+        visible = declared is not None and self.resolve(texts[declared[0].token]) is declared[0]
+        anchor = None if self._conditional else self._anchor
+        self.sites.setdefault(path, []).append([first, last, self.depth > 0, self.statement, visible,
+                                                anchor, self._function_index, self._current])
+
+
+class LuaOptimizer:
+    """
+    Optimizador del Lua generado (--optimizar)
+
+    Nivel 1 (OPTIMIZE_LOOKUPS): cada servicio que se pide más de una vez, o
+    dentro de una función o un bucle, se guarda en una local al principio del
+    script (`local Players = game:GetService("Players")`); si el script ya
+    declara esa local al nivel superior (y no la reasigna), se reutiliza. Las
+    rutas de WaitForChild sobre game, workspace, script o un servicio que
+    están dentro de un bucle se guardan en una local declarada justo antes del
+    bucle, en la misma función, y asignada en el propio bucle la primera vez
+    que se ejecuta la sentencia que la busca (`Mapa = Mapa or
+    workspace:WaitForChild("Mapa")`): un bucle que no da ninguna vuelta, o una
+    rama de un `if`, un `and` o un `or` que no se toma, no espera a ningún
+    hijo. Nada sale de una función. Solo se eleva lo que no puede cambiar:
+    raíces globales que el script no redefine y nombres literales. Ninguna
+    función pasa de _MAX_FUNCTION_LOCALS locales.
+
+    Nivel 2 (OPTIMIZE_GLOBALS): además, las funciones de math y task y los
+    constructores de los tipos de Roblox que se usan más de una vez o dentro
+    de una función o un bucle se guardan en locales al principio del script
+    (`local floor = math.floor`, `local task_wait = task.wait`,
+    `local Vector3_new = Vector3.new`), salvo si el script redefine la
+    librería o ese campo.
+
+    Los nombres nuevos no coinciden con ningún nombre del archivo. Lo elevado
+    queda en `hoisted`; si el Lua no se puede analizar, se devuelve sin
+    cambios y los errores quedan en `errors`.
+    """
+
+    __slots__ = ('level', 'errors', 'hoisted')
+
+    def __init__(self, level: int = OPTIMIZE_LOOKUPS):
+        """
+        Args:
+            level: Nivel de optimización (ver OPTIMIZATION_LEVELS)
+
+        Raises:
+            ValueError: Si el nivel no existe
+        """
+        if level not in OPTIMIZATION_LEVELS:
+            raise ValueError(f"Nivel de optimización desconocido {level}. "
+                             f"Opciones: {', '.join(map(str, OPTIMIZATION_LEVELS))}")
+        self.level = level
+        self.errors: List[Tuple[int, int, str]] = []
+        self.hoisted: List[Tuple[str, str, int]] = []  # (local, expresión, usos) de la última llamada
+
+    def optimize(self, lua: str) -> str:
+        """
+        Lua optimizado de `lua`
+
+        Returns:
+            El código optimizado, o `lua` sin cambios si tiene errores de sintaxis
+        """
+        self.hoisted = []
+        self.errors = []
+        if self.level == OPTIMIZE_NONE:
+            return lua
+        parser = VoxParser(lua, lua=True)
+        chunk = parser.parse()
+        self.errors = parser.errors
+        if parser.errors or not chunk.body:
+            return lua
+        collector = _LookupCollector(parser)
+        try:
+            collector.walk(chunk)
+        except RecursionError:
+            return lua
+        # Nombres de variable del archivo (no los campos tras `.` o `:`)
+        texts = parser.texts
+        used = {text for i, (kind, text) in enumerate(zip(parser.kinds, texts))
+                if kind == 'name' and (i == 0 or texts[i - 1] not in ('.', ':'))}
+        # Locales que aún caben en cada función
+        room = [max(0, _MAX_FUNCTION_LOCALS - count) for count in collector.function_locals]
+        definitions = []
+        replacements = []
+        self._hoist_lookups(parser, chunk, collector, used, room, definitions, replacements)
+        if self.level >= OPTIMIZE_GLOBALS:
+            self._localize_globals(chunk, collector, used, room, definitions, replacements)
+        if not definitions and not replacements:
+            return lua
+        edits = self._edits(parser, definitions, replacements)
+
+        edits.sort(key=lambda edit: (edit[0], edit[1] != edit[0]))
+        out = []
+        pos = 0
+        for start, end, text in edits:
+            out.append(lua[pos:start])
+            out.append(text)
+            pos = end
+        out.append(lua[pos:])
+        return ''.join(out)
+
+    @staticmethod
+    def _worth_hoisting(sites: List[list]) -> bool:
+        """Más de un uso, o alguno dentro de una función o un bucle"""
+        return len(sites) > 1 or any(site[2] for site in sites)
+
+    def _hoist_lookups(self, parser: VoxParser, chunk: Chunk, collector: _LookupCollector, used: set,
+                       room: List[int], definitions: List[Tuple[int, int, str]],
+                       replacements: List[Tuple[int, int, str]]) -> None:
+        """
+        Añade a `definitions` las locales (token antes del que van, orden,
+        texto) y a `replacements` las sustituciones (primer token, último
+        token, local) que elevan los servicios y las rutas de WaitForChild
+        """
+        sites = collector.sites
+        # Raíces que el script reasigna u oculta al nivel superior: sus
+        # búsquedas no son invariantes
+        unstable = collector.assigned_globals | set(collector.top_level)
+        top = chunk.body[0].first
+        services = {}
+        for path in sorted((path for path in sites if self._is_service(path)), key=lambda path: sites[path][0][0]):
+            path_sites = sites[path]
+            if path[0] in unstable or not self._worth_hoisting(path_sites):
+                continue
+            declared = collector.declared.get(path)
+            if declared is not None and not declared[0].assigned:
+                # Reutilizar la local existente si todos los demás usos la ven
+                others = [site for site in path_sites if (site[0], site[1]) != declared[1]]
+                if all(site[4] for site in others):
+                    services[path] = parser.texts[declared[0].token]
+                    replacements += [(site[0], site[1], services[path]) for site in others]
+                    self.hoisted.append((services[path], self._lookup(path, path[0]), len(others)))
+                    continue
+            if not room[0]:
+                continue
+            room[0] -= 1
+            name = self._fresh_name(path[-1], used)
+            used.add(name)
+            services[path] = name
+            expression = self._lookup(path, path[0])
+            definitions.append((top, 0, f"local {name} = {expression}"))  # Antes que las demás locales
+            replacements += [(site[0], site[1], name) for site in path_sites]
+            self.hoisted.append((name, expression, len(path_sites)))
+
+        # Rutas de WaitForChild dentro de bucles, agrupadas por el bucle más externo:
+        # la local se declara antes del bucle y se asigna la primera vez que se
+        # ejecuta una sentencia que hace la búsqueda (`X = X or ...`), así que
+        # nada espera a un hijo que el script original no habría pedido
+        groups: Dict[Tuple[int, tuple], List[list]] = {}
+        loops = {}
+        for path, path_sites in sites.items():
+            if self._is_service(path) or path[0] in unstable:
+                continue
+            for site in path_sites:
+                if site[5] is not None:
+                    groups.setdefault((id(site[5]), path), []).append(site)
+                    loops[id(site[5])] = site[5]
+        names = {}
+        for (loop, path), path_sites in sorted(groups.items(), key=lambda item: (len(item[0][1]), item[1][0][0])):
+            parent = path[:-2]
+            if len(parent) == 1:
+                base = parent[0]
+            elif self._is_service(parent):
+                base = services.get(parent) or self._lookup(parent, parent[0])
+            else:
+                base = names.get((loop, parent))
+                if base is None:
+                    continue  # El prefijo se quedó sin local
+            function = path_sites[0][6]
+            if not room[function]:
+                continue
+            room[function] -= 1
+            name = self._fresh_name(path[-1], used)
+            used.add(name)
+            names[(loop, path)] = name
+            expression = self._lookup(path, base)
+            definitions.append((loops[loop].first, len(path), f"local {name}"))
+            statements = {id(site[7]): site[7] for site in path_sites}
+            # Los prefijos (ruta más corta) se asignan antes
+            definitions += [(statement.first, len(path), f"{name} = {name} or {expression}")
+                            for statement in statements.values()]
+            replacements += [(site[0], site[1], name) for site in path_sites]
+            self.hoisted.append((name, expression, len(path_sites)))
+
+    def _localize_globals(self, chunk: Chunk, collector: _LookupCollector, used: set, room: List[int],
+                          definitions: List[Tuple[int, int, str]], replacements: List[Tuple[int, int, str]]) -> None:
+        """Como _hoist_lookups, para los campos de math, task y los constructores"""
+        unstable = collector.assigned_globals | set(collector.top_level)
+        top = chunk.body[0].first
+        for (table, field), field_sites in sorted(collector.fields.items(), key=lambda item: item[1][0][0]):
+            if (table in unstable or (table, field) in collector.assigned_fields
+                    or not self._worth_hoisting(field_sites) or not room[0]):
+                continue
+            room[0] -= 1
+            # `floor` para math; `task_wait` o `Vector3_new` para no confundirlos
+            # con los globales antiguos (wait, spawn, delay)
+            name = self._fresh_name(field if table == 'math' else f"{table}_{field}", used)
+            used.add(name)
+            expression = f"{table}.{field}"
+            definitions.append((top, 1, f"local {name} = {expression}"))  # Tras los servicios
+            replacements += [(site[0], site[1], name) for site in field_sites]
+            self.hoisted.append((name, expression, len(field_sites)))
+
+    @staticmethod
+    def _edits(parser: VoxParser, definitions: List[Tuple[int, int, str]],
+               replacements: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+        """Ediciones (inicio, fin, texto) que insertan las locales y sustituyen sus usos"""
+        starts, ends = parser.starts, parser.ends
+        edits = []
+        for token, _, text in sorted(definitions, key=lambda definition: definition[:2]):
+            start = starts[token]
+            line_start = parser.source.rfind('\n', 0, start) + 1
+            indent = parser.source[line_start:start]
+            if parser.texts[token] == '(':
+                text += ';'  # Sin `;`, `(` se leería como una llamada al valor anterior
+            edits.append((start, start, f"{text}\n{indent if not indent.strip() else ''}"))
+        # Las rutas anidadas se sustituyen enteras: gana la más externa
+        replacements.sort(key=lambda site: (site[0], -site[1]))
+        last = -1
+        for first, final, name in replacements:
+            if first > last:
+                edits.append((starts[first], ends[final], name))
+                last = final
+        return edits
+
+    @staticmethod
+    def _is_service(path: tuple) -> bool:
+        return len(path) == 3 and path[0] in _LOOKUP_METHODS
+
+    @staticmethod
+    def _lookup(path: tuple, base: str) -> str:
+        """Expresión que busca el último paso de `path` sobre `base`"""
+        value = path[-1]
+        quote = "'" if '"' in value else '"'
+        return f"{base}:{path[-2]}({quote}{value}{quote})"
+
+    @staticmethod
+    def _fresh_name(value: str, used: set) -> str:
+        """Nombre de local a partir del nombre buscado que no aparece en el archivo"""
+        base = re.sub(r'[^A-Za-z0-9_]', '_', value) or '_'
+        if base[0].isdigit():
+            base = '_' + base
+        name = base
+        suffix = 2
+        while name in used or name in LUA_KEYWORDS:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        return name
+
+
+# ============================================================================
+# ESTADÍSTICAS DE TRANSPILACIÓN
+# ============================================================================
+
+# Líneas más costosas que conserva el informe de estadísticas
+DEFAULT_TOP_LINES = 10
+
+
+class _CountingPattern:
+    """Patrón compilado que suma sus sustituciones bajo una etiqueta de regla"""
+
+    __slots__ = ('pattern', 'label', 'counts')
+
+    def __init__(self, pattern: re.Pattern, label: str, counts: Dict[str, int]):
+        self.pattern = pattern
+        self.label = label
+        self.counts = counts
+
+    def sub(self, repl, string: str) -> str:
+        result, count = self.pattern.subn(repl, string)
+        if count:
+            self.counts[self.label] = self.counts.get(self.label, 0) + count
+        return result
+
+
+class InstrumentedRules:
+    """
+    Vista de un RuleRegistry cuyos patrones de traducción cuentan sustituciones
+
+    Expone los mismos atributos que usan las pasadas de la cascada; el resto
+    (tablas, disparadores, huella, motor de una pasada) se delega al registro.
+    Cada regla se etiqueta como 'pasada:clave' (por ejemplo 'propiedades:texto').
+    """
+
+    __slots__ = (
+        'registry', 'service_rules', 'service_call_regex', 'method_rules',
+        'constructor_regex', 'instance_regex',
+        'property_rules', 'math_rules', 'enum_rules', 'simple_enum_rules', 'brick_color_regex',
+        'elseif_then_regex', 'elseif_regex', 'global_function_rules', 'keyword_rules',
+    )
+
+    def __init__(self, registry: RuleRegistry, counts: Dict[str, int]):
+        self.registry = registry
+
+        def wrap(pattern, label):
+            return _CountingPattern(pattern, label, counts)
+
+        def labelled(rules, keys, label):
+            return tuple((wrap(pattern, f'{label}:{key}'),) + tuple(rest)
+                         for (pattern, *rest), key in zip(rules, keys))
+
+        self.service_rules = labelled(registry.service_rules, registry.services, 'servicios')
+        self.service_call_regex = wrap(registry.service_call_regex, 'servicios:obtener_servicio')
+        self.method_rules = tuple(
+            (wrap(pattern, f'metodos:{key}'), wrap(event_pattern, f'metodos:{key}'), replacement)
+            for (pattern, event_pattern, replacement), key in zip(registry.method_rules, registry.methods)
+        )
+        self.constructor_regex = wrap(registry.constructor_regex, 'constructores:_nuevo')
+        self.instance_regex = wrap(registry.instance_regex, 'constructores:instancia_nueva')
+        self.property_rules = labelled(registry.property_rules, registry.properties, 'propiedades')
+        self.math_rules = labelled(registry.math_rules, (f'math.{key}' for key in registry.math), 'propiedades')
+        self.enum_rules = labelled(registry.enum_rules, registry.enums, 'enums')
+        self.simple_enum_rules = labelled(registry.simple_enum_rules, registry.simple_enums, 'enums')
+        self.brick_color_regex = wrap(registry.brick_color_regex, 'enums:_brillante')
+        self.elseif_then_regex = wrap(registry.elseif_then_regex, 'palabras_clave:sino si entonces')
+        self.elseif_regex = wrap(registry.elseif_regex, 'palabras_clave:sino si')
+        self.global_function_rules = labelled(registry.global_function_rules, registry.global_functions,
+                                              'palabras_clave')
+        self.keyword_rules = labelled(registry.keyword_rules, registry.keywords, 'palabras_clave')
+
+    def __getattr__(self, name):
+        return getattr(self.registry, name)
+
+
+class TranspileStats:
+    """
+    Gancho de instrumentación para LuaDSLTranspiler(stats=...)
+
+    Registra el tiempo de cada etapa y de cada pasada, los fragmentos de
+    código procesados, las sustituciones hechas por cada regla y las líneas
+    más costosas. Los fragmentos servidos por la caché de líneas no vuelven a
+    pasar por las reglas: cuentan como aciertos y no suman sustituciones.
+    Solo la cascada aplica las reglas una a una: con los motores single_pass y
+    ast no hay sustituciones por regla que contar.
+    """
+
+    __slots__ = ('top', 'engine', 'stages', 'pass_time', 'pass_calls', 'substitutions',
+                 'fragments', 'cache_hits', '_line_time', '_line_text')
+
+    def __init__(self, top: int = DEFAULT_TOP_LINES):
+        self.top = top
+        self.engine = ENGINE_CASCADE
+        self.stages: Dict[str, float] = {}
+        self.pass_time: Dict[str, float] = {}
+        self.pass_calls: Dict[str, int] = {}
+        self.substitutions: Dict[str, int] = {}
+        self.fragments = 0
+        self.cache_hits = 0
+        self._line_time: Dict[int, float] = {}
+        self._line_text: Dict[int, str] = {}
+
+    def instrument(self, rules: RuleRegistry, engine: str = ENGINE_CASCADE) -> InstrumentedRules:
+        """Vista de `rules` que cuenta las sustituciones en este objeto"""
+        self.engine = engine
+        return InstrumentedRules(rules, self.substitutions)
+
+    def timed(self, name: str, func):
+        """Envuelve una pasada para acumular su tiempo y sus llamadas"""
+        pass_time = self.pass_time
+        pass_calls = self.pass_calls
+        pass_time.setdefault(name, 0.0)
+        pass_calls.setdefault(name, 0)
+        perf_counter = time.perf_counter
+
+        def run(code):
+            start = perf_counter()
+            try:
+                return func(code)
+            finally:
+                pass_time[name] += perf_counter() - start
+                pass_calls[name] += 1
+
+        return run
+
+    def record_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def record_fragment(self, line: int, code: str, seconds: float, cached: bool = False) -> None:
+        """Acumula el coste de un fragmento de código en su línea"""
+        self.fragments += 1
+        if cached:
+            self.cache_hits += 1
+        self._line_time[line] = self._line_time.get(line, 0.0) + seconds
+        self._line_text.setdefault(line, code)
+
+    def top_lines(self, count: Optional[int] = None) -> List[Tuple[int, float, str]]:
+        """Las `count` líneas más costosas como (línea, segundos, código)"""
+        count = self.top if count is None else count
+        ranked = sorted(self._line_time.items(), key=lambda item: item[1], reverse=True)[:count]
+        return [(line, seconds, self._line_text[line].strip()) for line, seconds in ranked]
+
+    def to_dict(self) -> Dict:
+        """Informe serializable en JSON"""
+        return {
+            'motor': self.engine,
+            'etapas_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'fragmentos': self.fragments,
+            'aciertos_cache': self.cache_hits,
+            'pasadas': {
+                name: {'ms': round(self.pass_time[name] * 1000, 3), 'llamadas': self.pass_calls[name]}
+                for name in self.pass_time
+            },
+            'sustituciones': dict(sorted(self.substitutions.items(), key=lambda item: (-item[1], item[0]))),
+            'lineas_costosas': [
+                {'linea': line, 'ms': round(seconds * 1000, 3), 'codigo': code}
+                for line, seconds, code in self.top_lines()
+            ],
+        }
+
+
+def print_transpile_stats(stats: TranspileStats, top_rules: int = DEFAULT_TOP_LINES) -> None:
+    """Muestra el informe de estadísticas en texto"""
+    report = stats.to_dict()
+    print("📊 ESTADÍSTICAS DE TRANSPILACIÓN")
+    print(f"  Fragmentos de código: {report['fragmentos']} (aciertos de caché: {report['aciertos_cache']})")
+    for name, ms in report['etapas_ms'].items():
+        print(f"  Etapa {name:<22} {ms:10.2f} ms")
+
+    print("\n  Pasadas:")
+    for name, values in sorted(report['pasadas'].items(), key=lambda item: -item[1]['ms']):
+        print(f"    {name:<24} {values['ms']:10.2f} ms {values['llamadas']:10} llamadas")
+
+    if report['motor'] == ENGINE_CASCADE:
+        substitutions = list(report['sustituciones'].items())
+        print(f"\n  Reglas con más sustituciones ({min(top_rules, len(substitutions))} de {len(substitutions)}):")
+        for label, count in substitutions[:top_rules]:
+            print(f"    {label:<40} {count:10}")
+    else:
+        print(f"\n  Sustituciones por regla: solo con el motor {ENGINE_CASCADE} (motor actual: {report['motor']})")
+
+    print("\n  Líneas más costosas:")
+    for entry in report['lineas_costosas']:
+        code = entry['codigo'] if len(entry['codigo']) <= 60 else entry['codigo'][:57] + "..."
+        print(f"    {entry['linea']:>7}  {entry['ms']:8.3f} ms  {code}")
+
+
+# Registro compartido por todas las instancias del transpilador
+RULES = RuleRegistry()
+
+
+class LuaDSLTranspiler:
+    """Transpilador principal de DSL a Lua Roblox con análisis semántico"""
+
+    def __init__(self, engine: str = ENGINE_CASCADE, forbidden_words: Optional[Iterable[str]] = None,
+                 skip_strings: bool = False, line_cache_size: int = DEFAULT_LINE_CACHE_SIZE,
+                 prefilter: bool = True, stats: Optional[TranspileStats] = None, minify: bool = False,
+                 optimize: int = OPTIMIZE_NONE):
+        """
+        Inicializa el transpilador con diccionarios de traducción y palabras prohibidas
+        
+        Args:
+            engine: Motor de traducción ('cascade', 'single_pass' o 'ast')
+            forbidden_words: Lista de palabras prohibidas (por defecto FORBIDDEN_WORDS)
+            skip_strings: No buscar palabras prohibidas en strings ni comentarios
+            line_cache_size: Entradas de la caché de líneas traducidas (0 la desactiva)
+            prefilter: Omitir las pasadas cuyo vocabulario no aparece en el fragmento
+            stats: Gancho de instrumentación (tiempos por pasada, sustituciones por regla)
+            minify: Minificar el Lua generado (ver LuaMinifier)
+            optimize: Nivel de optimización del Lua generado (ver LuaOptimizer)
+            
+        Raises:
+            ValueError: Si el motor o el nivel de optimización no existen
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido '{engine}'. Opciones: {', '.join(ENGINES)}")
+        self.engine = engine
+        
+        # Registro de reglas compartido (inmutable y precompilado); con
+        # estadísticas, una vista que cuenta las sustituciones de cada regla
+        self.stats = stats
+        self.rules = RULES if stats is None else stats.instrument(RULES, engine)
+        self.translation_dict = self.rules.translation
+        
+        # Lista de palabras prohibidas (seguridad, configurable por instancia)
+        if forbidden_words is None:
+            self.forbidden_words: List[str] = list(self.rules.forbidden_words)
+            self._forbidden_scanner = self.rules.forbidden_scanner
+        else:
+            self.forbidden_words = list(forbidden_words)
+            self._forbidden_scanner = ForbiddenWordScanner(self.forbidden_words)
+        self.skip_strings = skip_strings
+        
+        # Etapas sobre el Lua completo: optimización y minificación (el
+        # resultado de la última queda en self.optimizer y self.minifier)
+        self.optimizer = LuaOptimizer(optimize) if optimize != OPTIMIZE_NONE else None
+        self.minifier = LuaMinifier() if minify else None
+        
+        # Funciones seguras permitidas (actualizado para 1.2.6)
+        self.safe_functions: List[str] = list(self.rules.safe_functions)
+        
+        # Funciones adicionales para DataStore (wrapper seguro)
+        self.datastore_functions = self.rules.datastore_functions
+        
+        # Motor de una sola pasada (compartido por el registro, solo si está activo)
+        self._rewriter = self.rules.single_pass if self.engine == ENGINE_SINGLE_PASS else None
+        self._rewrite = self._rewriter.rewrite if self._rewriter is not None else None
+        
+        # Pasadas de la cascada en orden, con su vocabulario disparador
+        triggers = self.rules.pass_triggers
+        self._passes = (
+            # 1. PRIMERO: Traducciones de servicios y funciones (más específicas)
+            (triggers['servicios'], self._translate_services),
+            # 2. Traducciones de métodos con : (dos puntos) - MÁS TEMPRANO
+            (triggers['metodos'], self._translate_methods),
+            # 3. Traducciones de constructores (.new)
+            (triggers['constructores'], self._translate_constructors),
+            # 4. Traducciones de propiedades
+            (triggers['propiedades'], self._translate_properties),
+            # 5. Traducciones de enums
+            (triggers['enums'], self._translate_enums),
+            # 6. ÚLTIMO: Traducciones básicas de palabras clave (menos específicas)
+            (triggers['palabras_clave'], self._translate_keywords),
+        )
+        if stats is not None:
+            self._passes = tuple((trigger, stats.timed(trigger.name, translate))
+                                 for trigger, translate in self._passes)
+            if self._rewriter is not None:
+                self._rewrite = stats.timed('una_pasada', self._rewriter.rewrite)
+        self.prefilter = prefilter
+        self.pass_runs: Dict[str, int] = dict.fromkeys(triggers, 0)
+        self.pass_skips: Dict[str, int] = dict.fromkeys(triggers, 0)
+        
+        # Caché LRU de fragmentos ya traducidos (las líneas se repiten mucho)
+        self.line_cache = LineCache(line_cache_size, self.rules) if line_cache_size > 0 else None
+    
+    @property
+    def keyword_regex(self) -> re.Pattern:
+        """Patrón de palabras clave del registro (se compila al primer uso)"""
+        return self.rules.keyword_regex
+    
+    def translate_keyword(self, match: re.Match) -> str:
+        """
+        Traduce una palabra clave encontrada
+        
+        Args:
+            match: Match de la expresión regular
+            
+        Returns:
+            Palabra traducida
+        """
+        keyword = match.group(0)
+        translated = self.translation_dict.get(keyword.lower(), keyword)
+        
+        # Si la traducción empieza con . o :, mantener el contexto
+        if translated.startswith(('.', ':')):
+            return translated
+        else:
+            return translated
+    
+    def transpile_content(self, content: str, filename: str = "") -> str:
+        """
+        Transpila el contenido de DSL a Lua estándar con análisis semántico real
+        
+        Args:
+            content: Contenido DSL a transpilar
+            filename: Nombre del archivo para mensajes de error
+            
+        Returns:
+            Contenido transpilado a Lua
+            
+        Raises:
+            DSLError: Si hay errores en el transpilado
+        """
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+            self.check_forbidden_words(content, filename)
+            stats.record_stage('palabras_prohibidas', time.perf_counter() - start)
+            start = time.perf_counter()
+            result = self._semantic_transpile(content, filename)
+            stats.record_stage('traduccion', time.perf_counter() - start)
+            if self.optimizer is not None:
+                start = time.perf_counter()
+                result = self.optimizer.optimize(result)
+                stats.record_stage('optimizacion', time.perf_counter() - start)
+            if self.minifier is not None:
+                start = time.perf_counter()
+                result = self.minifier.minify(result)
+                stats.record_stage('minificacion', time.perf_counter() - start)
+            return result
+        
+        # Verificar palabras prohibidas primero
+        self.check_forbidden_words(content, filename)
+        
+        # Análisis semántico con múltiples pasadas (valida también la aridad
+        # de los constructores y reporta todos los errores del archivo)
+        result = self._semantic_transpile(content, filename)
+        
+        return self._post_process(result)
+    
+    def transpile_stream(self, reader: TextIO, writer: TextIO, filename: str = "",
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        """
+        Transpila desde `reader` hacia `writer` por bloques, con memoria acotada
+        
+        La salida es idéntica a la de transpile_content. Cada bloque se corta en
+        el último salto de línea fuera de strings y comentarios largos, donde el
+        analizador léxico no tiene estado pendiente; el resto se conserva para
+        el siguiente bloque. La memoria depende del bloque y de la línea (o
+        string largo) más extensa, no del tamaño del archivo. Mientras no hay
+        corte posible, los bloques nuevos solo se recorren buscando el salto de
+        línea o el cierre del string o comentario largo abierto, sin volver a
+        analizar lo acumulado: el coste sigue siendo lineal.
+        
+        Args:
+            reader: Objeto de texto con read(n)
+            writer: Objeto de texto con write(s)
+            filename: Nombre del archivo para mensajes de error
+            chunk_size: Caracteres leídos por bloque
+            
+        Raises:
+            DSLError: Si hay errores en el transpilado. Lo ya escrito en
+                `writer` corresponde a las líneas anteriores al error. Los
+                errores de aridad se acumulan hasta el final del archivo.
+            ValueError: Si el transpilador optimiza o minifica (hace falta el
+                archivo completo)
+        """
+        if self.optimizer is not None or self.minifier is not None:
+            raise ValueError("La transpilación en flujo no admite optimizar ni minificar")
+        pending = ""
+        line = 1
+        arity = self.rules.arity_validator.session()
+        # Lo que hace falta en `pending` para poder cortar (un salto de línea o
+        # el cierre de un string o comentario largo) y desde dónde buscarlo
+        awaited = None
+        search_from = 0
+        
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            source = pending + chunk
+            if awaited is not None:
+                if source.find(awaited, search_from) < 0:
+                    pending = source
+                    search_from = max(search_from, len(source) - len(awaited) + 1)
+                    continue
+                awaited = None
+            
+            tokens = list(tokenize(source, line))
+            cut = len(tokens)
+            while cut > 0 and tokens[cut - 1].kind is not TokenKind.NEWLINE:
+                cut -= 1
+            if cut == 0:
+                # Sin salto de línea seguro todavía: seguir acumulando
+                pending = source
+                last = tokens[-1] if tokens else None
+                if last is not None and not last.closed and last.kind in (TokenKind.LONG_STRING,
+                                                                          TokenKind.LONG_COMMENT):
+                    level = _LONG_BRACKET_REGEX.search(source, last.start).group(1)
+                    awaited = f']{level}]'
+                    search_from = max(last.start, len(source) - len(awaited) + 1)
+                else:
+                    awaited = '\n'
+                    search_from = len(source)
+                continue
+            
+            end = tokens[cut - 1].end
+            self._check_forbidden_lines(source[:end - 1], filename, line)
+            for text in self._translate_tokens(source, iter(tokens[:cut]), arity):
+                if not arity.errors:
+                    writer.write(text)
+            
+            line = tokens[cut - 1].line + 1
+            pending = source[end:]
+            arity.rebase(source, end)
+        
+        self._check_forbidden_lines(pending, filename, line)
+        for text in self._translate_tokens(pending, tokenize(pending, line), arity):
+            if not arity.errors:
+                writer.write(text)
+        if arity.errors:
+            raise _arity_error(arity.errors, filename)
+    
+    def transpile_parallel(self, content: str, filename: str = "", jobs: Optional[int] = None,
+                           min_size: int = PARALLEL_MIN_SIZE) -> str:
+        """
+        Transpila un archivo grande repartiéndolo entre un pool de procesos
+        
+        La salida es idéntica a la de transpile_content. El contenido se corta
+        en saltos de línea en trozos de tamaño parecido, que se traducen por
+        fragmentos en paralelo (como en el modo flujo). Un corte es válido si
+        el trozo anterior termina fuera de strings y comentarios largos y sin
+        llamadas a constructor abiertas; los trozos separados por un corte no
+        válido se vuelven a traducir juntos hasta que todos los cortes lo son.
+        Si algún trozo tiene errores, el archivo se transpila en serie para
+        reportarlos exactamente igual.
+        
+        Args:
+            content: Contenido DSL a transpilar
+            filename: Nombre del archivo para mensajes de error
+            jobs: Procesos de trabajo (por defecto, uno por núcleo)
+            min_size: Tamaño (caracteres) por debajo del cual se transpila en serie
+            
+        Returns:
+            Contenido transpilado a Lua
+            
+        Raises:
+            DSLError: Si hay errores en el transpilado
+        """
+        jobs = max(1, jobs or os.cpu_count() or 1)
+        if jobs == 1 or len(content) < min_size or self.stats is not None:
+            return self.transpile_content(content, filename)
+        self.check_forbidden_words(content, filename)
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        cuts = _line_cuts(content, jobs * PARALLEL_PARTS_PER_JOB)
+        options = (self.engine, self.line_cache.maxsize if self.line_cache is not None else 0, self.prefilter)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_part_worker, initargs=options) as pool:
+            results = list(pool.map(_transpile_part, [(content[start:end], line) for start, end, line in cuts]))
+            while True:
+                # Cada corte no válido une su trozo con el siguiente
+                groups = [[0]]
+                for i in range(1, len(cuts)):
+                    if results[i - 1][1]:
+                        groups.append([i])
+                    else:
+                        groups[-1].append(i)
+                if len(groups) == len(cuts):
+                    break
+                cuts = [(cuts[group[0]][0], cuts[group[-1]][1], cuts[group[0]][2]) for group in groups]
+                redo = [k for k, group in enumerate(groups) if len(group) > 1]
+                retranslated = pool.map(_transpile_part, [(content[cuts[k][0]:cuts[k][1]], cuts[k][2])
+                                                          for k in redo])
+                results = [results[group[0]] for group in groups]
+                for k, result in zip(redo, retranslated):
+                    results[k] = result
+        
+        if any(text is None for text, _ in results):
+            result = self._semantic_transpile(content, filename)
+        else:
+            result = ''.join(text for text, _ in results)
+        return self._post_process(result)
+    
+    def _post_process(self, lua: str) -> str:
+        """Etapas sobre el Lua del archivo completo: optimización y minificación"""
+        if self.optimizer is not None:
+            lua = self.optimizer.optimize(lua)
+        if self.minifier is not None:
+            lua = self.minifier.minify(lua)
+        return lua
+    
+    def _semantic_transpile(self, content: str, filename: str = "") -> str:
+        """
+        Realiza transpilación con análisis semántico en múltiples pasadas
+        
+        El analizador léxico recorre el archivo completo una sola vez; solo los
+        tokens de código se traducen, strings y comentarios se copian tal cual.
+        """
+        if self.engine == ENGINE_AST:
+            return self._ast_transpile(content, filename)
+        arity = self.rules.arity_validator.session()
+        result = ''.join(self._translate_tokens(content, tokenize(content), arity))
+        if arity.errors:
+            raise _arity_error(arity.errors, filename)
+        return result
+    
+    def _ast_transpile(self, content: str, filename: str = "") -> str:
+        """
+        Motor 'ast': analiza el archivo completo y genera el Lua recorriendo
+        el árbol una vez (ver VoxParser y LuaGenerator)
+        """
+        parser = VoxParser(content, self.rules)
+        generator = LuaGenerator(self, parser)
+        result = generator.generate(parser.parse())
+        errors = generator.errors
+        if parser.errors:
+            # Una llamada sin cerrar en una sentencia inválida abarca, para la
+            # cascada, las sentencias siguientes (que el árbol sí analiza):
+            # la aridad se valida como en la cascada, sobre todo el archivo
+            errors = self.rules.arity_validator.scan(content)
+        if errors:
+            raise _arity_error(errors, filename)
+        return result
+    
+    def _translate_tokens(self, source: str, tokens: Iterator[Token],
+                          arity: Optional[AritySession] = None) -> Iterator[str]:
+        """
+        Traduce una secuencia de tokens de `source`
+        
+        La aridad de los constructores se valida durante el mismo recorrido.
+        Con una sesión `arity` del llamador, los errores quedan en ella (y a
+        partir del primero ya no se traduce nada); sin ella, se lanzan al final.
+        
+        Raises:
+            DSLError: Si falla la traducción de un fragmento de código
+        """
+        cache = self.line_cache
+        if cache is not None and cache.rules is not self.rules:
+            # Las reglas cambiaron: las traducciones guardadas ya no valen
+            cache.clear(self.rules)
+        if arity is None:
+            arity = self.rules.arity_validator.session()
+            yield from self._translate_tokens(source, tokens, arity)
+            if arity.errors:
+                raise _arity_error(arity.errors)
+            return
+        if self.stats is not None:
+            yield from self._translate_tokens_profiled(source, tokens, arity)
+            return
+        
+        # Estado de la sesión en variables locales: solo cambia en feed_code
+        arity.begin(source)
+        calls = arity.calls
+        next_trigger = arity.next_trigger
+        failed = bool(arity.errors)
+        for token in tokens:
+            text = source[token.start:token.end]
+            if token.kind is not TokenKind.CODE:
+                if calls:
+                    arity.feed(source, token)
+                yield text
+                continue
+            if calls or next_trigger < token.end:
+                arity.feed_code(source, token.start, token.end, token.line)
+                calls = arity.calls
+                next_trigger = arity.next_trigger
+                failed = bool(arity.errors)
+            if failed:
+                continue
+            if cache is not None:
+                translated = cache.get(text)
+                if translated is not None:
+                    yield translated
+                    continue
+            try:
+                translated = self._process_code_semantic(text)
+            except Exception as e:
+                raise DSLError(f"Error procesando línea {token.line}: {str(e)}")
+            if cache is not None:
+                cache.put(text, translated)
+            yield translated
+    
+    def _translate_tokens_profiled(self, source: str, tokens: Iterator[Token],
+                                   arity: AritySession) -> Iterator[str]:
+        """
+        Igual que _translate_tokens, registrando el coste de cada fragmento en self.stats
+        """
+        cache = self.line_cache
+        stats = self.stats
+        perf_counter = time.perf_counter
+        
+        arity.begin(source)
+        for token in tokens:
+            text = source[token.start:token.end]
+            if token.kind is not TokenKind.CODE:
+                if arity.calls:
+                    arity.feed(source, token)
+                yield text
+                continue
+            start = perf_counter()
+            arity.feed(source, token)
+            if arity.errors:
+                continue
+            translated = cache.get(text) if cache is not None else None
+            cached = translated is not None
+            if not cached:
+                try:
+                    translated = self._process_code_semantic(text)
+                except Exception as e:
+                    raise DSLError(f"Error procesando línea {token.line}: {str(e)}")
+                if cache is not None:
+                    cache.put(text, translated)
+            stats.record_fragment(token.line, text, perf_counter() - start, cached)
+            yield translated
+    
+    def _transpile_line_semantic(self, line: str) -> str:
+        """
+        Transpila línea con análisis semántico completo
+        """
+        if not line.strip():
+            return line
+        
+        return ''.join(self._translate_tokens(line, tokenize(line)))
+    
+    def _process_code_semantic(self, code: str) -> str:
+        """
+        Procesa código con análisis semántico completo
+        """
+        if not code.strip():
+            return code
+        
+        # Motor de una sola pasada: cae a la cascada en los casos patológicos
+        if self._rewriter is not None:
+            result = self._rewrite(code)
+            if result is not None:
+                return result
+        
+        if not self.prefilter:
+            result = code
+            for _, translate in self._passes:
+                result = translate(result)
+            return result
+        
+        # Cada pasada se omite si el fragmento no contiene su vocabulario; los
+        # identificadores solo se recalculan cuando una pasada cambia el texto
+        result = code
+        tokens = None
+        for trigger, translate in self._passes:
+            if tokens is None:
+                tokens = set(_WORD_REGEX.findall(result))
+            if not trigger.matches(result, tokens):
+                self.pass_skips[trigger.name] += 1
+                continue
+            self.pass_runs[trigger.name] += 1
+            translated = translate(result)
+            if translated != result:
+                result = translated
+                tokens = None
+        
+        return result
     
     def _translate_keywords(self, code: str) -> str:
         """
         Traduce palabras clave básicas y funciones globales
         """
-        # Palabras clave que necesitan coincidencia exacta
-        keywords = ['funcion', 'fin', 'si', 'entonces', 'sino', 'mientras', 'hacer', 
-                   'para', 'en', 'retornar', 'local', 'y', 'o', 'no', 'verdadero', 
-                   'falso', 'imprimir', 'esperar', 'tick', 'time', 'tipo', 'pares', 
-                   'ipares', 'nulo', 'romper', 'continuar', 'repetir', 'hasta']
+        rules = self.rules
         
         # PRIMERO: Manejar sino si -> elseif (caso especial)
-        code = re.sub(r'\bsino\b\s+\bsi\b\s+\bentonces\b', 'elseif then', code)
-        code = re.sub(r'\bsino\b\s+\bsi\b', 'elseif', code)
-        
-        # 🔥 CORRECCIÓN CRÍTICA: Funciones globales (tarea_espera → task.wait)
-        global_functions = {
-            'tarea_espera': 'task.wait',
-            'tarea_spawn': 'task.spawn',
-            'tarea_delay': 'task.delay',
-            'tarea_defer': 'task.defer',
-            'tarea_synchronize': 'task.synchronize',
-            'tarea_desynchronize': 'task.desynchronize',
-            'cargar_datos': 'function(store, key) return store:GetAsync(key) end',
-            'guardar_datos': 'function(store, key, value) return store:SetAsync(key, value) end',
-            'incrementar_datos': 'function(store, key, delta) return store:IncrementAsync(key, delta) end',
-            'info_tween': 'TweenInfo.new',
-            'esperar_hijo': 'WaitForChild',
-            'encontrar_hijo': 'FindFirstChild',
-            'obtener_hijos': 'GetChildren',
-            'obtener_descendientes': 'GetDescendants',
-            'es_ancestro': 'IsAncestorOf',
-            'es_descendiente': 'IsDescendantOf',
-            'clonar': 'Clone',
-            'destruir': 'Destroy',
-            'conectar': 'Connect',
-            'desconectar': 'Disconnect',
-            'desconectar_todo': 'DisconnectAll',
-            'jugar': 'Play',
-            'pausar': 'Pause',
-            'detener': 'Stop',
-            'reanudar': 'Resume',
-            'emitir': 'Emit'
+        code = rules.elseif_then_regex.sub('elseif then', code)
+        code = rules.elseif_regex.sub('elseif', code)
+        
+        # Traducir funciones globales PRIMERO (antes que palabras clave)
+        for pattern, english_func in rules.global_function_rules:
+            code = pattern.sub(english_func, code)
+        
+        # Usar word boundaries para evitar reemplazos parciales
+        for pattern, english in rules.keyword_rules:
+            code = pattern.sub(english, code)
+        
+        return code
+    
+    def _translate_methods(self, code: str) -> str:
+        """
+        Traduce métodos con : (dos puntos) - VERSIÓN CORREGIDA
+        """
+        # 🔥 CORRECCIÓN CRÍTICA: Patrón mejorado para objeto:metodo() -> objeto:Metodo()
+        # Funciona con o sin espacios: objeto:metodo( o objeto: metodo(
+        # 🔥 CORRECCIÓN EXTRA: También maneja eventos .Evento:metodo(
+        for pattern, event_pattern, replacement in self.rules.method_rules:
+            code = pattern.sub(replacement, code)
+            code = event_pattern.sub(replacement, code)
+        
+        return code
+    
+    def _translate_services(self, code: str) -> str:
+        """
+        Traduce servicios y llamadas a funciones - VERSIÓN CORREGIDA
+        """
+        # 🔥 CORRECCIÓN: Manejar obtener_servicio de forma limpia
+        # obtener_servicio("jugadores") -> game:GetService("Players")
+        for pattern, replacement in self.rules.service_rules:
+            code = pattern.sub(replacement, code)
+        
+        # Para obtener_servicio con variables: obtener_servicio(variable)
+        code = self.rules.service_call_regex.sub('game:GetService', code)
+        
+        return code
+    
+    def _translate_constructors(self, code: str) -> str:
+        """
+        Traduce constructores .new a la forma correcta con validación de aridad mejorada
+        """
+        rules = self.rules
+        
+        # Validación de aridad de todos los constructores (Color3, Vector3,
+        # UDim2, CFrame, TweenInfo, Instance...) con la tabla de firmas
+        rules.arity_validator.check(code)
+        
+        # Constructor_nuevo(...) -> Constructor.new(...)
+        def replace_constructor(match):
+            constructor_name = match.group(1)
+            # Mapeo especial para algunos constructores
+            return f'{rules.constructors.get(constructor_name, constructor_name)}.new('
+        
+        code = rules.constructor_regex.sub(replace_constructor, code)
+        
+        # instancia_nueva("Tipo") -> Instance.new("Tipo")
+        code = rules.instance_regex.sub('Instance.new(', code)
+        
+        return code
+    
+    def _translate_properties(self, code: str) -> str:
+        """
+        Traduce propiedades de objetos y acceso a miembros
+        """
+        # Simple reemplazo: .texto -> .Text
+        for pattern, replacement in self.rules.property_rules:
+            code = pattern.sub(replacement, code)
+        
+        # math.piso → math.floor
+        for pattern, replacement in self.rules.math_rules:
+            code = pattern.sub(replacement, code)
+        
+        return code
+    
+    def _translate_enums(self, code: str) -> str:
+        """
+        Traduce enums y valores especiales con mapeo de namespace
+        """
+        rules = self.rules
+        
+        # Reemplazar enums completos
+        for pattern, english_enum in rules.enum_rules:
+            code = pattern.sub(english_enum, code)
+        
+        # Mapear enums después de punto (estilo_suavizado.Quad → Enum.EasingStyle.Quad)
+        for pattern, full_enum in rules.simple_enum_rules:
+            code = pattern.sub(full_enum, code)
+        
+        # Colores BrickColor (mantener funcionalidad existente)
+        def replace_color(match):
+            color_name = match.group(1)
+            return f'BrickColor.new("Bright {color_name}")'
+        
+        code = rules.brick_color_regex.sub(replace_color, code)
+        
+        return code
+    
+    def check_forbidden_words(self, content: str, filename: str = "") -> None:
+        """
+        Verifica que no haya palabras prohibidas en el contenido
+        
+        Args:
+            content: Contenido a verificar
+            filename: Nombre del archivo para mensajes de error
+            
+        Raises:
+            DSLError: Si encuentra palabras prohibidas
+        """
+        self._check_forbidden_lines(content, filename)
+    
+    def _check_forbidden_lines(self, content: str, filename: str = "", first_line: int = 1) -> None:
+        """
+        Verifica palabras prohibidas numerando las líneas desde `first_line`
+        """
+        for line_num, _, forbidden in self.find_forbidden_words(content, first_line, first_only=True):
+            raise DSLError(
+                f"Palabra prohibida '{forbidden}' encontrada en línea {line_num} de {filename}",
+                ErrorType.FORBIDDEN_WORD
+            )
+    
+    def find_forbidden_words(self, content: str, first_line: int = 1,
+                             first_only: bool = False) -> List[Tuple[int, int, str]]:
+        """
+        Busca todas las palabras prohibidas del contenido en una sola pasada
+        
+        Args:
+            content: Contenido a verificar
+            first_line: Número de la primera línea
+            first_only: Detenerse en la primera coincidencia
+            
+        Returns:
+            Lista de (línea, columna, palabra) en orden de aparición, con
+            columnas en base 1
+        """
+        scanner = self._forbidden_scanner
+        if scanner.words != tuple(self.forbidden_words):
+            # La lista se modificó tras crear el transpilador
+            scanner = self._forbidden_scanner = ForbiddenWordScanner(self.forbidden_words)
+        return scanner.scan(content, first_line, self.skip_strings, first_only)
+    
+    def check_arity(self, content: str, filename: str = "") -> None:
+        """
+        Verifica la aridad de todos los constructores del contenido
+        
+        Args:
+            content: Contenido a verificar
+            filename: Nombre del archivo para mensajes de error
+            
+        Raises:
+            DSLError: Con todos los errores de aridad del archivo
+        """
+        self._check_arity_lines(content, filename)
+    
+    def _check_arity_lines(self, content: str, filename: str = "", first_line: int = 1) -> None:
+        """
+        Verifica la aridad numerando las líneas desde `first_line`
+        """
+        errors = self.find_arity_errors(content, first_line)
+        if errors:
+            raise _arity_error(errors, filename)
+    
+    def find_arity_errors(self, content: str, first_line: int = 1,
+                          first_only: bool = False) -> List[Tuple[int, int, str]]:
+        """
+        Busca todos los constructores con un número de argumentos inválido
+        
+        El coste es lineal en el tamaño del contenido (ver ArityValidator).
+        
+        Returns:
+            Lista de (línea, columna, mensaje), con columnas en base 1
+        """
+        return self.rules.arity_validator.scan(content, first_line, first_only)
+    
+    def check_content(self, content: str) -> List[Diagnostic]:
+        """
+        Diagnostica el contenido sin generar código, sin detenerse en errores
+        
+        Reúne en una sola pasada del analizador léxico las palabras prohibidas,
+        los errores de aridad y los sintácticos (strings sin cerrar, signos de
+        agrupación desequilibrados).
+        
+        Returns:
+            Todos los diagnósticos, ordenados por línea y columna
+        """
+        diagnostics = [
+            Diagnostic(line, column, ErrorType.FORBIDDEN_WORD, f"Palabra prohibida '{word}'", len(word))
+            for line, column, word in self.find_forbidden_words(content)
+        ]
+        arity = self.rules.arity_validator.session()
+        arity.begin(content)
+        syntax = SyntaxSession(content)
+        # Estado de ambas sesiones en variables locales (ver _translate_tokens)
+        calls = 0
+        next_trigger = arity.next_trigger
+        next_bracket = syntax.next_bracket
+        code = TokenKind.CODE
+        newline = TokenKind.NEWLINE
+        for token in tokenize(content):
+            kind = token.kind
+            if kind is code:
+                end = token.end
+                if calls or next_trigger < end:
+                    arity.feed_code(content, token.start, end, token.line)
+                    calls = arity.calls
+                    next_trigger = arity.next_trigger
+                if next_bracket < end:
+                    syntax.feed_code(token)
+                    next_bracket = syntax.next_bracket
+            elif kind is not newline:
+                if calls:
+                    arity.feed(content, token)
+                if not token.closed:
+                    syntax.feed_unclosed(token)
+        diagnostics.extend(syntax.finish())
+        diagnostics.extend(Diagnostic(line, column, ErrorType.ARITY_ERROR, message)
+                           for line, column, message in arity.errors)
+        diagnostics.sort(key=lambda diagnostic: (diagnostic.line, diagnostic.column))
+        return diagnostics
+    
+    def cache_options(self) -> Dict:
+        """
+        Opciones que afectan al resultado y deben formar parte de la clave de
+        caché (vacío con la configuración por defecto)
+        """
+        options = {}
+        if self.engine != ENGINE_CASCADE:
+            # Los motores deben coincidir byte a byte, pero una caché común
+            # ocultaría cualquier diferencia entre ellos
+            options['motor'] = self.engine
+        if tuple(self.forbidden_words) != self.rules.forbidden_words:
+            options['prohibidas'] = list(self.forbidden_words)
+        if self.skip_strings:
+            options['ignorar_strings'] = True
+        if self.optimizer is not None:
+            options['optimizar'] = self.optimizer.level
+        if self.minifier is not None:
+            options['minificar'] = True
+        return options
+
+
+# ============================================================================
+# DOCUMENTO INCREMENTAL
+# ============================================================================
+
+class _DocumentSpan:
+    """Tramo de líneas completas de un IncrementalDocument, con posiciones relativas"""
+
+    __slots__ = ('text', 'lines', 'lua', 'failed', 'diagnostics', 'brackets')
+
+    def __init__(self, transpiler: 'LuaDSLTranspiler', text: str):
+        self.text = text
+        self.lines = text.count('\n')
+        tokens = list(tokenize(text))
+        arity = transpiler.rules.arity_validator.session()
+        self.lua = ''.join(transpiler._translate_tokens(text, iter(tokens), arity))
+        
+        syntax = SyntaxSession(text, partial=True)
+        code = TokenKind.CODE
+        for token in tokens:
+            if token.kind is code:
+                if syntax.next_bracket < token.end:
+                    syntax.feed_code(token)
+            elif not token.closed:
+                syntax.feed_unclosed(token)
+        
+        diagnostics = [
+            Diagnostic(line, column, ErrorType.FORBIDDEN_WORD, f"Palabra prohibida '{word}'", len(word))
+            for line, column, word in transpiler.find_forbidden_words(text)
+        ]
+        diagnostics.extend(Diagnostic(line, column, ErrorType.ARITY_ERROR, message)
+                           for line, column, message in arity.errors)
+        # Con palabras prohibidas o errores de aridad, transpile_content falla
+        self.failed = bool(diagnostics)
+        diagnostics.extend(syntax.finish())
+        self.diagnostics = diagnostics
+        self.brackets = syntax.residual
+
+
+class IncrementalDocument:
+    """
+    Documento editable que solo vuelve a traducir las líneas afectadas
+
+    El texto se divide en tramos de líneas completas que terminan en un salto
+    de línea sin estado pendiente: fuera de strings y comentarios largos (los
+    mismos cortes que transpile_stream) y sin llamadas a constructor abiertas.
+    Cada tramo guarda su traducción y sus diagnósticos con líneas relativas,
+    así que no cambia aunque se desplace.
+
+    Una edición vuelve a analizar desde el tramo que la contiene hasta el
+    primer corte posterior que coincide con uno anterior: normalmente solo
+    las líneas editadas; si abre o cierra un string o comentario largo,
+    hasta donde el análisis vuelve a coincidir.
+
+    `lua` y `diagnostics` equivalen siempre a transpile_content(text) y
+    check_content(text). Los signos de agrupación pueden emparejarse entre
+    tramos: los que un tramo no resuelve se combinan al pedir los diagnósticos.
+    """
+
+    __slots__ = ('transpiler', 'retranslated_lines', '_text', '_spans', '_starts', '_first_lines',
+                 '_lua', '_diagnostics')
+
+    def __init__(self, transpiler: 'LuaDSLTranspiler', text: str = ""):
+        self.transpiler = transpiler
+        self._text = ""
+        self._spans: List[_DocumentSpan] = []
+        self._starts: List[int] = []       # Posición de inicio de cada tramo
+        self._first_lines: List[int] = []  # Primera línea (base 1) de cada tramo
+        self.retranslated_lines = 0        # Líneas traducidas en la última edición
+        self.replace(0, 0, text)
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def lua(self) -> Optional[str]:
+        """Salida Lua, o None si transpile_content fallaría (palabras prohibidas, aridad)"""
+        if self._lua is None and not any(span.failed for span in self._spans):
+            self._lua = ''.join([span.lua for span in self._spans])
+        return self._lua
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        """Todos los diagnósticos del documento, ordenados por línea y columna"""
+        if self._diagnostics is None:
+            diagnostics = []
+            replay = _BracketReplay()
+            for span, first_line in zip(self._spans, self._first_lines):
+                if span.diagnostics:
+                    offset = first_line - 1
+                    diagnostics.extend(
+                        Diagnostic(d.line + offset, d.column, d.error_type, d.message, d.length)
+                        for d in span.diagnostics
+                    )
+                if span.brackets:
+                    offset = first_line - 1
+                    for char, line, column in span.brackets:
+                        replay.feed(char, line + offset, column)
+            diagnostics.extend(replay.finish())
+            diagnostics.sort(key=lambda diagnostic: (diagnostic.line, diagnostic.column))
+            self._diagnostics = diagnostics
+        return list(self._diagnostics)
+
+    def offset(self, line: int, column: int) -> int:
+        """
+        Posición en `text` de (línea, columna) en base 1
+
+        Una columna más allá del final de la línea se ajusta a su salto de
+        línea; una línea más allá del final, al final del texto.
+        """
+        index = bisect.bisect_right(self._first_lines, line) - 1
+        if index < 0:
+            return 0
+        text = self._text
+        pos = self._starts[index]
+        for _ in range(line - self._first_lines[index]):
+            newline = text.find('\n', pos)
+            if newline < 0:
+                return len(text)
+            pos = newline + 1
+        end = text.find('\n', pos)
+        if end < 0:
+            end = len(text)
+        return min(pos + max(column, 1) - 1, end)
+
+    def apply_edit(self, start: Tuple[int, int], end: Tuple[int, int], text: str) -> int:
+        """
+        Sustituye el rango [start, end) de posiciones (línea, columna) en base 1
+
+        Returns:
+            Número de líneas que se volvieron a traducir
+        """
+        return self.replace(self.offset(*start), self.offset(*end), text)
+
+    def replace(self, start: int, end: int, text: str) -> int:
+        """
+        Sustituye self.text[start:end] por `text`
+
+        Returns:
+            Número de líneas que se volvieron a traducir
+
+        Raises:
+            ValueError: Si el rango no está dentro del texto
+            DSLError: Si falla la traducción de un fragmento (el documento no cambia)
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise ValueError(f"Rango fuera del documento: {start}-{end}")
+        spans, starts = self._spans, self._starts
+        first = max(bisect.bisect_right(starts, start) - 1, 0)
+        region = starts[first] if spans else 0
+        delta = len(text) - (end - start)
+        new_text = self._text[:start] + text + self._text[end:]
+        edited_end = start + len(text)
+        
+        # Cortes nuevos hasta el primero que coincide con el inicio de un tramo
+        # anterior situado tras la edición; desde ahí se reutilizan los tramos
+        source = new_text[region:]
+        pieces = []
+        piece_start = 0
+        reuse = len(spans)
+        following = first
+        arity = self.transpiler.rules.arity_validator.session()
+        arity.begin(source)
+        for token in tokenize(source):
+            kind = token.kind
+            if kind is TokenKind.CODE:
+                if arity.calls or arity.next_trigger < token.end:
+                    arity.feed_code(source, token.start, token.end, token.line)
+                continue
+            if kind is not TokenKind.NEWLINE:
+                if arity.calls:
+                    arity.feed(source, token)
+                continue
+            if arity.calls:
+                continue
+            pieces.append(source[piece_start:token.end])
+            piece_start = token.end
+            cut = region + token.end
+            if cut < edited_end:
+                continue
+            while following < len(spans) and starts[following] < cut - delta:
+                following += 1
+            if following < len(spans) and starts[following] == cut - delta:
+                reuse = following
+                break
+        else:
+            if piece_start < len(source):
+                pieces.append(source[piece_start:])
+        
+        transpiler = self.transpiler
+        rebuilt = [_DocumentSpan(transpiler, piece) for piece in pieces]
+        
+        self._text = new_text
+        spans[first:reuse] = rebuilt
+        del starts[first:]
+        del self._first_lines[first:]
+        pos = region
+        line = self._first_lines[-1] + spans[first - 1].lines if first else 1
+        for span in spans[first:]:
+            starts.append(pos)
+            self._first_lines.append(line)
+            pos += len(span.text)
+            line += span.lines
+        self._lua = None
+        self._diagnostics = None
+        self.retranslated_lines = sum(span.lines for span in rebuilt) + (pieces[-1][-1:] != '\n' if pieces else 0)
+        return self.retranslated_lines
+
+
+# ============================================================================
+# CACHÉ DE TRANSPILACIÓN
+# ============================================================================
+
+CACHE_DIR_ENV = "VOX_CACHE_DIR"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Al superar el límite se desaloja hasta quedar en esta fracción del mismo
+CACHE_TRIM_RATIO = 0.9
+
+
+# Permisos de los archivos nuevos según la umask del proceso (se lee una vez)
+_new_file_mode: Optional[int] = None
+
+
+def _file_mode(path: str) -> int:
+    """Permisos de `path` si existe; si no, los de un archivo nuevo (0o666 & ~umask)"""
+    global _new_file_mode
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        pass
+    if _new_file_mode is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        _new_file_mode = 0o666 & ~umask
+    return _new_file_mode
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    Escribe `data` en `path` mediante un temporal en el mismo directorio y
+    un renombrado, así que los lectores nunca ven un archivo a medias. El
+    archivo conserva sus permisos, o recibe los de la umask si es nuevo
+    (mkstemp crea el temporal con 0600)
+    """
+    import tempfile
+    
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _sha256(data: bytes) -> str:
+    """Hash SHA-256 en hexadecimal (hashlib se importa al primer uso)"""
+    import hashlib
+    
+    return hashlib.sha256(data).hexdigest()
+
+
+def default_cache_dir() -> str:
+    """Directorio de caché: $VOX_CACHE_DIR o ~/.cache/vox"""
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "vox")
+
+
+class TranspileCache:
+    """
+    Caché en disco direccionada por contenido, compartible entre proyectos
+    
+    Cada entrada es el Lua generado, guardado bajo el hash de (hash de la
+    fuente, versión, hash de las reglas, opciones). Las escrituras son
+    atómicas, por lo que varios procesos pueden usar la misma caché a la vez;
+    en el peor caso dos escritores guardan el mismo contenido. La fecha de
+    modificación de cada entrada marca su último uso y guía el desalojo LRU.
+    """
+    
+    __slots__ = ('directory', 'max_bytes')
+    
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+    
+    @staticmethod
+    def key(source_hash: str, options: Optional[Dict] = None) -> str:
+        """Clave de la entrada para una fuente y unas opciones"""
+        material = json.dumps(
+            [source_hash, TRANSPILER_VERSION, RULES.fingerprint, options or {}],
+            sort_keys=True
+        )
+        return _sha256(material.encode('utf-8'))
+    
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, "objetos", key[:2], key[2:] + OUTPUT_EXTENSION)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Devuelve la salida guardada o None; un acierto renueva la entrada"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        """Guarda una salida (los fallos de escritura no son fatales)"""
+        try:
+            atomic_write(self._entry_path(key), data)
+        except OSError:
+            pass
+    
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(último uso, tamaño, ruta) de cada entrada"""
+        entries = []
+        for root, _, files in os.walk(os.path.join(self.directory, "objetos")):
+            for name in files:
+                if not name.endswith(OUTPUT_EXTENSION):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        return entries
+    
+    def trim(self) -> int:
+        """
+        Desaloja las entradas menos usadas si la caché supera su límite
+        
+        Returns:
+            Número de entradas eliminadas
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        
+        target = self.max_bytes * CACHE_TRIM_RATIO
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Ya desalojada por otro proceso
+            total -= size
+            evicted += 1
+        return evicted
+    
+    def record(self, hits: int, misses: int, evicted: int = 0) -> None:
+        """Acumula contadores en el archivo de estadísticas (bajo bloqueo)"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "bloqueo"), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            counters = self._load_counters()
+            counters['aciertos'] += hits
+            counters['fallos'] += misses
+            counters['desalojos'] += evicted
+            atomic_write(os.path.join(self.directory, "estadisticas.json"),
+                         json.dumps(counters, sort_keys=True).encode('utf-8'))
+    
+    def _load_counters(self) -> Dict[str, int]:
+        counters = {'aciertos': 0, 'fallos': 0, 'desalojos': 0}
+        try:
+            with open(os.path.join(self.directory, "estadisticas.json"), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            for name in counters:
+                counters[name] = int(stored.get(name, 0))
+        except (OSError, ValueError, AttributeError):
+            pass
+        return counters
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores acumulados, número de entradas y tamaño actual"""
+        entries = self._entries()
+        stats = self._load_counters()
+        stats['entradas'] = len(entries)
+        stats['bytes'] = sum(size for _, size, _ in entries)
+        stats['limite_bytes'] = self.max_bytes
+        return stats
+
+
+def print_cache_stats(cache: TranspileCache, hits: Optional[int] = None, misses: Optional[int] = None) -> None:
+    """Imprime las estadísticas de la caché (y las de esta ejecución si se indican)"""
+    stats = cache.stats()
+    print(f"🗄️  Caché: {cache.directory}")
+    if hits is not None:
+        total = hits + misses
+        rate = (hits / total * 100) if total else 0.0
+        print(f"   Esta ejecución: {hits} aciertos, {misses} fallos ({rate:.1f}% de aciertos)")
+    lookups = stats['aciertos'] + stats['fallos']
+    rate = (stats['aciertos'] / lookups * 100) if lookups else 0.0
+    print(f"   Acumulado: {stats['aciertos']} aciertos, {stats['fallos']} fallos ({rate:.1f}%), "
+          f"{stats['desalojos']} desalojos")
+    print(f"   Entradas: {stats['entradas']}, tamaño: {stats['bytes'] / (1024 * 1024):.1f} MB "
+          f"de {stats['limite_bytes'] / (1024 * 1024):.0f} MB")
+
+
+# ============================================================================
+# COMPILACIÓN DE DIRECTORIOS
+# ============================================================================
+
+SOURCE_EXTENSION = ".vox"
+OUTPUT_EXTENSION = ".lua"
+MANIFEST_FILENAME = ".vox-manifest.json"
+MANIFEST_FORMAT = 1
+UNEXPECTED_ERROR = "ERROR_INESPERADO"
+
+# Estados de cada archivo en una compilación de directorio
+STATUS_TRANSPILED = "transpilado"   # Salida nueva o modificada
+STATUS_UNCHANGED = "sin_cambios"    # Transpilado, pero la salida ya era idéntica
+STATUS_SKIPPED = "omitido"          # Fuente sin cambios según el manifiesto
+STATUS_FAILED = "error"
+
+# Archivos más lentos que incluye la telemetría de compilación
+DEFAULT_SLOWEST_FILES = 10
+
+
+class FileResult:
+    """Resultado de transpilar un archivo dentro de una compilación de directorio"""
+    
+    __slots__ = ('path', 'status', 'source_hash', 'error_type', 'message', 'cached',
+                 'bytes_in', 'bytes_out', 'seconds')
+    
+    def __init__(self, path: str, status: str, source_hash: Optional[str] = None,
+                 error_type: Optional[str] = None, message: str = "",
+                 cached: Optional[bool] = None, bytes_in: int = 0, bytes_out: int = 0,
+                 seconds: float = 0.0):
+        self.path = path                # Ruta relativa al directorio fuente
+        self.status = status
+        self.source_hash = source_hash  # SHA-256 del archivo fuente
+        self.error_type = error_type    # Valor de ErrorType o UNEXPECTED_ERROR si falló
+        self.message = message
+        self.cached = cached            # Acierto en la caché compartida (None si no se consultó)
+        self.bytes_in = bytes_in        # Tamaño de la fuente leída
+        self.bytes_out = bytes_out      # Tamaño del .lua generado (0 si omitido o con error)
+        self.seconds = seconds          # Duración del procesamiento del archivo
+    
+    @property
+    def ok(self) -> bool:
+        return self.status != STATUS_FAILED
+
+
+class BuildReport:
+    """Resumen de una compilación de directorio, ordenado por ruta"""
+    
+    __slots__ = ('results', 'elapsed', 'removed')
+    
+    def __init__(self, results: List[FileResult], elapsed: float, removed: Optional[List[str]] = None):
+        self.results = results
+        self.elapsed = elapsed
+        self.removed = removed or []  # Fuentes borradas cuyo .lua se eliminó
+    
+    @property
+    def failures(self) -> List[FileResult]:
+        return [result for result in self.results if not result.ok]
+    
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if result.ok)
+    
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for result in self.results if result.cached is True)
+    
+    @property
+    def cache_misses(self) -> int:
+        return sum(1 for result in self.results if result.cached is False)
+    
+    def count(self, status: str) -> int:
+        """Número de archivos con el estado indicado"""
+        return sum(1 for result in self.results if result.status == status)
+    
+    @property
+    def bytes_in(self) -> int:
+        return sum(result.bytes_in for result in self.results)
+    
+    @property
+    def bytes_out(self) -> int:
+        return sum(result.bytes_out for result in self.results)
+    
+    @property
+    def files_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        """Proporción de aciertos de la caché compartida (None si no se consultó)"""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+    
+    def slowest(self, count: int = DEFAULT_SLOWEST_FILES) -> List[FileResult]:
+        """Los `count` archivos que más tardaron"""
+        return sorted(self.results, key=lambda result: result.seconds, reverse=True)[:count]
+    
+    def failures_by_type(self) -> Dict[str, int]:
+        """Número de errores por ErrorType"""
+        counts: Dict[str, int] = {}
+        for result in self.failures:
+            counts[result.error_type] = counts.get(result.error_type, 0) + 1
+        return dict(sorted(counts.items()))
+    
+    def telemetry(self, slowest: int = DEFAULT_SLOWEST_FILES) -> Dict:
+        """Informe de la compilación serializable en JSON (ver write_build_telemetry)"""
+        hit_rate = self.cache_hit_rate
+        return {
+            'version': TRANSPILER_VERSION,
+            'marca_tiempo': round(time.time(), 3),
+            'archivos': {
+                'total': len(self.results),
+                STATUS_TRANSPILED: self.count(STATUS_TRANSPILED),
+                STATUS_UNCHANGED: self.count(STATUS_UNCHANGED),
+                STATUS_SKIPPED: self.count(STATUS_SKIPPED),
+                STATUS_FAILED: self.count(STATUS_FAILED),
+            },
+            'bytes_entrada': self.bytes_in,
+            'bytes_salida': self.bytes_out,
+            'segundos': round(self.elapsed, 6),
+            'archivos_s': round(self.files_per_second, 3),
+            'cache': {
+                'aciertos': self.cache_hits,
+                'fallos': self.cache_misses,
+                'tasa_aciertos': round(hit_rate, 4) if hit_rate is not None else None,
+            },
+            'mas_lentos': [{'ruta': result.path, 'segundos': round(result.seconds, 6)}
+                           for result in self.slowest(slowest)],
+            'errores_por_tipo': self.failures_by_type(),
         }
+    
+    @property
+    def exit_code(self) -> int:
+        """0 si todo fue bien, 2 si solo hubo errores de DSL, 3 si hubo errores inesperados"""
+        failures = self.failures
+        if not failures:
+            return 0
+        if any(result.error_type == UNEXPECTED_ERROR for result in failures):
+            return 3
+        return 2
+
+
+def find_sources(source_dir: str, output_dir: Optional[str] = None) -> List[str]:
+    """
+    Lista los archivos .vox bajo `source_dir` (rutas relativas, orden estable)
+    
+    Si el directorio de salida está dentro del de entrada, se excluye.
+    """
+    excluded = os.path.realpath(output_dir) if output_dir else None
+    sources = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(root, d)) != excluded)
+        for name in sorted(files):
+            if name.endswith(SOURCE_EXTENSION):
+                sources.append(os.path.relpath(os.path.join(root, name), source_dir))
+    return sorted(sources)
+
+
+def output_path_for(relative_path: str, output_dir: str) -> str:
+    """Ruta de salida .lua que refleja `relative_path` dentro de `output_dir`"""
+    base = relative_path[:-len(SOURCE_EXTENSION)]
+    return os.path.join(output_dir, base + OUTPUT_EXTENSION)
+
+
+def decode_source(data: bytes) -> str:
+    """Decodifica un archivo fuente igual que open(..., 'r', encoding='utf-8')"""
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def encode_output(content: str) -> bytes:
+    """Codifica la salida igual que open(..., 'w', encoding='utf-8')"""
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    return content.encode('utf-8')
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """
+    Escribe `data` en `path` solo si el contenido cambia
+    
+    La escritura es atómica (ver atomic_write), así que nunca queda un
+    archivo a medias.
+    
+    Returns:
+        True si el archivo se escribió
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    
+    atomic_write(path, data)
+    return True
+
+
+def load_manifest(output_dir: str, options: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Carga los hashes de fuentes del manifiesto de `output_dir`
+    
+    Devuelve un diccionario vacío si no hay manifiesto, si está dañado o si
+    fue generado por otra versión del transpilador, con otras reglas o con
+    otras opciones de salida (`options`, como la minificación).
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if (not isinstance(manifest, dict)
+            or manifest.get('formato') != MANIFEST_FORMAT
+            or manifest.get('version') != TRANSPILER_VERSION
+            or manifest.get('reglas') != RULES.fingerprint
+            or manifest.get('opciones', {}) != (options or {})
+            or not isinstance(manifest.get('archivos'), dict)):
+        return {}
+    return manifest['archivos']
+
+
+def manifest_sources(output_dir: str) -> List[str]:
+    """
+    Fuentes registradas en el manifiesto de `output_dir`, aunque sea de otra
+    versión o con otras opciones (sirve para saber qué .lua generó la
+    compilación anterior)
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    files = manifest.get('archivos') if isinstance(manifest, dict) else None
+    if not isinstance(files, dict):
+        return []
+    # Solo rutas relativas dentro del árbol
+    return [path for path in files
+            if isinstance(path, str) and path.endswith(SOURCE_EXTENSION) and not os.path.isabs(path)
+            and not os.path.normpath(path).startswith(os.pardir)]
+
+
+def _manifest_options(minify: bool, optimize: int = OPTIMIZE_NONE) -> Dict:
+    """Opciones de salida que invalidan el manifiesto si cambian (como en cache_options)"""
+    options = {}
+    if optimize != OPTIMIZE_NONE:
+        options['optimizar'] = optimize
+    if minify:
+        options['minificar'] = True
+    return options
+
+
+def save_manifest(output_dir: str, results: List[FileResult], options: Optional[Dict] = None) -> None:
+    """Guarda el manifiesto con los hashes de las fuentes transpiladas sin error"""
+    manifest = {
+        'formato': MANIFEST_FORMAT,
+        'version': TRANSPILER_VERSION,
+        'reglas': RULES.fingerprint,
+        'archivos': {result.path: result.source_hash for result in results if result.ok},
+    }
+    if options:
+        manifest['opciones'] = options
+    data = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+    write_if_changed(os.path.join(output_dir, MANIFEST_FILENAME), data.encode('utf-8'))
+
+
+def error_type_of(error: Exception) -> str:
+    """Clasifica una excepción según ErrorType (UNEXPECTED_ERROR si no es del transpilador)"""
+    if isinstance(error, DSLError):
+        if len(error.args) > 1 and isinstance(error.args[1], ErrorType):
+            return error.args[1].value
+        return ErrorType.SYNTAX_ERROR.value
+    if isinstance(error, (OSError, UnicodeDecodeError)):
+        return ErrorType.FILE_ERROR.value
+    return UNEXPECTED_ERROR
+
+
+def error_message(error: Exception) -> str:
+    """Mensaje de una excepción sin el tipo de error adjunto a DSLError"""
+    if isinstance(error, DSLError) and error.args:
+        return str(error.args[0])
+    return str(error)
+
+
+# Transpilador y caché del proceso de trabajo (se crean una vez por proceso)
+_worker_transpiler: Optional["LuaDSLTranspiler"] = None
+_worker_cache: Optional[TranspileCache] = None
+
+
+def _init_worker(engine: str, cache: Optional[TranspileCache] = None, minify: bool = False,
+                 optimize: int = OPTIMIZE_NONE) -> None:
+    global _worker_transpiler, _worker_cache
+    _worker_transpiler = LuaDSLTranspiler(engine=engine, minify=minify, optimize=optimize)
+    _worker_cache = cache
+
+
+def _init_part_worker(engine: str, line_cache_size: int, prefilter: bool) -> None:
+    global _worker_transpiler
+    _worker_transpiler = LuaDSLTranspiler(engine=engine, line_cache_size=line_cache_size, prefilter=prefilter)
+
+
+def _line_cuts(content: str, parts: int) -> List[Tuple[int, int, int]]:
+    """
+    Divide `content` en hasta `parts` trozos de tamaño parecido que terminan
+    en salto de línea
+    
+    Returns:
+        Lista de (inicio, fin, número de la primera línea)
+    """
+    size = len(content) // parts + 1
+    cuts = []
+    start = 0
+    line = 1
+    while start < len(content):
+        end = content.find('\n', start + size) + 1 or len(content)
+        cuts.append((start, end, line))
+        line += content.count('\n', start, end)
+        start = end
+    return cuts
+
+
+def _transpile_part(task: Tuple[str, int]) -> Tuple[Optional[str], bool]:
+    """
+    Traduce un trozo de archivo en el proceso de trabajo (ver transpile_parallel)
+    
+    Args:
+        task: (texto del trozo, número de su primera línea)
         
-        # Traducir funciones globales PRIMERO (antes que palabras clave)
-        for spanish_func, english_func in global_functions.items():
-            pattern = r'\b' + re.escape(spanish_func) + r'\b(?=\s*\()'
-            code = re.sub(pattern, english_func, code)
+    Returns:
+        (Lua del trozo o None si tiene errores, si el trozo termina en un
+         corte válido: fuera de strings y comentarios largos y sin llamadas
+         a constructor abiertas)
+    """
+    part, line = task
+    transpiler = _worker_transpiler
+    tokens = list(tokenize(part, line))
+    arity = transpiler.rules.arity_validator.session()
+    try:
+        text = ''.join(transpiler._translate_tokens(part, iter(tokens), arity))
+    except DSLError:
+        return None, True
+    clean = not arity.calls and bool(tokens) and tokens[-1].kind is TokenKind.NEWLINE
+    return (None if arity.errors else text), clean
+
+
+def transpile_cached(transpiler: "LuaDSLTranspiler", data: bytes, filename: str,
+                     cache: Optional[TranspileCache] = None,
+                     source_hash: Optional[str] = None, jobs: Optional[int] = 1) -> Tuple[bytes, Optional[bool]]:
+    """
+    Transpila el contenido de un archivo consultando antes la caché
+    
+    Args:
+        jobs: Procesos para transpilar el archivo (ver transpile_parallel);
+            1 lo transpila en serie
+    
+    Returns:
+        (salida codificada, acierto de caché o None si no hay caché)
+    """
+    if cache is not None:
+        key = cache.key(source_hash or _sha256(data), transpiler.cache_options())
+        output = cache.get(key)
+        if output is not None:
+            return output, True
+    content = decode_source(data)
+    if jobs == 1:
+        output = encode_output(transpiler.transpile_content(content, filename))
+    else:
+        output = encode_output(transpiler.transpile_parallel(content, filename, jobs))
+    if cache is None:
+        return output, None
+    cache.put(key, output)
+    return output, False
+
+
+def _build_file(task: Tuple[str, str, str, Optional[str]]) -> FileResult:
+    """
+    Transpila un archivo del árbol fuente en el proceso de trabajo
+    
+    Args:
+        task: (directorio fuente, directorio salida, ruta relativa,
+               hash registrado en el manifiesto o None)
+    """
+    start = time.perf_counter()
+    source_dir, output_dir, relative_path, previous_hash = task
+    source_file = os.path.join(source_dir, relative_path)
+    output_file = output_path_for(relative_path, output_dir)
+    source_hash = None
+    data = b""
+    try:
+        with open(source_file, 'rb') as f:
+            data = f.read()
+        source_hash = _sha256(data)
+        if source_hash == previous_hash and os.path.exists(output_file):
+            result = FileResult(relative_path, STATUS_SKIPPED, source_hash)
+        else:
+            output, cached = transpile_cached(_worker_transpiler, data, source_file, _worker_cache, source_hash)
+            written = write_if_changed(output_file, output)
+            result = FileResult(relative_path, STATUS_TRANSPILED if written else STATUS_UNCHANGED,
+                                source_hash, cached=cached, bytes_out=len(output))
+    except Exception as e:
+        result = FileResult(relative_path, STATUS_FAILED, source_hash, error_type_of(e), error_message(e))
+    result.bytes_in = len(data)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def build_directory(source_dir: str, output_dir: str, jobs: Optional[int] = None,
+                    engine: str = ENGINE_CASCADE, incremental: bool = True,
+                    cache: Optional[TranspileCache] = None, minify: bool = False,
+                    optimize: int = OPTIMIZE_NONE) -> BuildReport:
+    """
+    Transpila todos los .vox de `source_dir` reflejando el árbol en `output_dir`
+    
+    Los archivos se reparten entre un pool de procesos; el transpilador se
+    construye una vez por proceso. Los resultados siempre se devuelven en
+    orden de ruta, sea cual sea el orden de finalización.
+    
+    En modo incremental se omiten las fuentes cuyo hash coincide con el del
+    manifiesto (que también registra la versión y el hash de las reglas), y
+    los .lua solo se reescriben si su contenido cambia. Los .lua de fuentes
+    del manifiesto anterior que ya no existen se eliminan.
+    
+    Args:
+        source_dir: Directorio con los archivos .vox
+        output_dir: Directorio donde se escriben los .lua
+        jobs: Procesos de trabajo (por defecto, uno por núcleo)
+        engine: Motor de traducción
+        incremental: Usar el manifiesto para omitir archivos sin cambios
+        cache: Caché compartida opcional; al terminar se recortan sus entradas
+        minify: Minificar los .lua generados (ver LuaMinifier)
+        optimize: Nivel de optimización de los .lua generados (ver LuaOptimizer)
         
-        for keyword in keywords:
-            if keyword in self.translation_dict:
-                # Usar word boundaries para evitar reemplazos parciales
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                code = re.sub(pattern, self.translation_dict[keyword], code)
+    Returns:
+        BuildReport con un resultado por archivo
+    """
+    start = time.perf_counter()
+    sources = find_sources(source_dir, output_dir)
+    options = _manifest_options(minify, optimize)
+    previous = load_manifest(output_dir, options) if incremental else {}
+    
+    # Las fuentes borradas desde la compilación anterior no dejan su .lua
+    current = set(sources)
+    removed = [path for path in manifest_sources(output_dir) if path not in current]
+    for relative_path in removed:
+        try:
+            os.remove(output_path_for(relative_path, output_dir))
+        except FileNotFoundError:
+            pass
+    tasks = [(source_dir, output_dir, relative_path, previous.get(relative_path))
+             for relative_path in sources]
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    
+    if jobs == 1 or len(tasks) <= 1:
+        _init_worker(engine, cache, minify, optimize)
+        results = [_build_file(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
         
-        return code
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(engine, cache, minify, optimize)) as pool:
+            results = list(pool.map(_build_file, tasks, chunksize=chunksize))
     
-    def _translate_methods(self, code: str) -> str:
+    save_manifest(output_dir, results, options)
+    report = BuildReport(results, time.perf_counter() - start, sorted(removed))
+    if cache is not None:
+        cache.record(report.cache_hits, report.cache_misses, cache.trim())
+    return report
+
+
+def print_build_report(report: BuildReport) -> None:
+    """Imprime el resumen de compilación (errores en orden de ruta)"""
+    failures = report.failures
+    print(f"📦 Archivos transpilados: {report.succeeded}/{len(report.results)} en {report.elapsed:.2f}s "
+          f"({report.count(STATUS_TRANSPILED)} escritos, {report.count(STATUS_UNCHANGED)} sin cambios, "
+          f"{report.count(STATUS_SKIPPED)} omitidos)")
+    if report.removed:
+        print(f"🗑️  Eliminados {len(report.removed)} .lua de fuentes borradas")
+    if failures:
+        print(f"❌ Errores ({len(failures)}):")
+        for result in failures:
+            print(f"  {result.path}: [{result.error_type}] {result.message}")
+
+
+def _prometheus_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(telemetry: Dict, prefix: str = "vox_build") -> str:
+    """
+    Convierte la telemetría de BuildReport.telemetry() al formato de texto de
+    Prometheus (para el recolector textfile de node_exporter)
+    """
+    lines = []
+    
+    def metric(name: str, kind: str, description: str, samples) -> None:
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            rendered = ','.join(f'{key}="{_prometheus_label(str(label))}"' for key, label in labels.items())
+            lines.append(f"{prefix}_{name}{{{rendered}}} {value}" if rendered else f"{prefix}_{name} {value}")
+    
+    files = telemetry['archivos']
+    metric('info', 'gauge', "Versión del transpilador", [({'version': telemetry['version']}, 1)])
+    metric('files', 'gauge', "Archivos procesados por estado",
+           [({'status': status}, count) for status, count in files.items() if status != 'total'])
+    metric('bytes_in', 'gauge', "Bytes de fuentes .vox leídas", [({}, telemetry['bytes_entrada'])])
+    metric('bytes_out', 'gauge', "Bytes de .lua generados", [({}, telemetry['bytes_salida'])])
+    metric('duration_seconds', 'gauge', "Duración de la compilación", [({}, telemetry['segundos'])])
+    metric('files_per_second', 'gauge', "Archivos procesados por segundo", [({}, telemetry['archivos_s'])])
+    if telemetry['cache']['tasa_aciertos'] is not None:
+        metric('cache_hit_ratio', 'gauge', "Proporción de aciertos de la caché compartida",
+               [({}, telemetry['cache']['tasa_aciertos'])])
+    metric('failures', 'gauge', "Archivos con error por ErrorType",
+           [({'error_type': error_type}, count) for error_type, count in telemetry['errores_por_tipo'].items()])
+    metric('slowest_file_seconds', 'gauge', "Duración de los archivos más lentos",
+           [({'path': entry['ruta']}, entry['segundos']) for entry in telemetry['mas_lentos']])
+    metric('last_run_timestamp_seconds', 'gauge', "Momento de la última compilación",
+           [({}, telemetry['marca_tiempo'])])
+    return '\n'.join(lines) + '\n'
+
+
+def write_build_telemetry(report: BuildReport, json_path: Optional[str] = None,
+                          prometheus_path: Optional[str] = None,
+                          slowest: int = DEFAULT_SLOWEST_FILES) -> Dict:
+    """
+    Exporta la telemetría de una compilación en JSON y/o Prometheus
+    
+    Ambos archivos se escriben de forma atómica, así que un recolector nunca
+    lee un informe a medias.
+    
+    Returns:
+        La telemetría exportada
+    """
+    telemetry = report.telemetry(slowest)
+    if json_path:
+        data = json.dumps(telemetry, ensure_ascii=False, indent=2) + "\n"
+        atomic_write(json_path, data.encode('utf-8'))
+    if prometheus_path:
+        atomic_write(prometheus_path, format_prometheus(telemetry).encode('utf-8'))
+    return telemetry
+
+
+# ============================================================================
+# MODO VIGILANCIA
+# ============================================================================
+
+DEFAULT_DEBOUNCE = 0.1       # Segundos sin eventos antes de recompilar
+DEFAULT_POLL_INTERVAL = 0.5  # Segundos entre sondeos del sistema de archivos
+
+# Máscaras de inotify (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+                  | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Detecta cambios comparando fechas y tamaños de los .vox en cada sondeo"""
+    
+    __slots__ = ('source_dir', 'output_dir', 'interval', '_snapshot')
+    
+    def __init__(self, source_dir: str, output_dir: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for relative_path in find_sources(self.source_dir, self.output_dir):
+            try:
+                info = os.stat(os.path.join(self.source_dir, relative_path))
+            except OSError:
+                continue
+            snapshot[relative_path] = (info.st_mtime_ns, info.st_size)
+        return snapshot
+    
+    def changes(self, timeout: Optional[float] = None) -> Optional[set]:
         """
-        Traduce métodos con : (dos puntos) - VERSIÓN CORREGIDA
+        Espera cambios hasta `timeout` segundos (None = sin límite)
+        
+        Returns:
+            Rutas relativas modificadas, creadas o borradas (vacío si no hubo)
         """
-        # 🔥 CORRECCIÓN CRÍTICA: Métodos con dos puntos
-        method_mappings = {
-            'clonar': 'Clone',
-            'destruir': 'Destroy',
-            'conectar': 'Connect',  # 🔥 CORREGIDO: Conectar → Connect
-            'desconectar': 'Disconnect',
-            'desconectar_todo': 'DisconnectAll',
-            'esperar': 'Wait',
-            'jugar': 'Play',
-            'pausar': 'Pause',
-            'detener': 'Stop',
-            'reanudar': 'Resume',
-            'emitir': 'Emit',
-            'encontrar_hijo': 'FindFirstChild',
-            'esperar_hijo': 'WaitForChild',
-            'obtener_hijos': 'GetChildren',
-            'obtener_descendientes': 'GetDescendants',
-            'es_ancestro': 'IsAncestorOf',
-            'es_descendiente': 'IsDescendantOf'
-        }
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+    
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Detecta cambios con inotify (Linux), vigilando cada subdirectorio"""
+    
+    __slots__ = ('source_dir', 'output_dir', '_libc', '_fd', '_dirs')
+    
+    def __init__(self, source_dir: str, output_dir: str):
+        # ctypes solo se necesita aquí: se importa al usar inotify
+        import ctypes
+        import ctypes.util
         
-        # 🔥 CORRECCIÓN CRÍTICA: Patrón mejorado para objeto:metodo() -> objeto:Metodo()
-        for spanish_method, english_method in method_mappings.items():
-            # Patrón que funciona con o sin espacios: objeto:metodo( o objeto: metodo(
-            pattern = r':\s*' + re.escape(spanish_method) + r'\s*\('
-            replacement = f':{english_method}('
-            code = re.sub(pattern, replacement, code)
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self._dirs: Dict[int, str] = {}
+        self._watch_tree(source_dir)
+    
+    def _watch_tree(self, directory: str) -> None:
+        excluded = os.path.realpath(self.output_dir)
+        for root, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(root, d)) != excluded]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), _IN_WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = root
+    
+    def _read_events(self) -> Optional[set]:
+        """Lee los eventos pendientes; None si hay que reescanear todo"""
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
             
-            # 🔥 CORRECCIÓN EXTRA: También manejar eventos .Evento:metodo(
-            pattern2 = r'\.\w+:\s*' + re.escape(spanish_method) + r'\s*\('
-            replacement2 = f':{english_method}('
-            code = re.sub(pattern2, replacement2, code)
-        
-        return code
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_DELETE_SELF:
+                del self._dirs[wd]
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Directorio nuevo: vigilarlo e incluir los .vox que ya tenga
+                    self._watch_tree(path)
+                    changed.update(os.path.join(os.path.relpath(path, self.source_dir), relative_path)
+                                   for relative_path in find_sources(path, self.output_dir))
+                elif mask & _IN_MOVED_FROM:
+                    return None
+                continue
+            if name.endswith(SOURCE_EXTENSION):
+                changed.add(os.path.relpath(path, self.source_dir))
+        return changed
     
-    def _translate_services(self, code: str) -> str:
-        """
-        Traduce servicios y llamadas a funciones - VERSIÓN CORREGIDA
+    def changes(self, timeout: Optional[float] = None) -> Optional[set]:
         """
-        # Mapeo directo de servicios
-        service_mapping = {
-            'jugadores': 'Players',
-            'espacio_trabajo': 'Workspace',
-            'luz': 'Lighting',
-            'sonido': 'SoundService',
-            'replicacion': 'ReplicatedStorage',
-            'servidor_script': 'ServerScriptService',
-            'servidor_almacen': 'ServerStorage',
-            'servicio_almacen_inicio': 'StarterGui',
-            'servicio_sonido': 'SoundService',
-            'servicio_chat': 'Chat',
-            'servicio_datos': 'DataStoreService',
-            'servicio_ejecucion': 'RunService',
-            'servicio_http': 'HttpService',
-            'servicio_localizacion': 'LocalizationService',
-            'servicio_prueba': 'TestService',
-            'servicio_terminales': 'Teams',
-            'servicio_basura': 'Debris',
-            'tienda_datos': 'DataStoreService',
-            'servicio_tween': 'TweenService',
-            'UserInputService': 'UserInputService',
-            'ContextActionService': 'ContextActionService'
-        }
-        
-        # 🔥 CORRECCIÓN: Manejar obtener_servicio de forma limpia
-        # obtener_servicio("servicio") -> game:GetService("Servicio")
-        for spanish, english in service_mapping.items():
-            # obtener_servicio("jugadores") -> game:GetService("Players")
-            pattern = rf'obtener_servicio\(\s*"{spanish}"\s*\)'
-            replacement = f'game:GetService("{english}")'
-            code = re.sub(pattern, replacement, code)
-        
-        # Para obtener_servicio con variables: obtener_servicio(variable)
-        code = re.sub(r'\bobtener_servicio\b', 'game:GetService', code)
+        Espera cambios hasta `timeout` segundos (None = sin límite)
         
-        return code
-    
-    def _translate_constructors(self, code: str) -> str:
-        """
-        Traduce constructores .new a la forma correcta con validación de aridad mejorada
+        Returns:
+            Rutas relativas afectadas (vacío si no hubo), o None si se
+            perdieron eventos y hay que reescanear todo el árbol
         """
-        # 🔥 CORRECCIÓN CRÍTICA: Validación de aridad en Color3.new (máximo 3 parámetros)
-        # Validar Color3.new con más de 3 parámetros
-        color3_invalid_pattern = r'Color3\.new\(([^,]+,\s*[^,]+,\s*[^,]+,\s*[^)]+)\)'
-        def validate_color3_arity(match):
-            params = match.group(1).strip()
-            raise SemanticError(f"Color3.new acepta máximo 3 parámetros (r, g, b), se encontraron 4 parámetros: {params}")
-        
-        code = re.sub(color3_invalid_pattern, validate_color3_arity, code)
-        
-        # Validar Color3_nuevo con más de 3 parámetros
-        color3_nuevo_invalid_pattern = r'Color3_nuevo\(([^,]+,\s*[^,]+,\s*[^,]+,\s*[^)]+)\)'
-        def validate_color3_nuevo_arity(match):
-            params = match.group(1).strip()
-            raise SemanticError(f"Color3_nuevo acepta máximo 3 parámetros (r, g, b), se encontraron 4 parámetros: {params}")
-        
-        code = re.sub(color3_nuevo_invalid_pattern, validate_color3_nuevo_arity, code)
-        
-        # Patrón para Constructor_nuevo(...) -> Constructor.new(...)
-        constructor_pattern = r'(\w+)_nuevo\s*\('
-        
-        def replace_constructor(match):
-            constructor_name = match.group(1)
-            # Mapeo especial para algunos constructores
-            if constructor_name == 'Color3':
-                return 'Color3.new('
-            elif constructor_name == 'Vector3':
-                return 'Vector3.new('
-            elif constructor_name == 'UDim2':
-                return 'UDim2.new('
-            elif constructor_name == 'CFrame':
-                return 'CFrame.new('
-            elif constructor_name == 'secuencia_color':
-                return 'ColorSequence.new('
-            elif constructor_name == 'secuencia_numero':
-                return 'NumberSequence.new('
-            else:
-                return f'{constructor_name}.new('
-        
-        code = re.sub(constructor_pattern, replace_constructor, code)
-        
-        # instancia_nueva("Tipo") -> Instance.new("Tipo")
-        code = re.sub(r'instancia_nueva\s*\(', 'Instance.new(', code)
-        
-        return code
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read_events()
     
-    def _translate_properties(self, code: str) -> str:
-        """
-        Traduce propiedades de objetos y acceso a miembros
-        """
-        # Lista extendida de propiedades comunes
-        properties = [
-            'nombre', 'padre', 'tamano', 'posicion', 'color_fondo', 
-            'texto', 'color_texto', 'transparencia_fondo', 'escalado_texto',
-            'visible', 'anclado', 'transparencia', 'color', 'material',
-            'reflejo', 'humanoide', 'parte_primaria', 'salud', 'salud_maxima',
-            'velocidad_caminar', 'poder_salto', 'forma', 'superficie',
-            'superficie_inferior', 'frente', 'atras', 'izquierda', 'derecha',
-            'puede_colisionar', 'masa', 'densidad', 'friccion', 'elasticidad',
-            'borde_pixel', 'radio_esquina', 'recorte', 'seleccionable',
-            'orden_z', 'layout', 'alineamiento', 'alineamiento_vertical',
-            'alineamiento_horizontal', 'relleno', 'espaciado', 'fuente',
-            'tamano_fuente', 'linea_texto', 'ajuste_texto', 'texto_truncado',
-            'alineacion_texto', 'alineacion_texto_vertical', 'color_borde',
-            'transparencia_borde', 'fondo_transparente', 'rango', 'brillo',
-            'angulo', 'atenuacion', 'habilitado', 'volumen', 'tiempo_posicion',
-            'duracion', 'pitch', 'loop', 'jugando', 'distancia_maxima',
-            'distancia_minima', 'id_sonido', 'id_imagen', 'id_malla', 'id_textura',
-            'velocidad', 'velocidad_angular', 'velocidad_maxima', 'velocidad_rotacion',
-            'fuerza', 'torque', 'centro_masas', 'tipo_luz', 'sombra',
-            'atenuacion_rolloff', 'escala_textura', 'desplazamiento_vertice',
-            'offset_malla', 'escala_malla'
-        ]
-        
-        for prop in properties:
-            if prop in self.translation_dict:
-                # Simple reemplazo: .texto -> .Text
-                pattern = r'\.' + re.escape(prop) + r'\b'
-                replacement = '.' + self.translation_dict[prop]
-                code = re.sub(pattern, replacement, code)
-        
-        # 🔥 CORRECCIÓN CRÍTICA: Math member access (math.piso → math.floor)
-        math_mappings = {
-            'piso': 'floor',
-            'techo': 'ceil',
-            'absoluto': 'abs',
-            'maximo': 'max',
-            'minimo': 'min',
-            'redondear': 'round',
-            'potencia': 'pow',
-            'raiz': 'sqrt',
-            'grados_a_radianes': 'deg',
-            'radianes_a_grados': 'rad',
-            'aleatorio': 'random',
-            'semilla_aleatoria': 'randomseed',
-            'ruido_perlin': 'noise',
-            'pi': 'pi',
-            'infinito': 'huge',
-            'exp': 'exp',
-            'log': 'log',
-            'log10': 'log10',
-            'sin': 'sin',
-            'cos': 'cos',
-            'tan': 'tan',
-            'asin': 'asin',
-            'acos': 'acos',
-            'atan': 'atan',
-            'atan2': 'atan2',
-            'sinh': 'sinh',
-            'cosh': 'cosh',
-            'tanh': 'tanh'
-        }
-        
-        for spanish_func, english_func in math_mappings.items():
-            # math.piso → math.floor
-            pattern = r'math\.' + re.escape(spanish_func) + r'\b'
-            replacement = f'math.{english_func}'
-            code = re.sub(pattern, replacement, code)
-        
-        return code
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(source_dir: str, output_dir: str, polling: bool = False,
+                   interval: float = DEFAULT_POLL_INTERVAL):
+    """Crea un vigilante inotify, o de sondeo si se pide o inotify no está disponible"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(source_dir, output_dir)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(source_dir, output_dir, interval)
+
+
+def watch_directory(source_dir: str, output_dir: str, jobs: Optional[int] = None,
+                    engine: str = ENGINE_CASCADE, cache: Optional[TranspileCache] = None,
+                    debounce: float = DEFAULT_DEBOUNCE, polling: bool = False,
+                    interval: float = DEFAULT_POLL_INTERVAL, minify: bool = False,
+                    optimize: int = OPTIMIZE_NONE) -> None:
+    """
+    Compila `source_dir` y vuelve a transpilar los archivos que cambien
     
-    def _translate_enums(self, code: str) -> str:
-        """
-        Traduce enums y valores especiales con mapeo de namespace
-        """
-        # 🔥 CORRECCIÓN CRÍTICA: Enums con namespace completo
-        enum_mappings = {
-            # Material enums
-            'material_plastico': 'Enum.Material.Plastic',
-            'metal': 'Enum.Material.Metal',
-            'madera': 'Enum.Material.Wood',
-            'cristal': 'Enum.Material.Glass',
-            'neon': 'Enum.Material.Neon',
-            
-            # EasingStyle enums
-            'estilo_suavizado.Linear': 'Enum.EasingStyle.Linear',
-            'estilo_suavizado.Sine': 'Enum.EasingStyle.Sine',
-            'estilo_suavizado.Back': 'Enum.EasingStyle.Back',
-            'estilo_suavizado.Quad': 'Enum.EasingStyle.Quad',
-            'estilo_suavizado.Quart': 'Enum.EasingStyle.Quart',
-            'estilo_suavizado.Quint': 'Enum.EasingStyle.Quint',
-            'estilo_suavizado.Expo': 'Enum.EasingStyle.Expo',
-            'estilo_suavizado.Circular': 'Enum.EasingStyle.Circular',
-            'estilo_suavizado.Elastic': 'Enum.EasingStyle.Elastic',
-            'estilo_suavizado.Bounce': 'Enum.EasingStyle.Bounce',
-            
-            # EasingDirection enums
-            'direccion_suavizado.In': 'Enum.EasingDirection.In',
-            'direccion_suavizado.Out': 'Enum.EasingDirection.Out',
-            'direccion_suavizado.InOut': 'Enum.EasingDirection.InOut',
-            
-            # PartType enums
-            'tipo_parte.Ball': 'Enum.PartType.Ball',
-            'tipo_parte.Block': 'Enum.PartType.Block',
-            'tipo_parte.Cylinder': 'Enum.PartType.Cylinder',
-            
-            # SurfaceType enums
-            'superficie_tipo.Smooth': 'Enum.SurfaceType.Smooth',
-            'superficie_tipo.Glue': 'Enum.SurfaceType.Glue',
-            
-            # Font enums
-            'fuente.Legacy': 'Enum.Font.Legacy',
-            'fuente.SourceSans': 'Enum.Font.SourceSans',
-            'fuente.SourceSansBold': 'Enum.Font.SourceSansBold',
-            'fuente.SourceSansLight': 'Enum.Font.SourceSansLight',
-            'fuente.SourceSansItalic': 'Enum.Font.SourceSansItalic',
-            'fuente.SourceSansBoldItalic': 'Enum.Font.SourceSansBoldItalic',
-            'fuente.Roboto': 'Enum.Font.Roboto',
-            'fuente.RobotoMono': 'Enum.Font.RobotoMono',
-            
-            # HumanoidStateType enums
-            'tipo_estado_humanoide.Running': 'Enum.HumanoidStateType.Running',
-            'tipo_estado_humanoide.Jumping': 'Enum.HumanoidStateType.Jumping',
-            'tipo_estado_humanoide.Freefall': 'Enum.HumanoidStateType.Freefall',
-            'tipo_estado_humanoide.Landed': 'Enum.HumanoidStateType.Landed',
-            'tipo_estado_humanoide.Swimming': 'Enum.HumanoidStateType.Swimming',
-            'tipo_estado_humanoide.Sitting': 'Enum.HumanoidStateType.Sitting',
-            'tipo_estado_humanoide.PlatformStanding': 'Enum.HumanoidStateType.PlatformStanding',
-            'tipo_estado_humanoide.Dead': 'Enum.HumanoidStateType.Dead',
+    Tras una compilación inicial (incremental), cada ráfaga de eventos se
+    agrupa hasta que pasan `debounce` segundos sin cambios; entonces solo
+    se recompilan los archivos tocados con un transpilador ya construido.
+    Los .lua de fuentes borradas se eliminan. Termina con Ctrl+C.
+    """
+    report = build_directory(source_dir, output_dir, jobs, engine, cache=cache, minify=minify, optimize=optimize)
+    print_build_report(report)
+    results = {result.path: result for result in report.results}
+    
+    _init_worker(engine, cache, minify, optimize)
+    watcher = create_watcher(source_dir, output_dir, polling, interval)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else f"sondeo cada {interval}s"
+    print(f"👀 Vigilando {source_dir} ({kind}). Ctrl+C para terminar.")
+    
+    try:
+        while True:
+            changed = watcher.changes(None)
+            while changed:
+                more = watcher.changes(debounce)
+                if more is None:
+                    changed = None
+                elif not more:
+                    break
+                else:
+                    changed |= more
+            if changed is None:
+                changed = set(results) | set(find_sources(source_dir, output_dir))
+            if not changed:
+                continue
             
-            # UserInputType enums
-            'tipo_entrada.MouseButton1': 'Enum.UserInputType.MouseButton1',
-            'tipo_entrada.MouseButton2': 'Enum.UserInputType.MouseButton2',
-            'tipo_entrada.MouseButton3': 'Enum.UserInputType.MouseButton3',
-            'tipo_entrada.Keyboard': 'Enum.UserInputType.Keyboard',
-            'tipo_entrada.Touch': 'Enum.UserInputType.Touch',
+            start = time.perf_counter()
+            batch = []
+            removed = 0
+            for relative_path in sorted(changed):
+                if os.path.exists(os.path.join(source_dir, relative_path)):
+                    previous = results.get(relative_path)
+                    previous_hash = previous.source_hash if previous is not None and previous.ok else None
+                    result = _build_file((source_dir, output_dir, relative_path, previous_hash))
+                    results[relative_path] = result
+                    batch.append(result)
+                elif results.pop(relative_path, None) is not None:
+                    removed += 1
+                    try:
+                        os.remove(output_path_for(relative_path, output_dir))
+                    except FileNotFoundError:
+                        pass
+            save_manifest(output_dir, [results[path] for path in sorted(results)], _manifest_options(minify, optimize))
+            elapsed = (time.perf_counter() - start) * 1000
             
-            # UserInputState enums
-            'estado_entrada.Begin': 'Enum.UserInputState.Begin',
-            'estado_entrada.Change': 'Enum.UserInputState.Change',
-            'estado_entrada.End': 'Enum.UserInputState.End',
-            'estado_entrada.Cancel': 'Enum.UserInputState.Cancel'
-        }
-        
-        # Reemplazar enums completos
-        for spanish_enum, english_enum in enum_mappings.items():
-            pattern = r'\b' + re.escape(spanish_enum) + r'\b'
-            code = re.sub(pattern, english_enum, code)
-        
-        # 🔥 CORRECCIÓN CRÍTICA: Mapeo de enums simples (sin namespace)
-        simple_enum_mappings = {
-            'Linear': 'Enum.EasingStyle.Linear',
-            'Sine': 'Enum.EasingStyle.Sine',
-            'Back': 'Enum.EasingStyle.Back',
-            'Quad': 'Enum.EasingStyle.Quad',
-            'Quart': 'Enum.EasingStyle.Quart',
-            'Quint': 'Enum.EasingStyle.Quint',
-            'Expo': 'Enum.EasingStyle.Expo',
-            'Circular': 'Enum.EasingStyle.Circular',
-            'Elastic': 'Enum.EasingStyle.Elastic',
-            'Bounce': 'Enum.EasingStyle.Bounce',
-            'In': 'Enum.EasingDirection.In',
-            'Out': 'Enum.EasingDirection.Out',
-            'InOut': 'Enum.EasingDirection.InOut'
-        }
-        
-        # Mapear enums después de punto (estilo_suavizado.Quad → Enum.EasingStyle.Quad)
-        for simple_enum, full_enum in simple_enum_mappings.items():
-            pattern = r'(?:estilo_suavizado|direccion_suavizado)\.(\b' + re.escape(simple_enum) + r'\b)'
-            code = re.sub(pattern, full_enum, code)
-        
-        # Colores BrickColor (mantener funcionalidad existente)
-        color_pattern = r'(\w+)_brillante'
-        def replace_color(match):
-            color_name = match.group(1)
-            return f'BrickColor.new("Bright {color_name}")'
-        
-        code = re.sub(color_pattern, replace_color, code)
-        
-        return code
+            rebuilt = sum(1 for result in batch if result.status in (STATUS_TRANSPILED, STATUS_UNCHANGED))
+            print(f"🔄 {rebuilt} archivo(s) recompilado(s), {removed} eliminado(s) "
+                  f"de {len(changed)} cambio(s) en {elapsed:.1f} ms")
+            for result in batch:
+                if not result.ok:
+                    print(f"  ❌ {result.path}: [{result.error_type}] {result.message}")
+    except KeyboardInterrupt:
+        print("\n👋 Vigilancia detenida")
+    finally:
+        watcher.close()
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """Analizador de argumentos que conserva el código de salida 1 para errores de uso"""
     
-    def check_forbidden_words(self, content: str, filename: str = "") -> None:
-        """
-        Verifica que no haya palabras prohibidas en el contenido
-        
-        Args:
-            content: Contenido a verificar
-            filename: Nombre del archivo para mensajes de error
-            
-        Raises:
-            DSLError: Si encuentra palabras prohibidas
-        """
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            for forbidden in self.forbidden_words:
-                if forbidden.lower() in line.lower():
-                    raise DSLError(
-                        f"Palabra prohibida '{forbidden}' encontrada en línea {line_num} de {filename}",
-                        ErrorType.FORBIDDEN_WORD
-                    )
+    def error(self, message: str) -> None:
+        self.print_usage(sys.stderr)
+        print(f"❌ Error: {message}")
+        sys.exit(1)
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Construye el analizador de argumentos de la línea de comandos
+    """
+    parser = _ArgumentParser(
+        prog="transpiler_final.py",
+        usage="python transpiler_final.py <archivo_entrada.vox> <archivo_salida.lua> [opciones]",
+        description="Transpilador Vox: Lua en español a Lua estándar para Roblox",
+    )
+    parser.add_argument("entrada", nargs="?", help="Archivo .vox de entrada")
+    parser.add_argument("archivo_salida", nargs="?", metavar="salida", help="Archivo .lua de salida")
+    parser.add_argument("--flujo", action="store_true",
+                        help="Transpilar por bloques con memoria acotada (archivos grandes)")
+    parser.add_argument("--motor", choices=ENGINES, default=ENGINE_CASCADE,
+                        help="Motor de traducción (la salida es la misma con todos)")
+    parser.add_argument("--optimizar", type=int, choices=OPTIMIZATION_LEVELS, default=OPTIMIZE_NONE,
+                        metavar="NIVEL", help="Optimizar el Lua generado (1: servicios y WaitForChild en locales; "
+                             "2: además math, task y constructores)")
+    parser.add_argument("--minificar", action="store_true",
+                        help="Quitar comentarios y espacios y acortar los nombres de las locales")
+    parser.add_argument("--directorio", help="Directorio con archivos .vox a transpilar")
+    parser.add_argument("--salida", dest="directorio_salida",
+                        help="Directorio de salida para --directorio")
+    parser.add_argument("-j", "--trabajos", type=int, default=None,
+                        help="Procesos en paralelo para --directorio o para un archivo grande "
+                             "(por defecto, uno por núcleo)")
+    parser.add_argument("--completo", action="store_true",
+                        help="Ignorar el manifiesto y transpilar todos los archivos de --directorio")
+    parser.add_argument("--lsp", action="store_true",
+                        help="Iniciar el servidor de lenguaje (JSON-RPC por stdio) para el editor")
+    parser.add_argument("--trabajador", nargs="?", const="longitud", choices=("longitud", "nul"),
+                        help="Atender peticiones de compilación por stdin (marco por longitud o NUL)")
+    parser.add_argument("--vigilar", action="store_true",
+                        help="Con --directorio: recompilar los archivos modificados al guardarlos")
+    parser.add_argument("--sondeo", action="store_true",
+                        help="Con --vigilar: usar sondeo en lugar de inotify")
+    parser.add_argument("--intervalo", type=float, default=DEFAULT_POLL_INTERVAL, metavar="SEG",
+                        help="Con --sondeo: segundos entre sondeos")
+    parser.add_argument("--antirrebote", type=int, default=int(DEFAULT_DEBOUNCE * 1000), metavar="MS",
+                        help="Con --vigilar: milisegundos sin cambios antes de recompilar")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Usar la caché compartida (por defecto ${CACHE_DIR_ENV} o ~/.cache/vox)")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="Directorio de la caché compartida (implica --cache)")
+    parser.add_argument("--cache-max", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        metavar="MB", help="Tamaño máximo de la caché en MB")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="Mostrar aciertos/fallos de la caché (solo, o tras transpilar)")
+    parser.add_argument("--telemetria", metavar="ARCHIVO.json",
+                        help="Con --directorio o --trabajador: exportar la telemetría de la compilación en JSON")
+    parser.add_argument("--telemetria-prometheus", metavar="ARCHIVO.prom",
+                        help="Con --directorio o --trabajador: exportar la telemetría en formato Prometheus")
+    parser.add_argument("--estadisticas", action="store_true",
+                        help="Mostrar tiempos por pasada, sustituciones por regla y líneas más costosas")
+    parser.add_argument("--comprobar", "--check", action="store_true",
+                        help="Solo diagnosticar (sin generar Lua) el archivo o --directorio: "
+                             "todos los errores con línea y columna")
+    parser.add_argument("--formato", choices=("texto", "json"), default="texto",
+                        help="Formato de --comprobar y --estadisticas")
+    return parser
+
+
+def print_optimize_report(optimizer: LuaOptimizer) -> None:
+    """Imprime lo que la última optimización elevó a locales"""
+    if optimizer.errors:
+        line, column, message = optimizer.errors[0]
+        print(f"⚠️  Sin optimizar: el Lua generado no se pudo analizar (línea {line}, columna {column}: {message})")
+        return
+    print(f"⚡ Optimizado (nivel {optimizer.level}): {len(optimizer.hoisted)} búsqueda(s) elevada(s) a locales")
+    for name, expression, uses in optimizer.hoisted:
+        print(f"  {name} = {expression} ({uses} uso(s))")
+
+
+def print_minify_report(minifier: LuaMinifier) -> None:
+    """Imprime el tamaño antes y después de la última minificación"""
+    if minifier.errors:
+        line, column, message = minifier.errors[0]
+        print(f"⚠️  Sin minificar: el Lua generado no se pudo analizar (línea {line}, columna {column}: {message})")
+        return
+    before, after = minifier.size_before, minifier.size_after
+    saved = (before - after) / before * 100 if before else 0.0
+    print(f"📉 Minificado: {before:,} → {after:,} bytes (-{saved:.1f}%), "
+          f"{minifier.renamed} locales y parámetros renombrados")
+
+
+def _transpile_file_stream(transpiler: LuaDSLTranspiler, input_file: str, output_file: str) -> None:
+    """
+    Transpila un archivo en modo flujo escribiendo en un temporal que se
+    renombra al terminar, para no dejar una salida a medias si hay errores
+    """
+    temp_file = output_file + ".tmp"
+    try:
+        with open(input_file, 'r', encoding='utf-8') as reader, \
+                open(temp_file, 'w', encoding='utf-8') as writer:
+            transpiler.transpile_stream(reader, writer, input_file)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[TranspileCache]:
+    """Caché indicada en la línea de comandos (--cache-dir y --cache-stats implican --cache)"""
+    if not args.cache and args.cache_dir is None and not args.cache_stats:
+        return None
+    return TranspileCache(args.cache_dir, args.cache_max * 1024 * 1024)
+
+
+def _main_directory(args: argparse.Namespace) -> int:
+    """
+    Compila un directorio completo y devuelve el código de salida
+    """
+    if not os.path.isdir(args.directorio):
+        print(f"❌ Error: El directorio '{args.directorio}' no existe")
+        return 1
+    if args.trabajos is not None and args.trabajos < 1:
+        print("❌ Error: -j debe ser al menos 1")
+        return 1
+    
+    cache = _cache_from_args(args)
+    if args.vigilar:
+        watch_directory(args.directorio, args.directorio_salida, args.trabajos, args.motor, cache=cache,
+                        debounce=args.antirrebote / 1000, polling=args.sondeo,
+                        interval=args.intervalo, minify=args.minificar, optimize=args.optimizar)
+        return 0
+    
+    report = build_directory(args.directorio, args.directorio_salida, args.trabajos, args.motor,
+                             incremental=not args.completo, cache=cache, minify=args.minificar,
+                             optimize=args.optimizar)
+    print_build_report(report)
+    if args.telemetria or args.telemetria_prometheus:
+        write_build_telemetry(report, args.telemetria, args.telemetria_prometheus)
+    if cache is not None and args.cache_stats:
+        print_cache_stats(cache, report.cache_hits, report.cache_misses)
+    return report.exit_code
+
+
+def check_file(transpiler: LuaDSLTranspiler, path: str) -> List[Diagnostic]:
+    """
+    Diagnósticos de un archivo (ver LuaDSLTranspiler.check_content)
+    
+    Si no se puede leer o decodificar, devuelve un único error de archivo
+    en la posición 0:0.
+    """
+    try:
+        with open(path, 'rb') as f:
+            content = decode_source(f.read())
+    except (OSError, UnicodeDecodeError) as e:
+        return [Diagnostic(0, 0, ErrorType.FILE_ERROR, error_message(e))]
+    return transpiler.check_content(content)
+
+
+def _main_check(args: argparse.Namespace) -> int:
+    """
+    Modo comprobación: diagnostica sin generar código y devuelve el código
+    de salida (2 si hay algún diagnóstico)
+    """
+    if args.directorio:
+        if not os.path.isdir(args.directorio):
+            print(f"❌ Error: El directorio '{args.directorio}' no existe")
+            return 1
+        paths = [os.path.join(args.directorio, path)
+                 for path in find_sources(args.directorio, args.directorio_salida)]
+    else:
+        paths = [args.entrada]
+    
+    transpiler = LuaDSLTranspiler()
+    results = [(path, check_file(transpiler, path)) for path in paths]
+    total = sum(len(diagnostics) for _, diagnostics in results)
+    
+    if args.formato == "json":
+        print(json.dumps({
+            'archivos': [{'archivo': path, 'diagnosticos': [d.to_dict() for d in diagnostics]}
+                         for path, diagnostics in results],
+            'total': total,
+        }, ensure_ascii=False, indent=2))
+    else:
+        for path, diagnostics in results:
+            for diagnostic in diagnostics:
+                print(diagnostic.format(path))
+        failed = sum(1 for _, diagnostics in results if diagnostics)
+        mark = "❌" if total else "✅"
+        print(f"{mark} {len(results)} archivo(s) comprobado(s), {total} diagnóstico(s) en {failed} archivo(s)")
+    return 2 if total else 0
 
 
 def main():
     """
     Función principal para ejecutar el transpilador desde línea de comandos
     """
-    if len(sys.argv) != 3:
-        print("Uso: python transpiler_final.py <archivo_entrada.vox> <archivo_salida.lua>")
-        sys.exit(1)
+    parser = _build_arg_parser()
+    args = parser.parse_args()
+    
+    if args.lsp:
+        # El servidor solo se importa en este modo
+        from vox_server import main as serve
+        sys.exit(serve())
+    if args.trabajador:
+        from vox_worker import main as work
+        options = ["--marco", args.trabajador]
+        if args.telemetria:
+            options += ["--telemetria", args.telemetria]
+        if args.telemetria_prometheus:
+            options += ["--telemetria-prometheus", args.telemetria_prometheus]
+        sys.exit(work(options))
+    if args.comprobar:
+        if bool(args.directorio) == bool(args.entrada):
+            parser.error("--comprobar requiere un archivo de entrada o --directorio")
+        sys.exit(_main_check(args))
+    if args.vigilar and not args.directorio:
+        parser.error("--vigilar requiere --directorio y --salida")
+    if args.directorio:
+        if args.entrada or not args.directorio_salida:
+            parser.error("--directorio requiere --salida y no admite archivos individuales")
+        sys.exit(_main_directory(args))
+    if args.cache_stats and not args.entrada:
+        print_cache_stats(_cache_from_args(args))
+        sys.exit(0)
+    if not args.entrada or not args.archivo_salida:
+        parser.error("se requieren <archivo_entrada.vox> y <archivo_salida.lua>")
+    if args.trabajos is not None and args.trabajos < 1:
+        parser.error("-j debe ser al menos 1")
+    if (args.minificar or args.optimizar) and args.flujo:
+        parser.error("--optimizar y --minificar no admiten --flujo (hace falta el archivo completo)")
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    input_file = args.entrada
+    output_file = args.archivo_salida
     
     try:
         # Verificar que el archivo de entrada exista
@@ -1130,23 +6569,45 @@ def main():
             sys.exit(1)
         
         # Crear transpilador y procesar
-        transpiler = LuaDSLTranspiler()
-        
-        # Leer archivo de entrada
-        with open(input_file, 'r', encoding='utf-8') as f:
-            dsl_content = f.read()
-        
-        # Transpilar contenido
-        lua_content = transpiler.transpile_content(dsl_content, input_file)
+        stats = TranspileStats() if args.estadisticas else None
+        transpiler = LuaDSLTranspiler(engine=args.motor, stats=stats, minify=args.minificar,
+                                      optimize=args.optimizar)
         
-        # Escribir archivo de salida
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(lua_content)
+        cache = None
+        cached = False
+        if args.flujo:
+            _transpile_file_stream(transpiler, input_file, output_file)
+        else:
+            # Leer archivo de entrada
+            with open(input_file, 'rb') as f:
+                data = f.read()
+            
+            # Transpilar contenido (consultando la caché si está activada, en paralelo si el
+            # archivo es grande; las estadísticas miden siempre la transpilación real)
+            cache = _cache_from_args(args) if stats is None else None
+            lua_content, cached = transpile_cached(transpiler, data, input_file, cache, jobs=args.trabajos)
+            
+            # Escribir archivo de salida (solo si cambia)
+            write_if_changed(output_file, lua_content)
+            
+            if cache is not None:
+                cache.record(1 if cached else 0, 0 if cached else 1, cache.trim())
         
+        if args.estadisticas and args.formato == "json":
+            print(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2))
+            return
         print(f"Transpilacion exitosa: {input_file} -> {output_file}")
+        if transpiler.optimizer is not None and not cached:
+            print_optimize_report(transpiler.optimizer)
+        if transpiler.minifier is not None and not cached:
+            print_minify_report(transpiler.minifier)
+        if stats is not None:
+            print_transpile_stats(stats)
+        if args.cache_stats and cache is not None:
+            print_cache_stats(cache, 1 if cached else 0, 0 if cached else 1)
         
     except DSLError as e:
-        print(f"Error de DSL: {e}")
+        print(f"Error de DSL: {error_message(e)}")
         sys.exit(2)
     except Exception as e:
         print(f"Error inesperado: {e}")
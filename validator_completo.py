@@ -4,16 +4,24 @@ VALIDADOR COMPLETO AUTOMÁTICO DE VOX LANGUAGE
 Verifica que todas las traducciones sean correctas sin test manual
 """
 
+import json
+import os
 import re
+import stat
 import sys
+import tempfile
 from typing import Dict, List, Set, Tuple
-from transpiler_final import LuaDSLTranspiler
+from transpiler_final import (LuaDSLTranspiler, LuaMinifier, LuaOptimizer, TranspileCache, ENGINE_AST,
+                              ENGINE_SINGLE_PASS, OPTIMIZE_GLOBALS, OPTIMIZE_LOOKUPS, CACHE_DIR_ENV,
+                              MANIFEST_FILENAME, STATUS_SKIPPED, atomic_write, build_directory,
+                              transpile_cached)
 
 class VoxValidator:
     """Validador automático completo de traducciones Vox"""
     
     def __init__(self):
         self.transpiler = LuaDSLTranspiler()
+        self.single_pass = LuaDSLTranspiler(engine=ENGINE_SINGLE_PASS)
         self.errors = []
         self.warnings = []
         self.passed_tests = []
@@ -91,6 +99,14 @@ class VoxValidator:
             generated_clean = self._clean_code(generated_lua)
             expected_clean = self._clean_code(expected_lua)
             
+            # El motor de una sola pasada debe generar exactamente lo mismo
+            single_pass_lua = self.single_pass._process_code_semantic(vox_code)
+            if single_pass_lua != generated_lua:
+                self.errors.append(f"❌ {test_name}: El motor single_pass difiere de la cascada")
+                self.errors.append(f"   Cascada:     {generated_lua}")
+                self.errors.append(f"   Single pass: {single_pass_lua}")
+                return False
+            
             if generated_clean == expected_clean:
                 self.passed_tests.append(f"✅ {test_name}: Traducción correcta")
                 return True
@@ -212,6 +228,280 @@ class VoxValidator:
         except Exception:
             self.passed_tests.append("✅ Color3_nuevo con 4 parámetros generó error correctamente")
         
+        try:
+            self.single_pass._process_code_semantic('Color3_nuevo(1, 0, 0, 0.5)')
+            self.errors.append("❌ Color3_nuevo con 4 parámetros no generó error (single_pass)")
+            all_passed = False
+        except Exception:
+            self.passed_tests.append("✅ Color3_nuevo con 4 parámetros generó error correctamente (single_pass)")
+        
+        # Llamada sin cerrar en una sentencia inválida: abarca las líneas siguientes
+        try:
+            LuaDSLTranspiler(engine=ENGINE_AST).transpile_content('Color3_nuevo([[]],()[[]]\npara _,j en(s())hacer,]\nfin')
+            self.errors.append("❌ Color3_nuevo sin cerrar no generó error de aridad (ast)")
+            all_passed = False
+        except Exception:
+            self.passed_tests.append("✅ Color3_nuevo sin cerrar generó error de aridad (ast)")
+        
+        # 🔥 TEST 8: OPTIMIZACIÓN (--optimizar 1)
+        print("⚡ Validando Optimización...")
+        optimizer = LuaDSLTranspiler(optimize=OPTIMIZE_LOOKUPS)
+        # Un WaitForChild dentro de una función o de un `si` no sale de ahí: si
+        # subiera al principio, el script esperaría a una carpeta que crea después
+        lua = optimizer.transpile_content(
+            'local funcion obtenerRemotos()\n'
+            '    retornar obtener_servicio("ReplicatedStorage"):esperar_hijo("Remotos")\n'
+            'fin\n'
+            'local carpeta = instancia_nueva("Folder")\n'
+            'carpeta.Name = "Remotos"\n'
+            'carpeta.Parent = obtener_servicio("ReplicatedStorage")\n'
+            'si modo == "admin" entonces\n'
+            '    workspace:esperar_hijo("PanelAdmin")\n'
+            'fin\n')
+        if ('return ReplicatedStorage:WaitForChild("Remotos")' in lua
+                and 'then\n    workspace:WaitForChild("PanelAdmin")' in lua):
+            self.passed_tests.append("✅ WaitForChild en funciones y condiciones no se eleva")
+        else:
+            self.errors.append(f"❌ WaitForChild elevado fuera de su función o condición:\n{lua}")
+            all_passed = False
+
+        # Dentro de un bucle se declara antes y se busca una sola vez, dentro
+        lua = optimizer.transpile_content(
+            'local funcion zonas()\n'
+            '    para i = 1, 10 hacer\n'
+            '        imprimir(workspace:esperar_hijo("Mapa"))\n'
+            '    fin\n'
+            'fin\n')
+        if ('local function zonas()\n    local Mapa\n    for i = 1, 10 do\n'
+                '        Mapa = Mapa or workspace:WaitForChild("Mapa")\n        print(Mapa)' in lua):
+            self.passed_tests.append("✅ WaitForChild dentro de un bucle se busca una sola vez")
+        else:
+            self.errors.append(f"❌ WaitForChild dentro de un bucle no se guardó en una local:\n{lua}")
+            all_passed = False
+
+        # Un bucle sin vueltas (lista vacía, condición falsa) no debe esperar a nada
+        for name, source in (
+                ('ipairs vacío', 'local lista = {}\n'
+                                 'para _, p en ipairs(lista) hacer\n'
+                                 '    workspace:esperar_hijo("Mapa"):esperar_hijo("Puerta").Transparency = 1\n'
+                                 'fin\n'),
+                ('mientras falso', 'local activo = falso\n'
+                                   'mientras activo hacer\n'
+                                   '    imprimir(script:esperar_hijo("Humanoid"))\n'
+                                   'fin\n')):
+            lua = optimizer.transpile_content(source)
+            loop = lua.index('for _' if 'ipairs' in name else 'while')
+            if 'WaitForChild' not in lua[:loop]:
+                self.passed_tests.append(f"✅ WaitForChild no se ejecuta antes de un bucle ({name})")
+            else:
+                self.errors.append(f"❌ WaitForChild se ejecuta antes de un bucle ({name}):\n{lua}")
+                all_passed = False
+
+        # Luau admite 200 locales por función: el optimizador no debe pasarse
+        botones = ''.join(f'        imprimir(script:esperar_hijo("Boton{n}"))\n' for n in range(250))
+        lua = optimizer.transpile_content(f'local funcion botones()\n    para i = 1, 10 hacer\n{botones}    fin\nfin\n')
+        if lua.count('local ') <= 180:
+            self.passed_tests.append("✅ Optimización respeta el límite de locales por función")
+        else:
+            self.errors.append(f"❌ Optimización creó {lua.count('local ')} locales en una función")
+            all_passed = False
+
+        # 🔥 TEST 9: MINIFICACIÓN (--minificar)
+        print("🗜️ Validando Minificación...")
+        minifier = LuaMinifier()
+        minify_cases = [
+            # Ningún nombre corto oculta un upvalue en uso (contador -> b) ni un global (a)
+            ('nombres que no ocultan globales ni upvalues',
+             'local contador = 0\nlocal function f(valor)\n    local doble = valor * 2\n'
+             '    return contador + doble + a\nend\n',
+             'local b=0 local function c(d)local e=d*2 return b+e+a end\n'),
+            # Campos, métodos y self conservan su nombre
+            ('campos, métodos y self intactos',
+             'local obj = {}\nfunction obj:mover(destino)\n    self.posicion = destino\n'
+             '    return obj.Character:FindFirstChild("Humanoid")\nend\n',
+             'local a={}function a:mover(b)self.posicion=b return a.Character:FindFirstChild("Humanoid")end\n'),
+            # Sin espacio serían un comentario (a--b) o un número mal formado (1..2)
+            ('espacios necesarios en a - -b y 1 .. 2',
+             'local x = 1\nlocal y = 2\nprint(x - -y, 1 .. 2)\n',
+             'local a=1 local b=2 print(a- -b,1 .. 2)\n'),
+            ('directiva --!strict conservada',
+             '--!strict\n-- comentario\nlocal valor = 1\nprint(valor)\n',
+             '--!strict\nlocal a=1 print(a)\n'),
+        ]
+        for name, source, expected in minify_cases:
+            result = minifier.minify(source)
+            if result == expected:
+                self.passed_tests.append(f"✅ Minificación: {name}")
+            else:
+                self.errors.append(f"❌ Minificación: {name}: se esperaba {expected!r}, se obtuvo {result!r}")
+                all_passed = False
+
+        # 🔥 TEST 10: OPTIMIZACIÓN DE GLOBALES (--optimizar 2)
+        print("⚡ Validando Optimización de globales...")
+        optimizer = LuaOptimizer(OPTIMIZE_GLOBALS)
+        globals_cases = [
+            ('librería reasignada',
+             'math = {floor = function(x) return x end}\nfor i = 1, 3 do print(math.floor(i)) end\n',
+             'math = {floor = function(x) return x end}\nfor i = 1, 3 do print(math.floor(i)) end\n'),
+            # Dentro de f, Vector3 es el parámetro: solo cambia el uso de fuera
+            ('global oculto por un parámetro',
+             'local function f(Vector3)\n    for i = 1, 3 do print(Vector3.new(i)) end\nend\n'
+             'for i = 1, 3 do print(Vector3.new(i)) end\n',
+             'local Vector3_new = Vector3.new\nlocal function f(Vector3)\n'
+             '    for i = 1, 3 do print(Vector3.new(i)) end\nend\n'
+             'for i = 1, 3 do print(Vector3_new(i)) end\n'),
+            ('campo redefinido (function Color3.new)',
+             'function Color3.new() return 1 end\nfor i = 1, 3 do print(Color3.new(i)) end\n',
+             'function Color3.new() return 1 end\nfor i = 1, 3 do print(Color3.new(i)) end\n'),
+            ('alias sin chocar con locales existentes',
+             'local floor = 1\nlocal Vector3_new = 2\n'
+             'for i = 1, 3 do print(math.floor(i), Vector3.new(i), floor, Vector3_new) end\n',
+             'local floor_2 = math.floor\nlocal Vector3_new_2 = Vector3.new\nlocal floor = 1\nlocal Vector3_new = 2\n'
+             'for i = 1, 3 do print(floor_2(i), Vector3_new_2(i), floor, Vector3_new) end\n'),
+        ]
+        for name, source, expected in globals_cases:
+            result = optimizer.optimize(source)
+            if result == expected:
+                self.passed_tests.append(f"✅ Optimización nivel 2: {name}")
+            else:
+                self.errors.append(f"❌ Optimización nivel 2: {name}:\n{result}")
+                all_passed = False
+
+        # 🔥 TEST 11: CACHÉ COMPARTIDA (--cache)
+        print("💾 Validando Caché compartida...")
+        previous_cache_dir = os.environ.get(CACHE_DIR_ENV)
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ[CACHE_DIR_ENV] = directory
+            try:
+                cache = TranspileCache()
+                data = 'local x = 1\nimprimir(x)\n'.encode('utf-8')
+                first = transpile_cached(self.transpiler, data, 'cache.vox', cache)
+                second = transpile_cached(self.transpiler, data, 'cache.vox', cache)
+                if cache.directory == directory and first[1] is False and second == (first[0], True):
+                    self.passed_tests.append("✅ Caché: fallo y después acierto con la misma salida")
+                else:
+                    self.errors.append(f"❌ Caché: se esperaba fallo y acierto, se obtuvo {first[1]} y {second[1]}")
+                    all_passed = False
+
+                # Cada motor y cada opción de salida tiene su propia entrada
+                keys = {cache.key('fuente', LuaDSLTranspiler(**options).cache_options())
+                        for options in ({}, {'engine': ENGINE_SINGLE_PASS}, {'engine': ENGINE_AST},
+                                        {'optimize': OPTIMIZE_LOOKUPS}, {'optimize': OPTIMIZE_GLOBALS},
+                                        {'minify': True})}
+                if len(keys) == 6:
+                    self.passed_tests.append("✅ Caché: la clave cambia con el motor, --optimizar y --minificar")
+                else:
+                    self.errors.append(f"❌ Caché: solo {len(keys)} claves distintas para 6 configuraciones")
+                    all_passed = False
+
+                # trim() desaloja primero la entrada usada hace más tiempo
+                trimmed = TranspileCache(os.path.join(directory, 'lru'), max_bytes=25)
+                paths = []
+                for age, key in enumerate(('c' * 64, 'a' * 64, 'b' * 64)):
+                    trimmed.put(key, b'x' * 10)
+                    paths.append(trimmed._entry_path(key))
+                    os.utime(paths[-1], (1000 + age, 1000 + age))
+                evicted = trimmed.trim()
+                if evicted == 1 and not os.path.exists(paths[0]) and all(map(os.path.exists, paths[1:])):
+                    self.passed_tests.append("✅ Caché: trim() desaloja la entrada más antigua")
+                else:
+                    self.errors.append(f"❌ Caché: trim() desalojó {evicted} entradas, no la más antigua")
+                    all_passed = False
+            finally:
+                if previous_cache_dir is None:
+                    os.environ.pop(CACHE_DIR_ENV, None)
+                else:
+                    os.environ[CACHE_DIR_ENV] = previous_cache_dir
+
+        # 🔥 TEST 12: COMPILACIÓN INCREMENTAL (--directorio)
+        print("📁 Validando Compilación incremental...")
+        with tempfile.TemporaryDirectory() as directory:
+            source_dir = os.path.join(directory, 'src')
+            output_dir = os.path.join(directory, 'build')
+            os.makedirs(source_dir)
+            for name in ('a.vox', 'b.vox'):
+                with open(os.path.join(source_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(f'imprimir("{name}")\n')
+            a_lua = os.path.join(output_dir, 'a.lua')
+            manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+
+            def statuses():
+                return {result.path: result.status for result in build_directory(source_dir, output_dir, jobs=1).results}
+
+            statuses()
+            os.utime(a_lua, (1000, 1000))
+            if statuses().get('a.vox') == STATUS_SKIPPED and os.stat(a_lua).st_mtime == 1000:
+                self.passed_tests.append("✅ Incremental: una fuente sin cambios se omite y su .lua no se toca")
+            else:
+                self.errors.append("❌ Incremental: una fuente sin cambios se volvió a escribir")
+                all_passed = False
+
+            # Otras reglas u otra versión invalidan el manifiesto entero
+            for field in ('reglas', 'version'):
+                with open(manifest_path, encoding='utf-8') as f:
+                    manifest = json.load(f)
+                manifest[field] = 'otra'
+                with open(manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+                status = statuses().get('a.vox')
+                if status != STATUS_SKIPPED:
+                    self.passed_tests.append(f"✅ Incremental: un cambio de '{field}' en el manifiesto fuerza la recompilación")
+                else:
+                    self.errors.append(f"❌ Incremental: un cambio de '{field}' en el manifiesto no recompiló")
+                    all_passed = False
+
+            os.remove(os.path.join(source_dir, 'b.vox'))
+            report = build_directory(source_dir, output_dir, jobs=1)
+            if report.removed == ['b.vox'] and not os.path.exists(os.path.join(output_dir, 'b.lua')):
+                self.passed_tests.append("✅ Incremental: borrar un .vox elimina su .lua")
+            else:
+                self.errors.append(f"❌ Incremental: borrar b.vox no eliminó b.lua (eliminados: {report.removed})")
+                all_passed = False
+
+            # atomic_write reemplaza el archivo sin cambiar sus permisos
+            os.chmod(a_lua, 0o640)
+            atomic_write(a_lua, b'-- nuevo\n')
+            mode = stat.S_IMODE(os.stat(a_lua).st_mode)
+            if mode == 0o640:
+                self.passed_tests.append("✅ atomic_write conserva los permisos del archivo")
+            else:
+                self.errors.append(f"❌ atomic_write cambió los permisos a {oct(mode)}")
+                all_passed = False
+
+        # 🔥 TEST 13: TRANSPILACIÓN EN PARALELO (--trabajos)
+        print("🧵 Validando Transpilación en paralelo...")
+        # Trozos pequeños: los cortes caen dentro de strings largos, comentarios
+        # largos y llamadas a constructor de varias líneas
+        block = ('local texto = [[\nlinea larga "con comillas"\nsino si\n]]\n'
+                 '--[==[\ncomentario largo\nColor3_nuevo(1, 2, 3, 4)\n]==]\n'
+                 'local color = Color3_nuevo(\n    1,\n    0.5,\n    0\n)\n'
+                 'si x entonces imprimir(texto) fin\n')
+        content = block * 40
+        serial = self.transpiler.transpile_content(content, 'paralelo.vox')
+        mismatches = [jobs for jobs in (2, 3, 4)
+                      if self.transpiler.transpile_parallel(content, 'paralelo.vox', jobs=jobs, min_size=0) != serial]
+        if not mismatches:
+            self.passed_tests.append("✅ Paralelo: salida idéntica a la transpilación en serie")
+        else:
+            self.errors.append(f"❌ Paralelo: salida distinta de la serie con {mismatches} procesos")
+            all_passed = False
+
+        # Un error de aridad en una llamada partida por un corte se reporta igual
+        broken = content + 'local c = Color3_nuevo(\n    1,\n    2,\n    3,\n    4\n)\n' + content
+        reports = []
+        for transpile in (lambda: self.transpiler.transpile_content(broken, 'paralelo.vox'),
+                          lambda: self.transpiler.transpile_parallel(broken, 'paralelo.vox', jobs=3, min_size=0)):
+            try:
+                transpile()
+                reports.append(None)
+            except Exception as e:
+                reports.append((type(e).__name__, str(e)))
+        if reports[0] is not None and reports[0] == reports[1]:
+            self.passed_tests.append("✅ Paralelo: errores idénticos a la transpilación en serie")
+        else:
+            self.errors.append(f"❌ Paralelo: errores distintos de la serie: {reports}")
+            all_passed = False
+
         # 📊 RESULTADOS FINALES
         print("\n" + "=" * 60)
         print("📊 RESULTADOS DE VALIDACIÓN COMPLETA")
@@ -0,0 +1,15 @@
+"""
+Vox Bench - Benchmarks de rendimiento del transpilador Vox
+
+    python -m vox_bench          Suite completa (corpus sintéticos, base JSON)
+    python -m vox_bench.lexer    Analizador léxico frente al divisor por línea
+    python -m vox_bench.arity    Validación de aridad con entradas patológicas
+    python -m vox_bench.startup  Arranque en frío de la CLI y del import
+    python -m vox_bench.incremental  Edición incremental frente al documento completo
+    python -m vox_bench.engines  Comparación de los motores de traducción
+    python -m vox_bench.parallel  Un archivo grande en serie frente a varios procesos
+"""
+
+from vox_bench.corpus import CorpusGenerator, generate_corpus
+
+__all__ = ['CorpusGenerator', 'generate_corpus']
@@ -0,0 +1,5 @@
+import sys
+
+from vox_bench.suite import main
+
+sys.exit(main())
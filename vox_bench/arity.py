@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la validación de aridad con entradas patológicas
+
+Compara las expresiones regulares originales de aridad de Color3 con el
+validador por tokens (ArityValidator) en líneas diseñadas para provocar
+retroceso exponencial, duplicando el tamaño en cada paso. El validador debe
+crecer de forma lineal (el tiempo se duplica con la entrada); las regex
+originales crecen de forma cuadrática o cúbica.
+
+Uso:
+    python -m vox_bench.arity [--inicial 500] [--duplicaciones 6] [--limite 1]
+"""
+
+import argparse
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from transpiler_final import RULES
+
+
+# Validación original de _translate_constructors (solo Color3)
+LEGACY_PATTERNS = (
+    re.compile(r'Color3\.new\(([^,]+,\s*[^,]+,\s*[^,]+,\s*[^)]+)\)'),
+    re.compile(r'Color3_nuevo\(([^,]+,\s*[^,]+,\s*[^,]+,\s*[^)]+)\)'),
+)
+
+# Entradas patológicas de aproximadamente `n` caracteres
+CASES: Dict[str, Callable[[int], str]] = {
+    'espacios': lambda n: 'Color3.new(1, 2, 3,' + ' ' * n,
+    'comas': lambda n: 'Color3.new(1,' + ' ' * (n // 2) + ',' + ' ' * (n // 2) + ',',
+    'repetido': lambda n: 'Color3_nuevo(1, 2, 3, 4' * max(1, n // 23),
+}
+
+
+def legacy_check(code: str) -> bool:
+    """True si las regex originales detectan un Color3 de 4 parámetros"""
+    return any(pattern.search(code) for pattern in LEGACY_PATTERNS)
+
+
+def validator_check(code: str) -> bool:
+    """True si el validador por tokens encuentra algún error de aridad"""
+    return bool(RULES.arity_validator.scan(code, first_only=True))
+
+
+def measure(func: Callable[[str], bool], code: str) -> float:
+    start = time.perf_counter()
+    func(code)
+    return time.perf_counter() - start
+
+
+def _growth(times: List[Optional[float]], index: int) -> str:
+    if index == 0 or times[index] is None or not times[index - 1]:
+        return ""
+    return f"x{times[index] / times[index - 1]:.1f}"
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la validación de aridad con entradas patológicas")
+    parser.add_argument('--inicial', type=int, default=500, help="Tamaño inicial de la línea en caracteres")
+    parser.add_argument('--duplicaciones', type=int, default=6, help="Veces que se duplica el tamaño")
+    parser.add_argument('--limite', type=float, default=1.0,
+                        help="Segundos a partir de los que deja de medirse la regex original")
+    args = parser.parse_args(argv)
+
+    sizes = [args.inicial * 2 ** step for step in range(args.duplicaciones + 1)]
+
+    print("⏱️  BENCHMARK DE VALIDACIÓN DE ARIDAD")
+    print("=" * 72)
+    for name, build in CASES.items():
+        print(f"\n📄 Caso '{name}'")
+        print(f"  {'caracteres':>10} {'regex original':>16} {'':>6} {'validador':>12} {'':>6}")
+        legacy_times: List[Optional[float]] = []
+        validator_times: List[Optional[float]] = []
+        for index, size in enumerate(sizes):
+            code = build(size)
+            previous = legacy_times[-1] if legacy_times else 0.0
+            legacy_times.append(measure(legacy_check, code) if previous is not None and previous < args.limite
+                                else None)
+            validator_times.append(measure(validator_check, code))
+            legacy = f"{legacy_times[-1] * 1000:13.1f} ms" if legacy_times[-1] is not None else f"{'(omitido)':>16}"
+            print(f"  {len(code):>10} {legacy} {_growth(legacy_times, index):>6} "
+                  f"{validator_times[-1] * 1000:9.2f} ms {_growth(validator_times, index):>6}")
+    print("\nAl duplicar la entrada, un coste lineal crece x2; uno cuadrático, x4; uno cúbico, x8.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
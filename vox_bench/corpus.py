@@ -0,0 +1,227 @@
+"""
+Generador de corpus Vox sintéticos
+
+Produce código realista a partir del vocabulario real del transpilador
+(servicios, métodos, propiedades, enums, constructores y palabras clave), con
+strings, comentarios, strings largos y bloques anidados. El resultado es
+determinista para una semilla dada.
+"""
+
+import random
+from typing import List
+
+from transpiler_final import RULES, LuaDSLTranspiler
+
+
+VARIABLES = (
+    'parte', 'jugador', 'boton', 'marco', 'contador', 'personaje', 'modelo',
+    'puerta', 'moneda', 'arma', 'etiqueta', 'sonido_fondo', 'efecto', 'zona',
+)
+
+INSTANCE_TYPES = ('Part', 'Model', 'Frame', 'TextLabel', 'TextButton', 'Sound', 'ParticleEmitter')
+
+COLORS = ('rojo', 'azul', 'verde', 'amarillo', 'negro', 'blanco')
+
+TEXTS = (
+    "Hola mundo", "Puntos: ", "¡Has ganado!", "Cargando datos...", "Error: intenta de nuevo",
+    "Bienvenido al juego", "Nivel completado",
+)
+
+COMMENTS = (
+    "Configuración inicial", "Actualizar la interfaz", "TODO: revisar valores",
+    "Conectar eventos del jugador", "Cálculo de daño", "Guardar progreso",
+)
+
+MAX_DEPTH = 4
+INDENT = "    "
+
+
+class CorpusGenerator:
+    """Genera líneas de código Vox con anidamiento y vocabulario variados"""
+
+    __slots__ = ('random', 'lines', 'services', 'methods', 'properties', 'math', 'enums',
+                 'constructors', 'simple_enums')
+
+    def __init__(self, seed: int = 1):
+        self.random = random.Random(seed)
+        self.lines: List[str] = []
+        self.services = sorted(RULES.services)
+        self.methods = sorted(RULES.methods)
+        self.properties = sorted(RULES.properties)
+        self.math = sorted(RULES.math)
+        self.enums = sorted(key for key in RULES.enums if '.' not in key)
+        self.simple_enums = sorted(RULES.simple_enums)
+        self.constructors = ('Vector3_nuevo', 'Vector2_nuevo', 'Color3_nuevo', 'UDim2_nuevo', 'CFrame_nuevo')
+
+    def generate(self, target_lines: int) -> str:
+        """Genera al menos `target_lines` líneas (se completa el último bloque)"""
+        self.lines = []
+        while len(self.lines) < target_lines:
+            self._top_level()
+        return '\n'.join(self.lines) + '\n'
+
+    # ------------------------------------------------------------------
+
+    def _emit(self, depth: int, text: str) -> None:
+        self.lines.append(INDENT * depth + text)
+
+    def _var(self) -> str:
+        return self.random.choice(VARIABLES)
+
+    def _number(self) -> str:
+        return self.random.choice(('0', '1', '5', '10', '0.5', '100', '2.75'))
+
+    def _value(self) -> str:
+        r = self.random
+        choice = r.randrange(9)
+        if choice == 0:
+            return f'"{r.choice(TEXTS)}"'
+        if choice == 1:
+            return r.choice(('verdadero', 'falso', 'nulo'))
+        if choice == 2:
+            constructor = r.choice(self.constructors)
+            arity = {'UDim2_nuevo': 4, 'Vector2_nuevo': 2}.get(constructor, 3)
+            return f'{constructor}({", ".join(self._number() for _ in range(arity))})'
+        if choice == 3:
+            return r.choice(self.enums)
+        if choice == 4:
+            return f'{r.choice(COLORS)}_brillante'
+        if choice == 5:
+            return f'math.{r.choice(self.math)}({self._number()})'
+        if choice == 6:
+            return f'{self._var()}.{r.choice(self.properties)}'
+        return self._number()
+
+    def _condition(self) -> str:
+        r = self.random
+        return r.choice((
+            f'{self._var()}.{r.choice(self.properties)} > {self._number()}',
+            f'no {self._var()}',
+            f'{self._var()} == nulo',
+            f'{self._var()} y {self._var()}.{r.choice(self.properties)}',
+            'verdadero',
+        ))
+
+    def _top_level(self) -> None:
+        r = self.random
+        choice = r.randrange(6)
+        if choice == 0:
+            service = r.choice(self.services)
+            self._emit(0, f'local {service} = obtener_servicio("{service}")')
+        elif choice == 1:
+            self._emit(0, f'-- {r.choice(COMMENTS)}')
+        elif choice == 2:
+            self._emit(0, '--[[')
+            self._emit(1, r.choice(COMMENTS))
+            self._emit(1, f'si {self._var()} entonces imprimir("comentado") fin')
+            self._emit(0, ']]')
+        elif choice == 3:
+            self._function(0)
+        else:
+            self._block(0)
+        self.lines.append('')
+
+    def _function(self, depth: int) -> None:
+        name = f'{self.random.choice(("actualizar", "crear", "procesar", "calcular"))}_{self._var()}'
+        self._emit(depth, f'local funcion {name}({self._var()}, valor)')
+        for _ in range(self.random.randint(2, 6)):
+            self._statement(depth + 1)
+        self._emit(depth + 1, f'retornar {self._value()}')
+        self._emit(depth, 'fin')
+
+    def _block(self, depth: int) -> None:
+        r = self.random
+        if depth >= MAX_DEPTH:
+            self._statement(depth)
+            return
+        kind = r.randrange(6)
+        body = r.randint(1, 4)
+        if kind == 0:
+            self._emit(depth, f'si {self._condition()} entonces')
+            self._body(depth + 1, body)
+            if r.random() < 0.4:
+                self._emit(depth, f'sino si {self._condition()} entonces')
+                self._body(depth + 1, body)
+            if r.random() < 0.5:
+                self._emit(depth, 'sino')
+                self._body(depth + 1, body)
+            self._emit(depth, 'fin')
+        elif kind == 1:
+            self._emit(depth, f'para i = 1, {self._number()} hacer')
+            self._body(depth + 1, body)
+            self._emit(depth, 'fin')
+        elif kind == 2:
+            self._emit(depth, f'para _, hijo en ipares({self._var()}:obtener_hijos()) hacer')
+            self._body(depth + 1, body)
+            self._emit(depth, 'fin')
+        elif kind == 3:
+            self._emit(depth, f'mientras {self._condition()} hacer')
+            self._body(depth + 1, body)
+            self._emit(depth + 1, 'tarea_espera(0.1)')
+            self._emit(depth, 'fin')
+        elif kind == 4:
+            event = r.choice(('Touched', 'MouseButton1Click', 'Changed', 'Died'))
+            self._emit(depth, f'{self._var()}.{event}:conectar(funcion(otro)')
+            self._body(depth + 1, body)
+            self._emit(depth, 'fin)')
+        else:
+            self._emit(depth, 'repetir')
+            self._body(depth + 1, body)
+            self._emit(depth, f'hasta {self._condition()}')
+
+    def _body(self, depth: int, count: int) -> None:
+        for _ in range(count):
+            if self.random.random() < 0.3:
+                self._block(depth)
+            else:
+                self._statement(depth)
+
+    def _statement(self, depth: int) -> None:
+        r = self.random
+        choice = r.randrange(12)
+        var = self._var()
+        if choice == 0:
+            self._emit(depth, f'local {var} = instancia_nueva("{r.choice(INSTANCE_TYPES)}")')
+        elif choice in (1, 2):
+            self._emit(depth, f'{var}.{r.choice(self.properties)} = {self._value()}')
+        elif choice == 3:
+            self._emit(depth, f'{var}:{r.choice(self.methods)}()')
+        elif choice == 4:
+            self._emit(depth, f'imprimir("{r.choice(TEXTS)}" .. {var}.{r.choice(self.properties)})')
+        elif choice == 5:
+            self._emit(depth, f'-- {r.choice(COMMENTS)}')
+        elif choice == 6:
+            self._emit(depth, f'local info = info_tween({self._number()}, '
+                              f'estilo_suavizado.{r.choice(self.simple_enums)}, direccion_suavizado.Out)')
+        elif choice == 7:
+            self._emit(depth, f'local texto = [[{r.choice(TEXTS)}')
+            self._emit(0, f'{r.choice(TEXTS)} si no fin]]')
+        elif choice == 8:
+            self._emit(depth, f'local total = math.{r.choice(self.math)}({self._number()}) + {self._number()}')
+        elif choice == 9:
+            self._emit(depth, 'tarea_espera(0.1)')
+        elif choice == 10:
+            self._emit(depth, f'si no {var} entonces retornar fin')
+        else:
+            self._emit(depth, f'local {var} = {self._value()}')
+
+
+def generate_corpus(lines: int, seed: int = 1) -> str:
+    """
+    Genera un corpus Vox de al menos `lines` líneas
+
+    Raises:
+        ValueError: Si el corpus contiene palabras prohibidas o errores de
+            aridad (no debería)
+    """
+    source = CorpusGenerator(seed).generate(lines)
+    transpiler = LuaDSLTranspiler()
+    violations = transpiler.find_forbidden_words(source, first_only=True)
+    if violations:
+        line, column, word = violations[0]
+        raise ValueError(f"El corpus generado contiene '{word}' en {line}:{column}")
+    errors = transpiler.find_arity_errors(source, first_only=True)
+    if errors:
+        line, column, message = errors[0]
+        raise ValueError(f"El corpus generado tiene un error de aridad en {line}:{column}: {message}")
+    return source
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark comparativo de los motores de traducción
+
+Transpila el mismo corpus sintético con cada motor (cascade, single_pass y
+ast) y compara tiempo, líneas por segundo y MB por segundo, tomando la mejor
+de varias repeticiones con un transpilador nuevo en cada una (caché de
+líneas fría). Para el motor ast desglosa el análisis (léxico y sintáctico)
+y la generación, y al final comprueba que todos los motores producen una
+salida idéntica byte a byte.
+
+Uso:
+    python -m vox_bench.engines [--lineas 100000] [--repeticiones 3] [--semilla 1]
+                                [--sin-cache]
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List
+
+from transpiler_final import (
+    DEFAULT_LINE_CACHE_SIZE, ENGINE_AST, ENGINE_CASCADE, ENGINES, LuaDSLTranspiler, LuaGenerator, VoxParser,
+)
+
+from vox_bench.corpus import generate_corpus
+
+
+def _best(func: Callable[[], object], repetitions: int) -> float:
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ast_stages(source: str, repetitions: int, cache_size: int) -> Dict[str, float]:
+    """Mejor tiempo de cada etapa del motor ast"""
+    transpiler = LuaDSLTranspiler(engine=ENGINE_AST, line_cache_size=cache_size)
+    stages = {'analisis_lexico': float('inf'), 'analisis_sintactico': float('inf'),
+              'generacion': float('inf')}
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        parser = VoxParser(source)
+        lexed = time.perf_counter()
+        chunk = parser.parse()
+        parsed = time.perf_counter()
+        LuaGenerator(transpiler, parser).generate(chunk)
+        generated = time.perf_counter()
+        stages['analisis_lexico'] = min(stages['analisis_lexico'], lexed - start)
+        stages['analisis_sintactico'] = min(stages['analisis_sintactico'], parsed - lexed)
+        stages['generacion'] = min(stages['generacion'], generated - parsed)
+    return stages
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Comparación de los motores de traducción de Vox")
+    parser.add_argument('--lineas', type=int, default=100000, help="Líneas del corpus")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Ejecuciones por motor (se toma la mejor)")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla del generador de corpus")
+    parser.add_argument('--sin-cache', action='store_true', help="Desactivar la caché de líneas traducidas")
+    args = parser.parse_args(argv)
+
+    cache_size = 0 if args.sin_cache else DEFAULT_LINE_CACHE_SIZE
+    source = generate_corpus(args.lineas, args.semilla)
+    lines = source.count('\n')
+    megabytes = len(source.encode('utf-8')) / (1024 * 1024)
+
+    print("⏱️  COMPARACIÓN DE MOTORES")
+    print("=" * 72)
+    print(f"📄 Corpus: {lines} líneas, {megabytes:.2f} MB, semilla {args.semilla}, "
+          f"caché de líneas {'desactivada' if args.sin_cache else 'activada'}\n")
+    print(f"  {'motor':<14} {'tiempo':>12} {'líneas/s':>14} {'MB/s':>8} {'frente a cascade':>18}")
+
+    outputs = {}
+    times = {}
+    for engine in ENGINES:
+        outputs[engine] = LuaDSLTranspiler(engine=engine, line_cache_size=cache_size).transpile_content(source)
+        times[engine] = _best(
+            lambda: LuaDSLTranspiler(engine=engine, line_cache_size=cache_size).transpile_content(source),
+            args.repeticiones)
+    for engine in ENGINES:
+        seconds = times[engine]
+        print(f"  {engine:<14} {seconds * 1000:9.1f} ms {lines / seconds:14,.0f} {megabytes / seconds:8.2f} "
+              f"{times[ENGINE_CASCADE] / seconds:17.2f}x")
+
+    print(f"\n  Etapas del motor {ENGINE_AST}:")
+    for stage, seconds in ast_stages(source, args.repeticiones, cache_size).items():
+        print(f"    {stage:<22} {seconds * 1000:9.1f} ms")
+
+    different = [engine for engine in ENGINES if outputs[engine] != outputs[ENGINE_CASCADE]]
+    if different:
+        print(f"\n❌ Salida distinta de la cascada: {', '.join(different)}")
+        return 1
+    print("\n✅ Salida idéntica byte a byte en todos los motores")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
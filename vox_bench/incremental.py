@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la edición incremental de documentos
+
+Simula pulsaciones de teclado en posiciones aleatorias de un corpus sintético
+y compara el coste de actualizar la salida Lua y los diagnósticos con
+IncrementalDocument frente a volver a transpilar y diagnosticar el documento
+completo (transpile_content + check_content). Al final comprueba que ambos
+resultados coinciden.
+
+Uso:
+    python -m vox_bench.incremental [--lineas 20000] [--ediciones 200] [--semilla 1]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from transpiler_final import ENGINE_SINGLE_PASS, IncrementalDocument, LuaDSLTranspiler
+
+from vox_bench.corpus import generate_corpus
+
+
+# Texto insertado en cada edición: una letra, una línea nueva y la apertura
+# de un comentario largo (que obliga a volver a analizar hasta su cierre)
+EDITS = ('x', 'imprimir("hola")\n', '--[[')
+
+
+def _milliseconds(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la edición incremental de documentos Vox")
+    parser.add_argument('--lineas', type=int, default=20000, help="Líneas del documento")
+    parser.add_argument('--ediciones', type=int, default=200, help="Ediciones por tipo de texto insertado")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla del corpus y de las posiciones")
+    args = parser.parse_args(argv)
+
+    transpiler = LuaDSLTranspiler(engine=ENGINE_SINGLE_PASS)
+    source = generate_corpus(args.lineas, args.semilla)
+    rng = random.Random(args.semilla)
+
+    print("⏱️  BENCHMARK DE EDICIÓN INCREMENTAL")
+    print("=" * 72)
+    document = IncrementalDocument(transpiler)
+    opened = _milliseconds(lambda: document.replace(0, 0, source))
+    full = _milliseconds(lambda: (transpiler.transpile_content(source), transpiler.check_content(source)))
+    print(f"📄 {source.count(chr(10))} líneas, {len(source) / 1024:.0f} KB")
+    print(f"  {'abrir el documento':<36} {opened:9.1f} ms")
+    print(f"  {'documento completo (referencia)':<36} {full:9.1f} ms\n")
+
+    print(f"  {'edición':<22} {'mediana':>10} {'p95':>10} {'líneas/edición':>16} {'aceleración':>12}")
+    for text in EDITS:
+        times = []
+        lines = []
+        for _ in range(args.ediciones):
+            pos = document.offset(rng.randrange(1, args.lineas), 1)
+
+            def edit():
+                document.replace(pos, pos, text)
+                return document.lua, document.diagnostics
+
+            times.append(_milliseconds(edit))
+            lines.append(document.retranslated_lines)
+            # Deshacer para que el documento no crezca ni acumule comentarios abiertos
+            document.replace(pos, pos + len(text), "")
+        times.sort()
+        median = statistics.median(times)
+        p95 = times[int(len(times) * 0.95) - 1]
+        label = repr(text)[:22]
+        print(f"  {label:<22} {median:7.2f} ms {p95:7.2f} ms {statistics.mean(lines):16.1f} "
+              f"{full / median:11.0f}x")
+
+    lua = transpiler.transpile_content(document.text)
+    same = lua == document.lua and len(transpiler.check_content(document.text)) == len(document.diagnostics)
+    print(f"\n{'✅' if same else '❌'} Salida y diagnósticos idénticos a los del documento completo")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark del analizador léxico
+
+Compara el divisor por línea original (_extract_strings) con el analizador
+léxico de archivo completo (tokenize) sobre el mismo corpus.
+
+Uso:
+    python -m vox_bench.lexer [--archivo ARCHIVO] [--repeticiones N] [--lineas N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+from transpiler_final import tokenize
+
+
+def legacy_extract_strings(line: str) -> List[Dict]:
+    """
+    Divisor original por línea: extrae strings y devuelve partes con tipos
+    
+    Copia de referencia del antiguo LuaDSLTranspiler._extract_strings.
+    """
+    parts = []
+    current_pos = 0
+    in_string = False
+    string_char = None
+    string_start = 0
+    
+    i = 0
+    while i < len(line):
+        char = line[i]
+        
+        if not in_string and char in ['"', "'"]:
+            in_string = True
+            string_char = char
+            string_start = i
+            i += 1
+        elif in_string and char == string_char:
+            # Verificar que no esté escapado
+            if i == 0 or line[i-1] != '\\':
+                if current_pos < string_start:
+                    parts.append({
+                        'type': 'code',
+                        'content': line[current_pos:string_start]
+                    })
+                
+                parts.append({
+                    'type': 'string',
+                    'content': line[string_start:i+1]
+                })
+                
+                in_string = False
+                string_char = None
+                current_pos = i + 1
+                i += 1
+            else:
+                i += 1
+        else:
+            i += 1
+    
+    if current_pos < len(line):
+        parts.append({
+            'type': 'code',
+            'content': line[current_pos:]
+        })
+    
+    return parts
+
+
+def split_legacy(source: str) -> int:
+    """Divide el archivo línea por línea con el divisor original"""
+    count = 0
+    for line in source.split('\n'):
+        count += len(legacy_extract_strings(line))
+    return count
+
+
+def split_tokenize(source: str) -> int:
+    """Divide el archivo completo con el analizador léxico"""
+    count = 0
+    for _ in tokenize(source):
+        count += 1
+    return count
+
+
+def default_corpus() -> str:
+    """Bloques ```vox de DOCUMENTATION.md"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DOCUMENTATION.md')
+    with open(path, 'r', encoding='utf-8') as f:
+        blocks = re.findall(r'```vox\n(.*?)```', f.read(), re.DOTALL)
+    return '\n'.join(blocks)
+
+
+def measure(func: Callable[[str], int], source: str, repetitions: int) -> float:
+    """Mejor tiempo (segundos) de `repetitions` ejecuciones"""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func(source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del analizador léxico de Vox")
+    parser.add_argument('--archivo', help="Archivo .vox a usar como corpus (por defecto, ejemplos de DOCUMENTATION.md)")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Ejecuciones por divisor (se toma la mejor)")
+    parser.add_argument('--lineas', type=int, default=100000, help="Líneas aproximadas del corpus")
+    args = parser.parse_args(argv)
+    
+    if args.archivo:
+        with open(args.archivo, 'r', encoding='utf-8') as f:
+            base = f.read()
+    else:
+        base = default_corpus()
+    
+    base_lines = max(1, base.count('\n') + 1)
+    source = '\n'.join([base] * max(1, args.lineas // base_lines))
+    size_mb = len(source.encode('utf-8')) / (1024 * 1024)
+    lines = source.count('\n') + 1
+    
+    print("⏱️  BENCHMARK DEL ANALIZADOR LÉXICO")
+    print("=" * 50)
+    print(f"Corpus: {lines} líneas, {size_mb:.2f} MB")
+    
+    results = {}
+    for name, func in (("divisor por línea", split_legacy), ("tokenize", split_tokenize)):
+        elapsed = measure(func, source, args.repeticiones)
+        results[name] = elapsed
+        print(f"{name:<20} {elapsed * 1000:9.1f} ms  {lines / elapsed:12,.0f} líneas/s  {size_mb / elapsed:8.2f} MB/s")
+    
+    speedup = results["divisor por línea"] / results["tokenize"]
+    print(f"\n🚀 Aceleración: {speedup:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
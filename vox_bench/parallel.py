@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la transpilación en paralelo de un solo archivo
+
+Transpila un corpus sintético grande en serie (transpile_content) y
+repartido entre distintos números de procesos (transpile_parallel), toma la
+mejor de varias repeticiones y comprueba que la salida es idéntica byte a
+byte a la de la ejecución en serie.
+
+Uso:
+    python -m vox_bench.parallel [--lineas 300000] [--trabajos 2,4,8] [--repeticiones 3]
+                                 [--motor single_pass] [--semilla 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List
+
+from transpiler_final import ENGINE_SINGLE_PASS, ENGINES, LuaDSLTranspiler
+
+from vox_bench.corpus import generate_corpus
+
+
+def _best(func: Callable[[], str], repetitions: int) -> float:
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la transpilación en paralelo de un archivo Vox")
+    parser.add_argument('--lineas', type=int, default=300000, help="Líneas del archivo")
+    parser.add_argument('--trabajos', default="2,4,8", help="Números de procesos separados por comas")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Ejecuciones por medida (se toma la mejor)")
+    parser.add_argument('--motor', choices=ENGINES, default=ENGINE_SINGLE_PASS, help="Motor de traducción")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla del generador de corpus")
+    args = parser.parse_args(argv)
+
+    jobs_list = [int(jobs) for jobs in args.trabajos.split(',')]
+    source = generate_corpus(args.lineas, args.semilla)
+    megabytes = len(source.encode('utf-8')) / (1024 * 1024)
+    transpiler = LuaDSLTranspiler(engine=args.motor)
+
+    print("⏱️  BENCHMARK DE TRANSPILACIÓN EN PARALELO")
+    print("=" * 60)
+    print(f"📄 {args.lineas} líneas, {megabytes:.2f} MB, motor {args.motor}, "
+          f"{os.cpu_count()} núcleo(s)\n")
+
+    expected = transpiler.transpile_content(source)
+    # Transpilador nuevo en cada repetición: los procesos de trabajo también
+    # empiezan con la caché de líneas vacía
+    serial = _best(lambda: LuaDSLTranspiler(engine=args.motor).transpile_content(source), args.repeticiones)
+    print(f"  {'procesos':<10} {'tiempo':>12} {'MB/s':>8} {'aceleración':>12}")
+    print(f"  {'serie':<10} {serial * 1000:9.1f} ms {megabytes / serial:8.2f} {1:11.2f}x")
+
+    same = True
+    for jobs in jobs_list:
+        output = transpiler.transpile_parallel(source, jobs=jobs, min_size=0)
+        same = same and output == expected
+        seconds = _best(lambda: transpiler.transpile_parallel(source, jobs=jobs, min_size=0), args.repeticiones)
+        print(f"  {jobs:<10} {seconds * 1000:9.1f} ms {megabytes / seconds:8.2f} {serial / seconds:11.2f}x")
+
+    print(f"\n{'✅' if same else '❌'} Salida idéntica byte a byte a la ejecución en serie")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
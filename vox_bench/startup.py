@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío
+
+Mide, en procesos nuevos, el tiempo desde el inicio del intérprete hasta la
+primera línea de salida de la CLI con un archivo pequeño, y el de importar
+el transpilador, frente al de un intérprete vacío.
+
+Uso:
+    python -m vox_bench.startup [--repeticiones 20] [--objetivo 50] [--importtime 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+
+SMALL_FILE = '''local jugadores = obtener_servicio("Players")
+
+local funcion saludar(jugador)
+    imprimir("Hola " .. jugador.Name)
+fin
+
+jugadores.PlayerAdded:conectar(saludar)
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def time_to_first_output(command: List[str], env: Dict[str, str]) -> float:
+    """Segundos desde el lanzamiento hasta la primera línea en stdout"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, cwd=ROOT)
+    process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return elapsed
+
+
+def median_ms(command: List[str], env: Dict[str, str], repetitions: int) -> float:
+    return statistics.median(time_to_first_output(command, env) for _ in range(repetitions)) * 1000
+
+
+def import_profile(env: Dict[str, str], top: int) -> List[str]:
+    """Módulos con más tiempo acumulado según -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import transpiler_final'],
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return [f"{cumulative / 1000:8.1f} ms {name}" for cumulative, name in rows[:top]]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío del transpilador Vox")
+    parser.add_argument('--repeticiones', type=int, default=20, help="Procesos por medida (se toma la mediana)")
+    parser.add_argument('--objetivo', type=float, default=50.0,
+                        help="Objetivo en ms para el arranque de la CLI por encima del intérprete")
+    parser.add_argument('--importtime', type=int, default=0, metavar="N",
+                        help="Mostrar los N módulos más lentos de importar")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'pequeno.vox')
+        output = os.path.join(directory, 'pequeno.lua')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(SMALL_FILE)
+
+        env = _environment()
+        cli = [sys.executable, '-m', 'transpiler_final', source, output]
+        importer = [sys.executable, '-c', 'import transpiler_final; print()']
+
+        # Primera ejecución: crea los .pyc, si se pueden escribir
+        cold = time_to_first_output(cli, env) * 1000
+
+        bare = median_ms([sys.executable, '-c', 'print()'], env, args.repeticiones)
+        results = [
+            ("intérprete (python -c)", bare),
+            ("import transpiler_final", median_ms(importer, env, args.repeticiones)),
+            ("CLI", median_ms(cli, env, args.repeticiones)),
+        ]
+
+        print("⏱️  BENCHMARK DE ARRANQUE")
+        print("=" * 60)
+        print(f"Mediana de {args.repeticiones} procesos hasta la primera línea de salida\n")
+        print(f"  {'primera ejecución':<40} {cold:8.1f} ms")
+        for label, ms in results:
+            extra = f"(+{ms - bare:.1f})" if label != results[0][0] else ""
+            print(f"  {label:<40} {ms:8.1f} ms {extra}")
+
+        overhead = results[-1][1] - bare
+        mark = "✅" if overhead <= args.objetivo else "⚠️ "
+        print(f"\n{mark} CLI: {overhead:.1f} ms por encima del intérprete (objetivo {args.objetivo:.0f} ms)")
+
+        if args.importtime:
+            print("\nMódulos más lentos de importar (acumulado):")
+            for line in import_profile(env, args.importtime):
+                print(f"  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
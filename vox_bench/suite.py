@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks del transpilador
+
+Mide transpile_content de extremo a extremo y cada pasada _translate_* por
+separado sobre corpus sintéticos, y compara con una línea base guardada.
+
+Uso:
+    python -m vox_bench [--lineas 1000,10000,100000] [--repeticiones N]
+                        [--motor cascade|single_pass|ast] [--json RESULTADO.json]
+                        [--guardar-base BASE.json] [--comparar BASE.json --umbral 10]
+
+Sale con código 1 si alguna métrica empeora más que el umbral respecto a la base,
+y con código 2 (sin medir) si la base se midió con otro motor, otra semilla u
+otro número de repeticiones. Una base de otra versión solo produce un aviso.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from transpiler_final import (
+    ENGINE_CASCADE, ENGINES, TRANSPILER_VERSION, LuaDSLTranspiler, TokenKind, tokenize,
+)
+from vox_bench.corpus import generate_corpus
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 10.0  # Porcentaje de empeoramiento tolerado
+
+# Campos de la cabecera que deben coincidir con la base para poder comparar; la
+# versión puede cambiar (es lo que se compara), pero se avisa
+COMPARABLE_FIELDS = ('motor', 'semilla', 'repeticiones')
+
+# Pasadas de la cascada en orden de ejecución
+PASSES = (
+    '_translate_services', '_translate_methods', '_translate_constructors',
+    '_translate_properties', '_translate_enums', '_translate_keywords',
+)
+
+
+def _best_time(func, repetitions: int) -> float:
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _rates(seconds: float, lines: int, size: int) -> Dict[str, float]:
+    return {
+        'segundos': round(seconds, 6),
+        'lineas_s': round(lines / seconds, 1) if seconds else 0.0,
+        'mb_s': round(size / (1024 * 1024) / seconds, 3) if seconds else 0.0,
+    }
+
+
+def bench_corpus(source: str, repetitions: int, engine: str = ENGINE_CASCADE) -> Dict:
+    """
+    Mide un corpus: extremo a extremo, por pasada y memoria pico
+
+    Cada repetición de transpile_content usa un transpilador nuevo (caché de
+    líneas vacía). Las pasadas se miden sobre los fragmentos de código del
+    corpus, alimentando cada una con la salida de la anterior.
+    """
+    lines = source.count('\n') + 1
+    size = len(source.encode('utf-8'))
+
+    seconds = _best_time(lambda: LuaDSLTranspiler(engine=engine).transpile_content(source), repetitions)
+    result = {
+        'lineas': lines,
+        'bytes': size,
+        'transpile_content': _rates(seconds, lines, size),
+    }
+
+    tracemalloc.start()
+    try:
+        LuaDSLTranspiler(engine=engine).transpile_content(source)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result['memoria_pico_mb'] = round(peak / (1024 * 1024), 3)
+
+    fragments = [source[token.start:token.end] for token in tokenize(source)
+                 if token.kind is TokenKind.CODE and source[token.start:token.end].strip()]
+    transpiler = LuaDSLTranspiler(line_cache_size=0)
+    passes = {}
+    for name in PASSES:
+        translate = getattr(transpiler, name)
+        outputs: List[str] = []
+
+        def run_pass():
+            outputs[:] = [translate(fragment) for fragment in fragments]
+
+        pass_seconds = _best_time(run_pass, repetitions)
+        passes[name] = _rates(pass_seconds, lines, size)
+        passes[name]['fragmentos'] = len(fragments)
+        fragments = outputs
+    result['pasadas'] = passes
+    return result
+
+
+def run_suite(sizes, repetitions: int, engine: str, seed: int) -> Dict:
+    """Ejecuta la suite para cada tamaño de corpus"""
+    report = {
+        'version': TRANSPILER_VERSION,
+        'motor': engine,
+        'semilla': seed,
+        'repeticiones': repetitions,
+        'corpus': {},
+    }
+    for target in sizes:
+        source = generate_corpus(target, seed)
+        report['corpus'][str(target)] = bench_corpus(source, repetitions, engine)
+    return report
+
+
+def header_mismatches(header: Dict, baseline: Dict, fields=COMPARABLE_FIELDS) -> List[str]:
+    """Campos de la cabecera cuyo valor difiere del de la base, como 'campo: base -> actual'"""
+    return [f"{field}: {baseline.get(field)!r} -> {header.get(field)!r}"
+            for field in fields if baseline.get(field) != header.get(field)]
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara tiempos y memoria con la base
+
+    Returns:
+        Descripción de cada métrica que empeora más de `threshold` por ciento
+    """
+    regressions = []
+    limit = 1 + threshold / 100
+
+    def check(label: str, now: Optional[float], before: Optional[float]) -> None:
+        if now is None or not before:
+            return
+        if now > before * limit:
+            regressions.append(f"{label}: {before:.4f} -> {now:.4f} (+{(now / before - 1) * 100:.1f}%)")
+
+    for size, base in baseline.get('corpus', {}).items():
+        now = current['corpus'].get(size)
+        if now is None:
+            continue
+        check(f"[{size}] transpile_content (s)", now['transpile_content']['segundos'],
+              base.get('transpile_content', {}).get('segundos'))
+        check(f"[{size}] memoria pico (MB)", now.get('memoria_pico_mb'), base.get('memoria_pico_mb'))
+        for name, values in base.get('pasadas', {}).items():
+            check(f"[{size}] {name} (s)", now['pasadas'].get(name, {}).get('segundos'), values.get('segundos'))
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    print("⏱️  BENCHMARK DEL TRANSPILADOR")
+    print("=" * 72)
+    print(f"Versión {report['version']}, motor {report['motor']}, semilla {report['semilla']}")
+    for size, result in report['corpus'].items():
+        total = result['transpile_content']
+        print(f"\n📄 Corpus {size}: {result['lineas']} líneas, {result['bytes'] / (1024 * 1024):.2f} MB, "
+              f"memoria pico {result['memoria_pico_mb']:.1f} MB")
+        print(f"  {'transpile_content':<24} {total['segundos'] * 1000:10.1f} ms "
+              f"{total['lineas_s']:12,.0f} líneas/s {total['mb_s']:8.2f} MB/s")
+        for name, values in result['pasadas'].items():
+            print(f"  {name:<24} {values['segundos'] * 1000:10.1f} ms "
+                  f"{values['lineas_s']:12,.0f} líneas/s {values['mb_s']:8.2f} MB/s")
+
+
+def _parse_sizes(text: str) -> List[int]:
+    try:
+        sizes = [int(part) for part in text.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("--lineas espera enteros separados por comas")
+    if not sizes or any(size < 1 for size in sizes):
+        raise argparse.ArgumentTypeError("--lineas espera enteros positivos")
+    return sizes
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del transpilador Vox")
+    parser.add_argument('--lineas', type=_parse_sizes, default=list(DEFAULT_SIZES),
+                        help="Tamaños de corpus en líneas, separados por comas (de 1000 a 1000000)")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Ejecuciones por medida (se toma la mejor)")
+    parser.add_argument('--motor', choices=ENGINES, default=ENGINE_CASCADE, help="Motor de traducción")
+    parser.add_argument('--semilla', type=int, default=1, help="Semilla del generador de corpus")
+    parser.add_argument('--json', help="Guardar el resultado en este archivo")
+    parser.add_argument('--guardar-base', help="Guardar el resultado como línea base")
+    parser.add_argument('--comparar', help="Comparar con una línea base guardada")
+    parser.add_argument('--umbral', type=float, default=DEFAULT_THRESHOLD,
+                        help="Porcentaje de empeoramiento tolerado al comparar")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        header = {'version': TRANSPILER_VERSION, 'motor': args.motor, 'semilla': args.semilla,
+                  'repeticiones': args.repeticiones}
+        mismatches = header_mismatches(header, baseline)
+        if mismatches:
+            print(f"❌ La base {args.comparar} no es comparable con esta ejecución:")
+            for line in mismatches:
+                print(f"  {line}")
+            return 2
+        for line in header_mismatches(header, baseline, ('version',)):
+            print(f"⚠️  La base {args.comparar} es de otra versión ({line})")
+
+    report = run_suite(args.lineas, args.repeticiones, args.motor, args.semilla)
+    print_report(report)
+
+    for path in (args.json, args.guardar_base):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.umbral)
+        if regressions:
+            print(f"\n❌ Regresiones por encima del {args.umbral:.0f}%:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ Sin regresiones por encima del {args.umbral:.0f}% respecto a {args.comparar}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
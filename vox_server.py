@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Servidor de lenguaje Vox - JSON-RPC por stdio compatible con LSP
+Mantiene el transpilador residente para la extensión de VS Code
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import BinaryIO, Dict, List, Optional
+
+from transpiler_final import (
+    ENGINE_SINGLE_PASS, IncrementalDocument, LuaDSLTranspiler,
+)
+
+
+# Códigos de error JSON-RPC / LSP
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+REQUEST_CANCELLED = -32800
+CONTENT_MODIFIED = -32801
+
+# Sincronización de documentos (TextDocumentSyncKind)
+SYNC_INCREMENTAL = 2
+
+# Severidad de diagnósticos (DiagnosticSeverity)
+SEVERITY_ERROR = 1
+
+# Tipo de window/logMessage (MessageType)
+MESSAGE_ERROR = 1
+
+
+class Document:
+    """
+    Documento abierto en el editor
+
+    Los cambios por rango solo vuelven a traducir las líneas afectadas
+    (IncrementalDocument), que guarda la salida Lua y los diagnósticos.
+    """
+
+    __slots__ = ('uri', 'source', 'version')
+
+    def __init__(self, uri: str, text: str, version: int = 0,
+                 transpiler: Optional[LuaDSLTranspiler] = None):
+        self.uri = uri
+        self.source = IncrementalDocument(transpiler or LuaDSLTranspiler(engine=ENGINE_SINGLE_PASS), text)
+        self.version = version
+
+    @property
+    def text(self) -> str:
+        return self.source.text
+
+    def apply_change(self, change: Dict) -> None:
+        """Aplica un cambio de textDocument/didChange (completo o por rango)"""
+        if 'range' not in change:
+            self.source.replace(0, len(self.text), change['text'])
+            return
+        start = _offset_at(self.text, change['range']['start'])
+        end = _offset_at(self.text, change['range']['end'])
+        self.source.replace(start, end, change['text'])
+
+
+def _offset_at(text: str, position: Dict) -> int:
+    """Convierte una posición LSP (línea, carácter UTF-16) en un índice de `text`"""
+    start = 0
+    for _ in range(position['line']):
+        newline = text.find('\n', start)
+        if newline < 0:
+            return len(text)
+        start = newline + 1
+    end = text.find('\n', start)
+    if end < 0:
+        end = len(text)
+
+    units = 0
+    index = start
+    character = position['character']
+    while index < end and units < character:
+        units += 2 if ord(text[index]) > 0xFFFF else 1
+        index += 1
+    return index
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode('utf-16-le')) // 2
+
+
+class LanguageServer:
+    """
+    Servidor JSON-RPC por stdio (mensajes con cabecera Content-Length)
+
+    Un hilo lector encola los mensajes entrantes; el bucle principal procesa
+    en cada vuelta todos los que ya han llegado. Así los cambios de un mismo
+    documento se agrupan (solo se diagnostica la última versión) y las
+    peticiones canceladas con $/cancelRequest se descartan sin procesarlas.
+
+    Un fallo inesperado de un manejador no detiene el servidor: las
+    peticiones reciben InternalError y las notificaciones se registran con
+    window/logMessage. Con el trace del cliente activo (`trace` en initialize
+    o $/setTrace), cada publicación de diagnósticos envía su tiempo con
+    $/logTrace.
+
+    Métodos:
+        initialize, initialized, shutdown, exit, $/setTrace
+        textDocument/didOpen, didChange, didSave, didClose
+            -> textDocument/publishDiagnostics
+        vox/transpile {textDocument: {uri}, version?} -> {lua, diagnostics, version}
+        vox/validate {textDocument: {uri}} -> {diagnostics, version}
+    """
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self.reader = reader
+        self.writer = writer
+        self.transpiler = LuaDSLTranspiler(engine=ENGINE_SINGLE_PASS)
+        self.documents: Dict[str, Document] = {}
+        self.initialized = False
+        self.shutdown_requested = False
+        self.trace = 'off'
+        self._incoming: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._write_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Transporte
+    # ------------------------------------------------------------------
+
+    def read_message(self) -> Optional[Dict]:
+        """Lee un mensaje; None al cerrarse la entrada"""
+        length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode('ascii').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value.strip())
+        if length is None:
+            return {}
+        body = self.reader.read(length)
+        try:
+            message = json.loads(body.decode('utf-8'))
+        except ValueError:
+            self.respond(None, error={'code': PARSE_ERROR, 'message': "JSON inválido"})
+            return {}
+        return message if isinstance(message, dict) else {}
+
+    def send(self, message: Dict) -> None:
+        message['jsonrpc'] = "2.0"
+        body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+        with self._write_lock:
+            self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+            self.writer.flush()
+
+    def respond(self, request_id, result=None, error: Optional[Dict] = None) -> None:
+        if error is not None:
+            self.send({'id': request_id, 'error': error})
+        else:
+            self.send({'id': request_id, 'result': result})
+
+    def notify(self, method: str, params: Dict) -> None:
+        self.send({'method': method, 'params': params})
+
+    def log_error(self, message: str) -> None:
+        self.notify('window/logMessage', {'type': MESSAGE_ERROR, 'message': message})
+
+    def _read_loop(self) -> None:
+        while True:
+            message = self.read_message()
+            self._incoming.put(message)
+            if message is None:
+                return
+
+    # ------------------------------------------------------------------
+    # Bucle principal
+    # ------------------------------------------------------------------
+
+    def serve(self) -> int:
+        """
+        Atiende mensajes hasta recibir exit o cerrarse la entrada
+
+        Returns:
+            Código de salida (0 si hubo shutdown antes de exit)
+        """
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        while True:
+            batch = [self._incoming.get()]
+            while True:
+                try:
+                    batch.append(self._incoming.get_nowait())
+                except queue.Empty:
+                    break
+
+            cancelled = {message['params'].get('id') for message in batch
+                         if message and message.get('method') == '$/cancelRequest'
+                         and isinstance(message.get('params'), dict)}
+            dirty: List[str] = []
+
+            for message in batch:
+                if message is None:
+                    return 0 if self.shutdown_requested else 1
+                if message.get('method') == 'exit':
+                    return 0 if self.shutdown_requested else 1
+                if 'id' in message and message['id'] in cancelled:
+                    self.respond(message['id'], error={'code': REQUEST_CANCELLED,
+                                                       'message': "Petición cancelada"})
+                    continue
+                uri = self.dispatch(message)
+                if uri is not None and uri not in dirty:
+                    dirty.append(uri)
+
+            # Diagnósticos solo de la última versión de cada documento
+            for uri in dirty:
+                if uri in self.documents:
+                    try:
+                        self.publish_diagnostics(self.documents[uri])
+                    except Exception as e:
+                        self.log_error(f"Error interno al diagnosticar {uri}: {type(e).__name__}: {e}")
+
+    def dispatch(self, message: Dict) -> Optional[str]:
+        """
+        Procesa un mensaje
+
+        Returns:
+            URI del documento modificado, si el mensaje cambió alguno
+        """
+        method = message.get('method')
+        request_id = message.get('id')
+        params = message.get('params') or {}
+        is_request = 'id' in message
+
+        if method is None:
+            if is_request:
+                self.respond(request_id, error={'code': INVALID_REQUEST, 'message': "Falta 'method'"})
+            return None
+
+        if not self.initialized and method != 'initialize':
+            if is_request:
+                self.respond(request_id, error={'code': SERVER_NOT_INITIALIZED,
+                                                'message': "Servidor no inicializado"})
+            return None
+
+        handler = self._handlers().get(method)
+        if handler is None:
+            if is_request and not method.startswith('$/'):
+                self.respond(request_id, error={'code': METHOD_NOT_FOUND,
+                                                'message': f"Método desconocido: {method}"})
+            return None
+
+        try:
+            result, uri = handler(params)
+        except (KeyError, TypeError, ValueError) as e:
+            if is_request:
+                self.respond(request_id, error={'code': INVALID_PARAMS,
+                                                'message': f"Parámetros inválidos: {e}"})
+            return None
+        except _RequestError as e:
+            self.respond(request_id, error={'code': e.code, 'message': str(e)})
+            return None
+        except Exception as e:
+            # RecursionError, IndexError de un rango inválido, DSLError...: el
+            # servidor sigue atendiendo
+            message = f"Error interno en {method}: {type(e).__name__}: {e}"
+            if is_request:
+                self.respond(request_id, error={'code': INTERNAL_ERROR, 'message': message})
+            else:
+                self.log_error(message)
+            return None
+
+        if is_request:
+            self.respond(request_id, result)
+        return uri
+
+    def _handlers(self) -> Dict:
+        return {
+            'initialize': self.on_initialize,
+            'initialized': lambda params: (None, None),
+            '$/setTrace': self.on_set_trace,
+            'shutdown': self.on_shutdown,
+            'textDocument/didOpen': self.on_did_open,
+            'textDocument/didChange': self.on_did_change,
+            'textDocument/didSave': lambda params: (None, params['textDocument']['uri']),
+            'textDocument/didClose': self.on_did_close,
+            'vox/transpile': self.on_transpile,
+            'vox/validate': self.on_validate,
+        }
+
+    # ------------------------------------------------------------------
+    # Manejadores
+    # ------------------------------------------------------------------
+
+    def on_initialize(self, params: Dict):
+        self.initialized = True
+        self.trace = params.get('trace') or 'off'
+        capabilities = {
+            'textDocumentSync': {'openClose': True, 'change': SYNC_INCREMENTAL, 'save': True},
+        }
+        return {'capabilities': capabilities, 'serverInfo': {'name': "vox"}}, None
+
+    def on_set_trace(self, params: Dict):
+        self.trace = params['value']
+        return None, None
+
+    def on_shutdown(self, params: Dict):
+        self.shutdown_requested = True
+        return None, None
+
+    def on_did_open(self, params: Dict):
+        item = params['textDocument']
+        self.documents[item['uri']] = Document(item['uri'], item['text'], item.get('version', 0),
+                                               self.transpiler)
+        return None, item['uri']
+
+    def on_did_change(self, params: Dict):
+        identifier = params['textDocument']
+        document = self.documents[identifier['uri']]
+        for change in params['contentChanges']:
+            document.apply_change(change)
+        document.version = identifier.get('version', document.version + 1)
+        return None, document.uri
+
+    def on_did_close(self, params: Dict):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+        return None, None
+
+    def on_transpile(self, params: Dict):
+        document = self._document_for(params)
+        diagnostics = self.diagnostics(document)
+        lua = document.source.lua if not diagnostics else None
+        return {'lua': lua, 'diagnostics': diagnostics, 'version': document.version}, None
+
+    def on_validate(self, params: Dict):
+        document = self._document_for(params)
+        return {'diagnostics': self.diagnostics(document), 'version': document.version}, None
+
+    def _document_for(self, params: Dict) -> Document:
+        uri = params['textDocument']['uri']
+        document = self.documents.get(uri)
+        if document is None:
+            raise _RequestError(INVALID_PARAMS, f"Documento no abierto: {uri}")
+        version = params.get('version')
+        if version is not None and version != document.version:
+            # La petición corresponde a una versión ya sustituida
+            raise _RequestError(CONTENT_MODIFIED, "El documento ha cambiado")
+        return document
+
+    # ------------------------------------------------------------------
+    # Diagnósticos
+    # ------------------------------------------------------------------
+
+    def diagnostics(self, document: Document) -> List[Dict]:
+        """Diagnósticos LSP del documento (posiciones en base 0, UTF-16)"""
+        lines = None
+        diagnostics = []
+        for d in document.source.diagnostics:
+            if lines is None:
+                lines = document.text.split('\n')
+            line = lines[d.line - 1] if 0 < d.line <= len(lines) else ""
+            start = _utf16_length(line[:d.column - 1])
+            end = start + _utf16_length(line[d.column - 1:d.column - 1 + d.length])
+            diagnostics.append(_diagnostic(max(d.line - 1, 0), start, max(end, start + 1),
+                                           d.error_type.value, d.message))
+        return diagnostics
+
+    def publish_diagnostics(self, document: Document) -> None:
+        start = time.perf_counter()
+        diagnostics = self.diagnostics(document)
+        self.notify('textDocument/publishDiagnostics', {
+            'uri': document.uri,
+            'version': document.version,
+            'diagnostics': diagnostics,
+        })
+        if self.trace != 'off':
+            elapsed = (time.perf_counter() - start) * 1000
+            self.notify('$/logTrace', {
+                'message': f"Diagnósticos de {document.uri} (v{document.version}) en {elapsed:.1f} ms",
+            })
+
+
+class _RequestError(Exception):
+    """Error de una petición con código JSON-RPC"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _diagnostic(line: int, start: int, end: int, code: str, message: str) -> Dict:
+    return {
+        'range': {'start': {'line': line, 'character': start},
+                  'end': {'line': line, 'character': end}},
+        'severity': SEVERITY_ERROR,
+        'source': "vox",
+        'code': code,
+        'message': message,
+    }
+
+
+def main() -> int:
+    """
+    Inicia el servidor sobre stdin/stdout
+    """
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+    code = server.serve()
+    # El hilo lector puede seguir bloqueado en stdin: salir sin esperar a
+    # la finalización del intérprete
+    sys.stdout.flush()
+    os._exit(code)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
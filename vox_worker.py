@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Trabajador persistente de Vox para sistemas de compilación (make, ninja, Bazel)
+
+Un solo proceso atiende muchas peticiones por stdin sin reiniciarse, evitando
+el arranque del intérprete y la construcción del transpilador en cada archivo.
+
+Protocolo (stdin -> stdout, mismo formato de marco en ambos sentidos):
+    --marco longitud   4 bytes big-endian con la longitud + JSON en UTF-8
+    --marco nul        JSON en UTF-8 terminado en un byte NUL
+
+Petición:
+    {"id": 1, "entrada": "src/a.vox", "salida": "build/a.lua",
+     "opciones": {"motor": "single_pass"}}
+
+Respuesta:
+    {"id": 1, "estado": "ok" | "error", "salida": "build/a.lua",
+     "escrito": true, "ms": 1.2, "diagnosticos": [
+        {"linea": 3, "columna": 5, "tipo": "PALABRA_PROHIBIDA", "mensaje": "..."}]}
+
+Una petición mal formada (falta un campo, una clave de "opciones" desconocida,
+un motor que no existe) responde con un diagnóstico de tipo ERROR_PETICION
+sin leer el archivo.
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from typing import BinaryIO, Dict, List, Optional
+
+from transpiler_final import (
+    ENGINE_CASCADE, ENGINES, STATUS_FAILED, STATUS_TRANSPILED, STATUS_UNCHANGED,
+    BuildReport, DSLError, ErrorType, FileResult, LuaDSLTranspiler,
+    decode_source, encode_output, error_message, error_type_of, write_build_telemetry, write_if_changed,
+)
+
+
+FRAMING_LENGTH = "longitud"
+FRAMING_NUL = "nul"
+FRAMINGS = (FRAMING_LENGTH, FRAMING_NUL)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+# Tipo de los diagnósticos de una petición mal formada (no del archivo .vox)
+REQUEST_ERROR = "ERROR_PETICION"
+
+# Claves admitidas en "opciones"
+OPTION_KEYS = frozenset(('motor',))
+
+_LENGTH_PREFIX = struct.Struct('>I')
+
+
+class FrameReader:
+    """Lee peticiones enmarcadas de un flujo binario"""
+
+    __slots__ = ('stream', 'framing', '_buffer')
+
+    def __init__(self, stream: BinaryIO, framing: str = FRAMING_LENGTH):
+        self.stream = stream
+        self.framing = framing
+        self._buffer = b""
+
+    def read(self) -> Optional[bytes]:
+        """Devuelve el siguiente marco, o None al cerrarse la entrada"""
+        if self.framing == FRAMING_LENGTH:
+            header = self._read_exactly(_LENGTH_PREFIX.size)
+            if header is None:
+                return None
+            body = self._read_exactly(_LENGTH_PREFIX.unpack(header)[0])
+            if body is None:
+                raise EOFError("Marco incompleto al final de la entrada")
+            return body
+
+        while b"\0" not in self._buffer:
+            chunk = self.stream.read1(64 * 1024) if hasattr(self.stream, 'read1') else self.stream.read(1)
+            if not chunk:
+                if self._buffer.strip():
+                    raise EOFError("Marco sin terminar al final de la entrada")
+                return None
+            self._buffer += chunk
+        frame, _, self._buffer = self._buffer.partition(b"\0")
+        return frame
+
+    def _read_exactly(self, size: int) -> Optional[bytes]:
+        data = b""
+        while len(data) < size:
+            chunk = self.stream.read(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+def write_frame(stream: BinaryIO, payload: Dict, framing: str = FRAMING_LENGTH) -> None:
+    """Escribe una respuesta enmarcada y vacía el búfer"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    if framing == FRAMING_LENGTH:
+        stream.write(_LENGTH_PREFIX.pack(len(body)) + body)
+    else:
+        stream.write(body + b"\0")
+    stream.flush()
+
+
+class BatchWorker:
+    """
+    Atiende peticiones de transpilación con transpiladores ya construidos
+
+    Se mantiene un transpilador por motor; los .lua solo se reescriben si
+    cambian (write_if_changed), igual que en las compilaciones de directorio.
+    Cada petición queda registrada como FileResult para la telemetría.
+    """
+
+    __slots__ = ('_transpilers', 'results', '_start')
+
+    def __init__(self):
+        self._transpilers: Dict[str, LuaDSLTranspiler] = {}
+        self.results: List[FileResult] = []
+        self._start = time.perf_counter()
+
+    def transpiler(self, engine: str) -> LuaDSLTranspiler:
+        transpiler = self._transpilers.get(engine)
+        if transpiler is None:
+            transpiler = self._transpilers[engine] = LuaDSLTranspiler(engine=engine)
+        return transpiler
+
+    def handle(self, request: Dict) -> Dict:
+        """Procesa una petición ya decodificada y devuelve la respuesta"""
+        start = time.perf_counter()
+        response = {'id': request.get('id'), 'salida': request.get('salida')}
+        diagnostics: List[Dict] = []
+        written = False
+        bytes_in = bytes_out = 0
+
+        try:
+            input_file = request['entrada']
+            output_file = request['salida']
+            engine = _engine_of(request.get('opciones') or {})
+
+            with open(input_file, 'rb') as f:
+                data = f.read()
+            bytes_in = len(data)
+            content = decode_source(data)
+            transpiler = self.transpiler(engine)
+
+            forbidden = transpiler.find_forbidden_words(content)
+            if forbidden:
+                diagnostics.extend(
+                    _diagnostic(line, column, ErrorType.FORBIDDEN_WORD.value,
+                                f"Palabra prohibida '{word}'")
+                    for line, column, word in forbidden
+                )
+            else:
+                output = encode_output(transpiler.transpile_content(content, input_file))
+                bytes_out = len(output)
+                written = write_if_changed(output_file, output)
+        except KeyError as e:
+            diagnostics.append(_diagnostic(0, 0, REQUEST_ERROR, f"Falta el campo {e} en la petición"))
+        except _RequestError as e:
+            diagnostics.append(_diagnostic(0, 0, REQUEST_ERROR, str(e)))
+        except DSLError as e:
+            if error_type_of(e) == ErrorType.ARITY_ERROR.value:
+                # Un diagnóstico por error, con su posición (como vox_server)
+                diagnostics.extend(
+                    _diagnostic(line, column, ErrorType.ARITY_ERROR.value, message)
+                    for line, column, message in transpiler.find_arity_errors(content)
+                )
+            if not diagnostics:
+                diagnostics.append(_diagnostic(0, 0, error_type_of(e), error_message(e)))
+        except ValueError as e:
+            if isinstance(e, UnicodeDecodeError):
+                diagnostics.append(_diagnostic(0, 0, error_type_of(e), error_message(e)))
+            else:
+                diagnostics.append(_diagnostic(0, 0, ErrorType.SYNTAX_ERROR.value, str(e)))
+        except Exception as e:
+            diagnostics.append(_diagnostic(0, 0, error_type_of(e), error_message(e)))
+
+        seconds = time.perf_counter() - start
+        response['estado'] = STATUS_ERROR if diagnostics else STATUS_OK
+        response['escrito'] = written
+        response['diagnosticos'] = diagnostics
+        response['ms'] = round(seconds * 1000, 3)
+
+        if diagnostics:
+            result = FileResult(str(request.get('entrada', '')), STATUS_FAILED,
+                                error_type=diagnostics[0]['tipo'], message=diagnostics[0]['mensaje'])
+        else:
+            result = FileResult(input_file, STATUS_TRANSPILED if written else STATUS_UNCHANGED,
+                                bytes_out=bytes_out)
+        result.bytes_in = bytes_in
+        result.seconds = seconds
+        self.results.append(result)
+        return response
+
+    def report(self) -> BuildReport:
+        """Resumen de las peticiones atendidas desde el arranque"""
+        return BuildReport(self.results, time.perf_counter() - self._start)
+
+    def serve(self, reader: FrameReader, writer: BinaryIO, framing: str) -> int:
+        """
+        Atiende peticiones hasta que se cierra la entrada
+
+        Returns:
+            0 al terminar normalmente, 1 si la entrada acabó con un marco roto
+        """
+        while True:
+            try:
+                frame = reader.read()
+            except EOFError as e:
+                write_frame(writer, {'id': None, 'estado': STATUS_ERROR, 'diagnosticos': [
+                    _diagnostic(0, 0, ErrorType.FILE_ERROR.value, str(e))]}, framing)
+                return 1
+            if frame is None:
+                return 0
+
+            try:
+                request = json.loads(frame.decode('utf-8'))
+                if not isinstance(request, dict):
+                    raise ValueError("La petición debe ser un objeto JSON")
+            except ValueError as e:
+                write_frame(writer, {'id': None, 'estado': STATUS_ERROR, 'diagnosticos': [
+                    _diagnostic(0, 0, REQUEST_ERROR, f"Petición inválida: {e}")]}, framing)
+                continue
+
+            write_frame(writer, self.handle(request), framing)
+
+
+class _RequestError(Exception):
+    """Petición con opciones inválidas"""
+
+
+def _engine_of(options: Dict) -> str:
+    """
+    Motor pedido en las opciones de una petición
+
+    Raises:
+        _RequestError: Si las opciones no son un objeto, tienen claves
+            desconocidas (que el trabajador ignoraría en silencio) o piden
+            un motor que no existe
+    """
+    if not isinstance(options, dict):
+        raise _RequestError("'opciones' debe ser un objeto")
+    unknown = sorted(set(options) - OPTION_KEYS)
+    if unknown:
+        raise _RequestError(f"Opciones desconocidas: {', '.join(unknown)}. "
+                            f"Admitidas: {', '.join(sorted(OPTION_KEYS))}")
+    engine = options.get('motor', ENGINE_CASCADE)
+    if engine not in ENGINES:
+        raise _RequestError(f"Motor desconocido '{engine}'. Opciones: {', '.join(ENGINES)}")
+    return engine
+
+
+def _diagnostic(line: int, column: int, error_type: str, message: str) -> Dict:
+    return {'linea': line, 'columna': column, 'tipo': error_type, 'mensaje': message}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Trabajador persistente de Vox para sistemas de compilación")
+    parser.add_argument('--marco', choices=FRAMINGS, default=FRAMING_LENGTH,
+                        help="Formato de marco de peticiones y respuestas")
+    parser.add_argument('--telemetria', metavar="ARCHIVO.json",
+                        help="Al terminar, exportar la telemetría de las peticiones en JSON")
+    parser.add_argument('--telemetria-prometheus', metavar="ARCHIVO.prom",
+                        help="Al terminar, exportar la telemetría en formato Prometheus")
+    args = parser.parse_args(argv)
+
+    reader = FrameReader(sys.stdin.buffer, args.marco)
+    worker = BatchWorker()
+    code = worker.serve(reader, sys.stdout.buffer, args.marco)
+    if args.telemetria or args.telemetria_prometheus:
+        write_build_telemetry(worker.report(), args.telemetria, args.telemetria_prometheus)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())